@@ -0,0 +1,381 @@
+# coding: utf-8
+
+"""
+    Benchmarks of g() and ww.tools.iterables against raw builtins and
+    itertools.
+
+    Each class measures one operation: `time_g` with g(), `time_tools` with
+    the function from ww.tools.iterables when there is one, and `time_raw`
+    with the code you would write without ww. The difference is the cost
+    of the abstraction.
+
+    Results of the lazy operations include consuming them, since that's
+    where the work is done.
+"""
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+import random
+import itertools
+import collections
+
+from ww import g
+from ww.tools import iterables as tools
+
+SIZES = [10, 1000, 100000]
+KINDS = ['int', 'str', 'tuple']
+
+
+def make_data(kind, size, seed=0):
+    """ Return `size` random items of the given kind, with duplicates """
+    rand = random.Random(seed)
+    numbers = [rand.randint(0, size // 2 + 1) for _ in range(size)]
+    if kind == 'int':
+        return numbers
+    if kind == 'str':
+        return ['item-%s' % x for x in numbers]
+    return [(x % 7, x) for x in numbers]
+
+
+def exhaust(iterable):
+    """ Consume an iterable as fast as possible, keeping nothing """
+    collections.deque(iterable, maxlen=0)
+
+
+def key(item):
+    return hash(item) % 7
+
+
+class IterableBenchmark(object):
+    """ Base class providing the data to iterate on """
+
+    params = [SIZES, KINDS]
+    param_names = ['size', 'kind']
+
+    def setup(self, size, kind):
+        self.data = make_data(kind, size)
+        self.other = make_data(kind, size // 10 + 1, seed=1)
+
+
+class Iteration(IterableBenchmark):
+
+    def time_g(self, size, kind):
+        exhaust(g(self.data))
+
+    def time_raw(self, size, kind):
+        exhaust(iter(self.data))
+
+
+class Construction(IterableBenchmark):
+
+    params = [SIZES, ['int']]
+
+    def time_g(self, size, kind):
+        for x in self.data:
+            g(self.other)
+
+    def time_raw(self, size, kind):
+        for x in self.data:
+            iter(self.other)
+
+
+class Next(IterableBenchmark):
+
+    def setup(self, size, kind):
+        IterableBenchmark.setup(self, size, kind)
+        self.wrapper = g(itertools.cycle(self.data))
+        self.iterator = itertools.cycle(self.data)
+
+    def time_g(self, size, kind):
+        for x in self.data:
+            self.wrapper.next()
+
+    def time_raw(self, size, kind):
+        for x in self.data:
+            next(self.iterator, None)
+
+
+class Map(IterableBenchmark):
+
+    def time_g(self, size, kind):
+        exhaust(g(self.data).map(repr))
+
+    def time_raw(self, size, kind):
+        exhaust(map(repr, self.data))
+
+
+class Zip(IterableBenchmark):
+
+    def time_g(self, size, kind):
+        exhaust(g(self.data).zip(self.data))
+
+    def time_raw(self, size, kind):
+        exhaust(zip(self.data, self.data))
+
+
+class Cycle(IterableBenchmark):
+
+    def time_g(self, size, kind):
+        exhaust(itertools.islice(g(self.data).cycle(), size * 2))
+
+    def time_raw(self, size, kind):
+        exhaust(itertools.islice(itertools.cycle(self.data), size * 2))
+
+
+class Enumerate(IterableBenchmark):
+
+    def time_g(self, size, kind):
+        exhaust(g(self.data).enumerate())
+
+    def time_raw(self, size, kind):
+        exhaust(enumerate(self.data))
+
+
+class Count(IterableBenchmark):
+
+    def time_g(self, size, kind):
+        g(self.data).count()
+
+    def time_raw(self, size, kind):
+        sum(1 for _ in self.data)
+
+
+class Copy(IterableBenchmark):
+
+    def time_g(self, size, kind):
+        gen = g(self.data)
+        exhaust(gen.copy())
+        exhaust(gen)
+
+    def time_raw(self, size, kind):
+        a, b = itertools.tee(self.data)
+        exhaust(a)
+        exhaust(b)
+
+
+class Join(IterableBenchmark):
+
+    def time_g(self, size, kind):
+        g(self.data).join(',')
+
+    def time_raw(self, size, kind):
+        ','.join(map('{}'.format, self.data))
+
+
+class Add(IterableBenchmark):
+
+    def time_g(self, size, kind):
+        exhaust(g(self.data) + self.other)
+
+    def time_radd_g(self, size, kind):
+        exhaust(self.other + g(self.data))
+
+    def time_raw(self, size, kind):
+        exhaust(itertools.chain(self.data, self.other))
+
+
+class Sub(IterableBenchmark):
+
+    def time_g(self, size, kind):
+        exhaust(g(self.data) - self.other)
+
+    def time_rsub_g(self, size, kind):
+        exhaust(self.data - g(self.other))
+
+    def time_raw(self, size, kind):
+        other = set(self.other)
+        exhaust(x for x in self.data if x not in other)
+
+
+class Mul(IterableBenchmark):
+
+    def time_g(self, size, kind):
+        exhaust(g(self.data) * 3)
+
+    def time_raw(self, size, kind):
+        exhaust(itertools.chain(*itertools.tee(self.data, 3)))
+
+
+class Tee(IterableBenchmark):
+
+    def time_g(self, size, kind):
+        for copy in g(self.data).tee(3):
+            exhaust(copy)
+
+    def time_raw(self, size, kind):
+        for copy in itertools.tee(self.data, 3):
+            exhaust(copy)
+
+
+class GetItem(IterableBenchmark):
+
+    def time_index_g(self, size, kind):
+        g(self.data)[size // 2]
+
+    def time_index_tools(self, size, kind):
+        tools.at_index(self.data, size // 2)
+
+    def time_index_raw(self, size, kind):
+        next(itertools.islice(self.data, size // 2, None))
+
+    def time_negative_index_g(self, size, kind):
+        g(self.data)[-(size // 2 + 1)]
+
+    def time_negative_index_raw(self, size, kind):
+        collections.deque(self.data, maxlen=size // 2 + 1).popleft()
+
+    def time_slice_g(self, size, kind):
+        exhaust(g(self.data)[1:size:2])
+
+    def time_slice_tools(self, size, kind):
+        exhaust(tools.iterslice(self.data, 1, size, 2))
+
+    def time_slice_raw(self, size, kind):
+        exhaust(itertools.islice(self.data, 1, size, 2))
+
+    def time_callable_g(self, size, kind):
+        last = self.data[-1]
+        g(self.data)[lambda x: x == last]
+
+    def time_callable_tools(self, size, kind):
+        last = self.data[-1]
+        tools.first_true(self.data, lambda x: x == last)
+
+    def time_callable_raw(self, size, kind):
+        last = self.data[-1]
+        next(x for x in self.data if x == last)
+
+
+class StartsStopsWhen(IterableBenchmark):
+
+    def time_starts_when_tools(self, size, kind):
+        middle = self.data[size // 2]
+        exhaust(tools.starts_when(self.data, lambda x: x == middle))
+
+    def time_starts_when_raw(self, size, kind):
+        middle = self.data[size // 2]
+        exhaust(itertools.dropwhile(lambda x: x != middle, self.data))
+
+    def time_stops_when_tools(self, size, kind):
+        middle = self.data[size // 2]
+        exhaust(tools.stops_when(self.data, lambda x: x == middle))
+
+    def time_stops_when_raw(self, size, kind):
+        middle = self.data[size // 2]
+        exhaust(itertools.takewhile(lambda x: x != middle, self.data))
+
+
+class Sorted(IterableBenchmark):
+
+    def time_g(self, size, kind):
+        exhaust(g(self.data).sorted())
+
+    def time_key_g(self, size, kind):
+        exhaust(g(self.data).sorted(key))
+
+    def time_raw(self, size, kind):
+        exhaust(sorted(self.data))
+
+    def time_key_raw(self, size, kind):
+        exhaust(sorted(self.data, key=key))
+
+
+class GroupBy(IterableBenchmark):
+
+    def time_g(self, size, kind):
+        exhaust(g(self.data).groupby(key))
+
+    def time_tools(self, size, kind):
+        exhaust(tools.groupby(self.data, key))
+
+    def time_raw(self, size, kind):
+        groups = itertools.groupby(sorted(self.data, key=key), key)
+        exhaust((k, tuple(group)) for k, group in groups)
+
+
+class Chunks(IterableBenchmark):
+
+    # Don't exhaust chunks(): on Python 3.7+, its last next() raises
+    # RuntimeError (PEP 479), so we only take the complete chunks.
+
+    def time_g(self, size, kind):
+        exhaust(itertools.islice(g(self.data).chunks(10), size // 10))
+
+    def time_tools(self, size, kind):
+        exhaust(itertools.islice(tools.chunks(self.data, 10), size // 10))
+
+    def time_raw(self, size, kind):
+        iterator = iter(self.data)
+        chunks = iter(lambda: tuple(itertools.islice(iterator, 10)), ())
+        exhaust(itertools.islice(chunks, size // 10))
+
+
+class Window(IterableBenchmark):
+
+    def time_g(self, size, kind):
+        exhaust(g(self.data).window(3))
+
+    def time_tools(self, size, kind):
+        exhaust(tools.window(self.data, 3))
+
+    def time_raw(self, size, kind):
+        a, b, c = itertools.tee(self.data, 3)
+        next(b, None)
+        next(c, None)
+        next(c, None)
+        exhaust(zip(a, b, c))
+
+
+class Firsts(IterableBenchmark):
+
+    def time_g(self, size, kind):
+        exhaust(g(self.data).firsts(size // 2))
+
+    def time_tools(self, size, kind):
+        exhaust(tools.firsts(self.data, size // 2))
+
+    def time_raw(self, size, kind):
+        exhaust(itertools.islice(self.data, size // 2))
+
+
+class Lasts(IterableBenchmark):
+
+    def time_g(self, size, kind):
+        exhaust(g(self.data).lasts(size // 2))
+
+    def time_tools(self, size, kind):
+        exhaust(tools.lasts(self.data, size // 2))
+
+    def time_raw(self, size, kind):
+        exhaust(collections.deque(self.data, maxlen=size // 2))
+
+
+class SkipDuplicates(IterableBenchmark):
+
+    def time_g(self, size, kind):
+        exhaust(g(self.data).skip_duplicates())
+
+    def time_tools(self, size, kind):
+        exhaust(tools.skip_duplicates(self.data))
+
+    def time_key_g(self, size, kind):
+        exhaust(g(self.data).skip_duplicates(key))
+
+    def time_raw(self, size, kind):
+        seen = set()
+        exhaust(x for x in self.data if not (x in seen or seen.add(x)))
+
+
+class Chain(IterableBenchmark):
+    """ A typical pipeline, to see how the overhead of each step adds up """
+
+    def time_g(self, size, kind):
+        (g(self.data).map(repr).enumerate().skip_duplicates(key)
+         .firsts(size // 2).list())
+
+    def time_raw(self, size, kind):
+        seen = set()
+        items = enumerate(map(repr, self.data))
+        items = (x for x in items if not (key(x) in seen or seen.add(key(x))))
+        list(itertools.islice(items, size // 2))
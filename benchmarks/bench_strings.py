@@ -0,0 +1,304 @@
+# coding: utf-8
+
+"""
+    Benchmarks of ww.tools.strings, s() and f() against the equivalent
+    code written with str and re.
+
+    The corpora are generated from a fixed seed, so the results don't
+    depend on any file or network access:
+
+    - short: 1000 short sentences, to see the overhead of each call.
+    - document: one document of about 1MB of ASCII text.
+    - unicode: one document of about 1MB of accented letters, CJK and
+      emojis.
+
+    Each benchmark processes all the texts of the corpus.
+"""
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+import re
+import random
+import textwrap
+
+from ww import s, f
+from ww.tools.strings import multisplit, multireplace, isplit
+
+CORPORA = ['short', 'document', 'unicode']
+
+ASCII_WORDS = ['fat', 'black', 'cat', 'big', 'bad', 'dog', 'the', 'a',
+               'wonderful', 'wrapper', 'python', 'iterable', 'string']
+UNICODE_WORDS = ['père', 'noël', 'éléphant', 'garçon', 'naïve', 'straße',
+                 '東京', '日本語', 'тест', 'ελληνικά', '🐍', '✨']
+PUNCTUATION = [' ', ' ', ' ', ' ', ', ', '; ', '/', '=', '\n']
+
+DOCUMENT_SIZE = 1024 * 1024
+
+
+def make_text(words, size, rand):
+    """ Return random words separated by random punctuation """
+    chunks = []
+    length = 0
+    while length < size:
+        chunk = rand.choice(words) + rand.choice(PUNCTUATION)
+        chunks.append(chunk)
+        length += len(chunk)
+    return ''.join(chunks)
+
+
+def make_corpus(kind, seed=0):
+    """ Return a list of texts of the given kind """
+    rand = random.Random(seed)
+    if kind == 'short':
+        return [make_text(ASCII_WORDS, 30, rand) for _ in range(1000)]
+    if kind == 'document':
+        return [make_text(ASCII_WORDS, DOCUMENT_SIZE, rand)]
+    return [make_text(ASCII_WORDS + UNICODE_WORDS, DOCUMENT_SIZE, rand)]
+
+
+class StringBenchmark(object):
+    """ Base class providing the corpus to process """
+
+    params = [CORPORA]
+    param_names = ['corpus']
+    timeout = 120
+
+    def setup(self, corpus):
+        self.texts = make_corpus(corpus)
+
+
+class Split(StringBenchmark):
+
+    def time_whitespace_s(self, corpus):
+        for text in self.texts:
+            s(text).split().list()
+
+    def time_whitespace_tools(self, corpus):
+        for text in self.texts:
+            multisplit(text)
+
+    def time_whitespace_raw(self, corpus):
+        for text in self.texts:
+            text.split()
+
+    def time_separators_s(self, corpus):
+        for text in self.texts:
+            s(text).split(',', ';', '[/=]').list()
+
+    def time_separators_tools(self, corpus):
+        for text in self.texts:
+            multisplit(text, ',', ';', '[/=]')
+
+    def time_separators_raw(self, corpus):
+        for text in self.texts:
+            re.split(',|;|[/=]', text)
+
+    def time_separators_isplit(self, corpus):
+        for text in self.texts:
+            chunks = (text[i:i + 65536] for i in range(0, len(text), 65536))
+            for token in isplit(chunks, ',', ';', '[/=]'):
+                pass
+
+    def time_maxsplit_tools(self, corpus):
+        for text in self.texts:
+            multisplit(text, ',', ';', '[/=]', maxsplit=10)
+
+    def time_maxsplit_raw(self, corpus):
+        for text in self.texts:
+            re.split(',|;|[/=]', text, maxsplit=10)
+
+
+class Replace(StringBenchmark):
+
+    def time_one_s(self, corpus):
+        for text in self.texts:
+            s(text).replace('cat', 'dog')
+
+    def time_one_tools(self, corpus):
+        for text in self.texts:
+            multireplace(text, 'cat', 'dog')
+
+    def time_one_raw(self, corpus):
+        for text in self.texts:
+            text.replace('cat', 'dog')
+
+    def time_several_s(self, corpus):
+        for text in self.texts:
+            s(text).replace(('cat', 'dog', '[,;]'), ('CAT', 'DOG', '.'))
+
+    def time_several_tools(self, corpus):
+        for text in self.texts:
+            multireplace(text, ('cat', 'dog', '[,;]'), ('CAT', 'DOG', '.'))
+
+    def time_several_raw(self, corpus):
+        for text in self.texts:
+            re.sub('[,;]', '.', text.replace('cat', 'CAT').replace('dog',
+                                                                   'DOG'))
+
+    def time_callable_tools(self, corpus):
+        for text in self.texts:
+            multireplace(text, r'\w+', lambda match: match.group().upper())
+
+    def time_callable_raw(self, corpus):
+        for text in self.texts:
+            re.sub(r'\w+', lambda match: match.group().upper(), text)
+
+
+class ManyPatterns(StringBenchmark):
+    """ Replace each of 50 words by another """
+
+    params = [['document', 'unicode']]
+
+    def setup(self, corpus):
+        StringBenchmark.setup(self, corpus)
+        rand = random.Random(1)
+        words = ASCII_WORDS + UNICODE_WORDS
+        self.patterns = ['%s%s' % (rand.choice(words), i) for i in range(40)]
+        self.patterns.extend(words[:10])
+        self.substitutions = [p.upper() for p in self.patterns]
+        self.mapping = dict(zip(self.patterns, self.substitutions))
+        self.regex = re.compile('|'.join(map(re.escape, self.patterns)))
+
+    def time_tools(self, corpus):
+        for text in self.texts:
+            multireplace(text, self.patterns, self.substitutions)
+
+    def time_raw_regex(self, corpus):
+        mapping = self.mapping
+        for text in self.texts:
+            self.regex.sub(lambda match: mapping[match.group()], text)
+
+    def time_raw_str(self, corpus):
+        for text in self.texts:
+            for pattern, substitution in self.mapping.items():
+                text = text.replace(pattern, substitution)
+
+
+class Join(StringBenchmark):
+
+    def setup(self, corpus):
+        StringBenchmark.setup(self, corpus)
+        self.words = [text.split() for text in self.texts]
+
+    def time_s(self, corpus):
+        for words in self.words:
+            s(' ').join(words)
+
+    def time_raw(self, corpus):
+        for words in self.words:
+            ' '.join(map('{}'.format, words))
+
+    def time_raw_no_cast(self, corpus):
+        for words in self.words:
+            ' '.join(words)
+
+
+class Format(object):
+    """ Formatting and dedenting, called 1000 times """
+
+    def setup(self):
+        self.templates = ['Hello {name}, you are {age} years old'] * 1000
+        self.indented = ['''
+            This should be indented
+            but it will not be
+        '''] * 1000
+
+    def time_format_s(self):
+        for template in self.templates:
+            s(template).format(name='Mario', age=42)
+
+    def time_format_raw(self):
+        for template in self.templates:
+            template.format(name='Mario', age=42)
+
+    def time_format_locals_s(self):
+        name, age = 'Mario', 42  # noqa
+        for template in self.templates:
+            s(template).format()
+
+    def time_f(self):
+        name, age = 'Mario', 42  # noqa
+        for template in self.templates:
+            f(template)
+
+    def time_format_locals_raw(self):
+        name, age = 'Mario', 42  # noqa
+        for template in self.templates:
+            template.format(**locals())
+
+    def time_dedent_s(self):
+        for text in self.indented:
+            s >> text
+
+    def time_dedent_f(self):
+        for text in self.indented:
+            f >> text
+
+    def time_dedent_raw(self):
+        for text in self.indented:
+            textwrap.dedent(text)
+
+
+class ToBool(object):
+
+    def setup(self):
+        self.values = ['1', '0', 'true', 'False', 'on', 'OFF', 'yes', 'no',
+                       ''] * 100
+        self.wrapped = [s(value) for value in self.values]
+        self.mapping = {'1': True, '0': False, 'true': True, 'false': False,
+                        'on': True, 'off': False, 'yes': True, 'no': False,
+                        '': False}
+
+    def time_s(self):
+        for value in self.values:
+            s(value).to_bool()
+
+    def time_s_wrapped(self):
+        for value in self.wrapped:
+            value.to_bool()
+
+    def time_raw(self):
+        mapping = self.mapping
+        for value in self.values:
+            mapping[value.lower()]
+
+
+class FromBytes(StringBenchmark):
+
+    def setup(self, corpus):
+        StringBenchmark.setup(self, corpus)
+        self.encoded = [text.encode('utf8') for text in self.texts]
+        self.latin1 = [text.encode('latin1', 'replace')
+                       for text in self.texts]
+
+    def time_s(self, corpus):
+        for data in self.encoded:
+            s.from_bytes(data, 'utf8')
+
+    def time_raw(self, corpus):
+        for data in self.encoded:
+            data.decode('utf8')
+
+    def time_detect_s(self, corpus):
+        for data in self.encoded:
+            s.from_bytes(data, detect=True)
+
+    def time_detect_latin1_s(self, corpus):
+        for data in self.latin1:
+            s.from_bytes(data, detect=True)
+
+
+class Construction(object):
+    """ The cost of wrapping a str in s() """
+
+    def setup(self):
+        self.texts = make_corpus('short')
+
+    def time_s(self):
+        for text in self.texts:
+            s(text)
+
+    def time_raw(self):
+        for text in self.texts:
+            str(text)
@@ -0,0 +1,299 @@
+# coding: utf-8
+
+"""
+    Benchmarks of the overhead of l(), t() and d() compared to list, tuple
+    and dict.
+
+    `time_*` benchmarks measure the speed, and `track_*_memory` ones the
+    peak memory allocated during the operation, in bytes, as measured by
+    tracemalloc. Both are given for the wrapper and for the builtin.
+"""
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+import tracemalloc
+
+from ww import l, t, d
+
+SIZES = [10, 1000, 100000]
+
+
+def peak_memory(func, *args):
+    """ Return the peak memory allocated while calling func, in bytes """
+    tracemalloc.start()
+    try:
+        result = func(*args)  # noqa: keep it alive until we measure
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+class WrapperBenchmark(object):
+    """ Base class providing the items to wrap """
+
+    params = [SIZES]
+    param_names = ['size']
+
+    def setup(self, size):
+        self.items = list(range(size))
+        self.pairs = [(i, str(i)) for i in range(size)]
+        self.list = list(self.items)
+        self.tuple = tuple(self.items)
+        self.dict = dict(self.pairs)
+        self.ww_list = l(self.items)
+        self.ww_tuple = t(self.items)
+        self.ww_dict = d(self.pairs)
+
+
+class Construction(WrapperBenchmark):
+
+    def time_l(self, size):
+        l(self.items)
+
+    def time_list(self, size):
+        list(self.items)
+
+    def time_t(self, size):
+        t(self.items)
+
+    def time_tuple(self, size):
+        tuple(self.items)
+
+    def time_d(self, size):
+        d(self.pairs)
+
+    def time_dict(self, size):
+        dict(self.pairs)
+
+    def track_l_memory(self, size):
+        return peak_memory(l, self.items)
+
+    def track_list_memory(self, size):
+        return peak_memory(list, self.items)
+
+    def track_t_memory(self, size):
+        return peak_memory(t, self.items)
+
+    def track_tuple_memory(self, size):
+        return peak_memory(tuple, self.items)
+
+    def track_d_memory(self, size):
+        return peak_memory(d, self.pairs)
+
+    def track_dict_memory(self, size):
+        return peak_memory(dict, self.pairs)
+
+    track_l_memory.unit = track_list_memory.unit = 'bytes'
+    track_t_memory.unit = track_tuple_memory.unit = 'bytes'
+    track_d_memory.unit = track_dict_memory.unit = 'bytes'
+
+
+class SmallConstruction(object):
+    """ Wrapping many small containers, as you would in a loop """
+
+    def setup(self):
+        self.rows = [(i, i + 1, i + 2) for i in range(10000)]
+
+    def time_l(self):
+        for row in self.rows:
+            l(row)
+
+    def time_list(self):
+        for row in self.rows:
+            list(row)
+
+    def time_t(self):
+        for row in self.rows:
+            t(row)
+
+    def time_tuple(self):
+        for row in self.rows:
+            tuple(row)
+
+    def track_l_memory(self):
+        return peak_memory(lambda: [l(row) for row in self.rows])
+
+    def track_list_memory(self):
+        return peak_memory(lambda: [list(row) for row in self.rows])
+
+    def track_t_memory(self):
+        return peak_memory(lambda: [t(row) for row in self.rows])
+
+    def track_tuple_memory(self):
+        return peak_memory(lambda: [tuple(row) for row in self.rows])
+
+    track_l_memory.unit = track_list_memory.unit = 'bytes'
+    track_t_memory.unit = track_tuple_memory.unit = 'bytes'
+
+
+class Len(WrapperBenchmark):
+
+    def time_l(self, size):
+        wrapper = self.ww_list
+        for _ in range(1000):
+            wrapper.len
+
+    def time_t(self, size):
+        wrapper = self.ww_tuple
+        for _ in range(1000):
+            wrapper.len
+
+    def time_list(self, size):
+        lst = self.list
+        for _ in range(1000):
+            len(lst)
+
+
+class Append(WrapperBenchmark):
+
+    def time_one_by_one_l(self, size):
+        wrapper = l()
+        for item in self.items:
+            wrapper.append(item)
+
+    def time_one_by_one_list(self, size):
+        lst = []
+        for item in self.items:
+            lst.append(item)
+
+    def time_varargs_l(self, size):
+        l().append(*self.items)
+
+    def time_varargs_list(self, size):
+        [].extend(self.items)
+
+    def track_varargs_l_memory(self, size):
+        return peak_memory(lambda: l().append(*self.items))
+
+    def track_varargs_list_memory(self, size):
+        return peak_memory(lambda: [].extend(self.items))
+
+    track_varargs_l_memory.unit = track_varargs_list_memory.unit = 'bytes'
+
+
+class Extend(WrapperBenchmark):
+
+    def setup(self, size):
+        WrapperBenchmark.setup(self, size)
+        self.chunks = [self.items[i:i + 10] for i in range(0, size, 10)]
+
+    def time_l(self, size):
+        l().extend(*self.chunks)
+
+    def time_list(self, size):
+        lst = []
+        for chunk in self.chunks:
+            lst.extend(chunk)
+
+
+class Add(WrapperBenchmark):
+
+    def setup(self, size):
+        WrapperBenchmark.setup(self, size)
+        self.other_dict = dict((k + size // 2, v) for k, v in self.pairs)
+
+    def time_d(self, size):
+        self.ww_dict + self.other_dict
+
+    def time_dict(self, size):
+        merged = self.dict.copy()
+        merged.update(self.other_dict)
+
+    def time_l(self, size):
+        self.ww_list + self.list
+
+    def time_list(self, size):
+        self.list + self.list
+
+    def track_d_memory(self, size):
+        return peak_memory(lambda: self.ww_dict + self.other_dict)
+
+    def track_dict_memory(self, size):
+        def merge():
+            merged = self.dict.copy()
+            merged.update(self.other_dict)
+            return merged
+        return peak_memory(merge)
+
+    track_d_memory.unit = track_dict_memory.unit = 'bytes'
+
+
+class DictIteration(WrapperBenchmark):
+    """ d.__iter__ wraps items() in g(), each time """
+
+    def time_d(self, size):
+        for key, value in self.ww_dict:
+            pass
+
+    def time_dict_items(self, size):
+        for key, value in self.dict.items():
+            pass
+
+    def time_small_d(self, size):
+        small = d(self.pairs[:3])
+        for _ in range(1000):
+            for key, value in small:
+                pass
+
+    def time_small_dict_items(self, size):
+        small = dict(self.pairs[:3])
+        for _ in range(1000):
+            for key, value in small.items():
+                pass
+
+
+class TupleIndex(WrapperBenchmark):
+
+    def setup(self, size):
+        WrapperBenchmark.setup(self, size)
+        self.indexed = self.ww_tuple.indexed()
+        self.indexed.index(0)  # build the index outside of the timing
+
+    def time_t(self, size):
+        self.ww_tuple.index(size - 1)
+
+    def time_t_indexed(self, size):
+        self.indexed.index(size - 1)
+
+    def time_tuple(self, size):
+        self.tuple.index(size - 1)
+
+
+class Join(WrapperBenchmark):
+
+    def time_l(self, size):
+        self.ww_list.join(',')
+
+    def time_t(self, size):
+        self.ww_tuple.join(',')
+
+    def time_list(self, size):
+        ','.join(map('{}'.format, self.list))
+
+
+class Records(WrapperBenchmark):
+    """ Storing rows as records created by t.records(), or as dicts """
+
+    def setup(self, size):
+        WrapperBenchmark.setup(self, size)
+        self.rows = [{'id': i, 'name': name, 'score': i / 2}
+                     for i, name in self.pairs]
+
+    def time_t_records(self, size):
+        t.records(self.rows).list()
+
+    def time_t_record(self, size):
+        for row in self.rows:
+            t.record(**row)
+
+    def time_dicts(self, size):
+        [dict(row) for row in self.rows]
+
+    def track_t_records_memory(self, size):
+        return peak_memory(lambda: t.records(self.rows).list())
+
+    def track_dicts_memory(self, size):
+        return peak_memory(lambda: [dict(row) for row in self.rows])
+
+    track_t_records_memory.unit = track_dicts_memory.unit = 'bytes'
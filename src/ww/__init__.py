@@ -7,7 +7,8 @@ from .wrappers.strings import StringWrapper as s, FStringWrapper as f  # noqa
 from .wrappers.lists import ListWrapper as l  # noqa
 from .wrappers.tuples import TupleWrapper as t  # noqa
 from .wrappers.dicts import DictWrapper as d  # noqa
+from .wrappers.arrays import ArrayWrapper as a  # noqa
+from .wrappers.bytes import BytesWrapper as b  # noqa
 
 # TODO: wrapper for datetime
 # TODO: wrapper for path.py
-# TODO: a, wrapper for array, with some numpy like properties
@@ -0,0 +1,260 @@
+# coding: utf-8
+
+"""
+    Tools to convert tuples of values to fixed layout binary records, and
+    back.
+
+    They are built on struct.Struct objects, which parse the format once.
+    get_struct() caches them by format, so you can pass the format string
+    everywhere without paying for the parsing again.
+
+    Unpacking reads directly from any buffer: bytes, bytearray, memoryview,
+    mmap... Nothing is sliced or copied, only the unpacked values are
+    created.
+
+    Most of them are exposed on :doc:`t() </index>`, l() and the bytes
+    wrapper, but you can use them directly if you don't want to wrap
+    anything.
+
+    Example:
+
+        >>> from ww.tools.binary import pack, pack_many, iter_unpack
+        >>> pack('<hI', (1, 2))
+        b'\\x01\\x00\\x02\\x00\\x00\\x00'
+        >>> data = pack_many('<hI', [(1, 2), (3, 4)])
+        >>> len(data)
+        12
+        >>> for record in iter_unpack('<hI', data):
+        ...     print(record)
+        (1, 2)
+        (3, 4)
+
+    You'll find bellow the detailed documentation for each functions.
+    Go have a look, there is some great stuff here!
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import struct
+
+import ww
+
+from ww.types import Union, Iterable, Any  # noqa
+from ww.utils import require_positive_number, byte_view
+
+# Like the re module, we empty the cache when it gets too big instead of
+# tracking which format was used last.
+MAX_CACHED_STRUCTS = 512
+
+_STRUCTS = {}  # type: dict
+
+
+def get_struct(fmt):
+    # type: (Union[str, bytes, struct.Struct]) -> struct.Struct
+    """ Return a struct.Struct for this format, cached
+
+        Args:
+            fmt: a struct format, like '<hI', or a struct.Struct which is
+                 returned as is.
+
+        Returns:
+            A struct.Struct.
+
+        Raises:
+            struct.error: if the format is not valid.
+
+        Example:
+
+            >>> from ww.tools.binary import get_struct
+            >>> get_struct('<hI').size
+            6
+            >>> get_struct('<hI') is get_struct('<hI')
+            True
+    """
+    if isinstance(fmt, struct.Struct):
+        return fmt
+    try:
+        return _STRUCTS[fmt]
+    except KeyError:
+        if len(_STRUCTS) >= MAX_CACHED_STRUCTS:
+            _STRUCTS.clear()
+        compiled = _STRUCTS[fmt] = struct.Struct(fmt)
+        return compiled
+
+
+def pack(fmt, values):
+    # type: (Union[str, struct.Struct], Iterable) -> bytes
+    """ Pack values into bytes, following the struct format
+
+        Args:
+            fmt: a struct format, or a struct.Struct.
+            values: the values to pack, one for each field of the format.
+
+        Returns:
+            The bytes of the record.
+
+        Raises:
+            struct.error: if the values don't match the format.
+
+        Example:
+
+            >>> from ww.tools.binary import pack
+            >>> pack('>HH', [1, 2])
+            b'\\x00\\x01\\x00\\x02'
+    """
+    return get_struct(fmt).pack(*values)
+
+
+def pack_many(fmt, rows):
+    # type: (Union[str, struct.Struct], Iterable[Iterable]) -> bytearray
+    """ Pack several rows of values one after the other, in one buffer
+
+        If `rows` has a length, the buffer is allocated once, and each
+        record is packed directly in it.
+
+        Args:
+            fmt: a struct format, or a struct.Struct.
+            rows: an iterable of rows of values, one for each field of the
+                  format.
+
+        Returns:
+            A bytearray of all the records.
+
+        Raises:
+            struct.error: if the values don't match the format.
+
+        Example:
+
+            >>> from ww.tools.binary import pack_many
+            >>> pack_many('>H', [(1,), (2,)])
+            bytearray(b'\\x00\\x01\\x00\\x02')
+            >>> pack_many('>H', ((i,) for i in range(2)))
+            bytearray(b'\\x00\\x00\\x00\\x01')
+    """
+    compiled = get_struct(fmt)
+    try:
+        count = len(rows)  # type: ignore
+    except TypeError:
+        return bytearray().join(compiled.pack(*row) for row in rows)
+
+    size = compiled.size
+    pack_into = compiled.pack_into
+    buffer = bytearray(size * count)
+    for offset, row in zip(range(0, size * count, size), rows):
+        pack_into(buffer, offset, *row)
+    return buffer
+
+
+def _record_factory(fields):
+    # type: (Union[Iterable[str], None]) -> Any
+    if fields is None:
+        return ww.t
+    return ww.wrappers.tuples.record_class(tuple(fields))
+
+
+def unpack(fmt, buffer, offset=0, fields=None):
+    # type: (Union[str, struct.Struct], Any, int, Iterable[str]) -> ww.t
+    """ Unpack one record from a buffer, without copying it
+
+        Args:
+            fmt: a struct format, or a struct.Struct.
+            buffer: bytes, bytearray, memoryview, mmap or any object
+                    supporting the buffer protocol.
+            offset: the position of the record in the buffer.
+            fields: names of the fields. If given, a record created with
+                    t.record() is returned instead of a t().
+
+        Returns:
+            A t() of the values, or a record.
+
+        Raises:
+            struct.error: if the buffer is too small.
+
+        Example:
+
+            >>> from ww.tools.binary import unpack
+            >>> unpack('>H', b'\\x00\\x01\\x00\\x02', offset=2)
+            (2,)
+            >>> unpack('>HH', b'\\x00\\x01\\x00\\x02', fields=['x', 'y'])
+            Record(x=1, y=2)
+    """
+    return _record_factory(fields)(get_struct(fmt).unpack_from(buffer,
+                                                               offset))
+
+
+def iter_unpack(fmt, buffer, offset=0, count=None, fields=None):
+    # type: (Union[str, struct.Struct], Any, int, int, Iterable[str]) -> Any
+    """ Lazily unpack records following each others in a buffer
+
+        Records are read directly from the buffer: nothing is sliced or
+        copied.
+
+        Args:
+            fmt: a struct format, or a struct.Struct.
+            buffer: bytes, bytearray, memoryview, mmap or any object
+                    supporting the buffer protocol.
+            offset: the position of the first record in the buffer.
+            count: the number of records to read. Default to all the
+                   records until the end of the buffer.
+            fields: names of the fields. If given, records created with
+                    t.record() are yielded instead of t().
+
+        Returns:
+            An iterator of t(), or of records.
+
+        Raises:
+            ValueError: if `count` is not given and the end of the buffer
+                        is not the end of a record, or if the buffer is too
+                        small for `count` records.
+
+        Example:
+
+            >>> from ww.tools.binary import iter_unpack
+            >>> data = bytes(bytearray(range(6)))
+            >>> list(iter_unpack('BB', data, offset=2))
+            [(2, 3), (4, 5)]
+            >>> list(iter_unpack('BB', data, count=1, fields=['a', 'b']))
+            [Record(a=0, b=1)]
+    """
+    compiled = get_struct(fmt)
+    size = compiled.size
+    offset = require_positive_number(offset, 'offset')
+    view = byte_view(buffer)
+    available, remainder = divmod(len(view) - offset, size)
+    if count is None:
+        if remainder:
+            raise ValueError(ww.s >> """
+                The buffer ends with a partial record: {} bytes after
+                offset {} is not a multiple of the record size, {}. Pass
+                `count` to read only the complete ones.
+            """.format(len(view) - offset, offset, size))
+        count = available
+    elif require_positive_number(count, 'count') > available:
+        raise ValueError('The buffer only contains {} records of {} '
+                         'bytes'.format(available, size))
+
+    # Slicing a memoryview doesn't copy anything
+    records = view[offset:offset + size * count]
+    return _iter_records(compiled, records, _record_factory(fields))
+
+
+def _iter_records(compiled, records, factory):
+    # type: (struct.Struct, memoryview, Any) -> Iterable
+    try:
+        for values in _iter_values(compiled, records):
+            yield factory(values)
+    finally:
+        # Let the owner of the buffer close it, e.g: a mmap. Python 2
+        # memoryviews are released when garbage collected.
+        if hasattr(records, 'release'):
+            records.release()
+
+
+def _iter_values(compiled, records):
+    # type: (struct.Struct, memoryview) -> Iterable[tuple]
+    if hasattr(compiled, 'iter_unpack'):
+        return compiled.iter_unpack(records)
+    # Struct.iter_unpack() is new in Python 3.4
+    unpack_from = compiled.unpack_from  # pragma: no cover
+    return (unpack_from(records, offset)  # pragma: no cover
+            for offset in range(0, len(records), compiled.size))
@@ -0,0 +1,769 @@
+# coding: utf-8
+
+"""
+    Tools to work with files too big to fit in memory.
+
+    Most of them are exposed on :doc:`g() </iterable_wrapper>` as class
+    methods, but you can use them directly if you don't want to wrap
+    anything.
+
+    Example:
+
+        >>> import os, tempfile
+        >>> from ww.tools.files import IndexedFile
+        >>> path = os.path.join(tempfile.mkdtemp(), 'numbers.txt')
+        >>> with open(path, 'w') as f:
+        ...     f.writelines('%s\\n' % i for i in range(100))
+        >>> lines = IndexedFile(path, every=10)
+        >>> lines[42]
+        '42\\n'
+        >>> lines[97:].list()
+        ['97\\n', '98\\n', '99\\n']
+        >>> lines.close()
+
+    You'll find bellow the detailed documentation for each functions.
+    Go have a look, there is some great stuff here!
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import io
+import os
+import csv
+import json
+import struct
+import operator
+import itertools
+import contextlib
+
+from array import array
+
+import builtins
+
+from future.utils import raise_from
+
+import ww
+
+from ww.types import Union, Iterable, Any  # noqa
+from ww.utils import require_positive_number
+
+# Size of the blocks we read when scanning a file. Big enough so that the
+# number of Python level calls stays low, small enough to not hurt memory.
+BLOCK_SIZE = 1024 * 1024
+
+# Size of the windows used to count newlines before looking for the exact
+# position of one of them. This avoids calling find() for every single line.
+COUNT_WINDOW = 4096
+
+
+def iter_line_offsets(stream, every=1000, start=0, block_size=BLOCK_SIZE):
+    # type: (Any, int, int, int) -> Iterable[int]
+    """ Yield the byte offset of the start of every `every` line of a stream.
+
+        The stream must be opened in binary mode, and positioned at `start`,
+        which must be the beginning of a line. The first offset yielded is
+        always `start`.
+
+        Newlines are counted in large blocks using bytes.count(), so only one
+        Python level call is made for about every `every` lines.
+
+        Args:
+            stream: a binary file-like object.
+            every: the number of lines between two offsets.
+            start: the offset the stream is positioned at.
+            block_size: the number of bytes to read at once.
+
+        Example:
+
+            >>> import io
+            >>> list(iter_line_offsets(io.BytesIO(b'a\\nbb\\nccc\\nd\\n'), 2))
+            [0, 5]
+    """
+    every = require_positive_number(every, 'every') or 1
+    yield start
+
+    # number of newlines to skip before reaching the next line to record
+    skip = every
+    block_start = start
+    # a line starting at the very end of a block may be the end of the file
+    pending = None
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+
+        if pending is not None:
+            yield pending
+            pending = None
+
+        pos = 0
+        end = len(block)
+        while pos < end:
+            window_end = min(pos + COUNT_WINDOW, end)
+            found = block.count(b'\n', pos, window_end)
+            if found < skip:
+                skip -= found
+                pos = window_end
+                continue
+
+            for _ in range(skip):
+                pos = block.find(b'\n', pos, window_end) + 1
+
+            if pos < end:
+                yield block_start + pos
+            else:
+                pending = block_start + pos
+            skip = every
+
+        block_start += end
+
+
+class LineIndex(object):
+    """ Sparse index storing the byte offset of every Kth line of a file.
+
+        It takes one pass on the file to build it, then lets you jump to any
+        line by seeking to the closest recorded offset and reading at most
+        K - 1 lines. Memory usage is 8 bytes every K lines.
+
+        The index remembers the size and modification time of the file it
+        has been built for, so it can be saved next to it and reused as long
+        as the file doesn't change. If the file grew (e.g: a log file), only
+        the new part is scanned.
+
+        Example:
+
+            >>> import os, tempfile
+            >>> path = os.path.join(tempfile.mkdtemp(), 'log.txt')
+            >>> with open(path, 'w') as f:
+            ...     f.writelines('line %s\\n' % i for i in range(25))
+            >>> index = LineIndex.build(path, every=10)
+            >>> index.lines
+            25
+            >>> index.locate(23)
+            (150, 3)
+    """
+
+    MAGIC = b'WWLINDEX'
+    # magic, version, every, lines, file size, file mtime
+    HEADER = struct.Struct('<8sBQQQd')
+    VERSION = 1
+
+    def __init__(self, offsets, every, lines, size=0, mtime=0.0):
+        # type: (array, int, int, int, float) -> None
+        self.offsets = offsets
+        self.every = every
+        self.lines = lines
+        self.size = size
+        self.mtime = mtime
+
+    def __len__(self):
+        return self.lines
+
+    def __repr__(self):
+        return "<LineIndex: {} lines, every {}>".format(self.lines, self.every)
+
+    @classmethod
+    def build(cls, path, every=1000, block_size=BLOCK_SIZE):
+        # type: (str, int, int) -> LineIndex
+        """ Scan the file at `path` and return its index.
+
+            Args:
+                path: the path of the file to index.
+                every: record the offset of one line every `every` lines.
+                       Lower values mean faster access, but a bigger index.
+                block_size: the number of bytes to read at once.
+
+            Returns:
+                A new LineIndex.
+        """
+        every = require_positive_number(every, 'every') or 1
+        index = cls(array('Q'), every, 0)
+        return index._scan(path, 0, block_size)
+
+    def _scan(self, path, start, block_size=BLOCK_SIZE):
+        # type: (str, int, int) -> LineIndex
+        """ Index the file from `start`, which must be the last offset """
+        stat = os.stat(path)
+        # the scan starts again from the last offset, which it yields first
+        base_line = 0
+        if self.offsets:
+            base_line = (len(self.offsets) - 1) * self.every
+            self.offsets.pop()
+
+        with io.open(path, 'rb') as f:
+            f.seek(start)
+            counter = _NewlineCounter(f)
+            offsets = iter_line_offsets(counter, self.every, start, block_size)
+            self.offsets.extend(offsets)
+
+        # a last line without a trailing newline is still a line
+        lines = base_line + counter.newlines
+        if counter.last_byte not in (None, b'\n'):
+            lines += 1
+
+        self.lines = lines
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        return self
+
+    def is_fresh(self, path):
+        # type: (str) -> bool
+        """ Return True if the file hasn't changed since it was indexed """
+        stat = os.stat(path)
+        return stat.st_size == self.size and stat.st_mtime == self.mtime
+
+    def refresh(self, path, block_size=BLOCK_SIZE):
+        # type: (str, int) -> LineIndex
+        """ Update the index if the file changed since it was built.
+
+            If the file only grew, the scan restarts from the last recorded
+            offset. Otherwise, the whole file is indexed again.
+
+            Returns:
+                self, to allow chaining.
+        """
+        stat = os.stat(path)
+        if stat.st_size == self.size and stat.st_mtime == self.mtime:
+            return self
+
+        if stat.st_size > self.size and self.offsets:
+            return self._scan(path, self.offsets[-1], block_size)
+
+        self.offsets = array('Q')
+        return self._scan(path, 0, block_size)
+
+    def locate(self, line):
+        # type: (int) -> tuple
+        """ Return (offset, lines_to_skip) to reach this line number. """
+        record, skip = divmod(line, self.every)
+        return self.offsets[record], skip
+
+    def save(self, path):
+        # type: (str) -> None
+        """ Write the index to `path`. """
+        with io.open(path, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.every,
+                                     self.lines, self.size, self.mtime))
+            self.offsets.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        # type: (str) -> LineIndex
+        """ Read an index written with save().
+
+            Raises:
+                ValueError: if the file is not a line index.
+        """
+        with io.open(path, 'rb') as f:
+            header = f.read(cls.HEADER.size)
+            try:
+                magic, version, every, lines, size, mtime = cls.HEADER.unpack(
+                    header
+                )
+            except struct.error:
+                magic = version = None
+
+            if magic != cls.MAGIC or version != cls.VERSION:
+                raise ValueError(ww.s >> """
+                    '{}' is not a line index file, or has been created by an
+                    incompatible version of ww. Delete it and it will be
+                    rebuilt.
+                """.format(path))
+
+            offsets = array('Q')
+            offsets.frombytes(f.read())
+
+        return cls(offsets, every, lines, size, mtime)
+
+
+class _NewlineCounter(object):
+    """ Proxy on a binary stream counting the newlines of what is read """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.newlines = 0
+        self.last_byte = None
+
+    def read(self, size):
+        block = self.stream.read(size)
+        if block:
+            self.newlines += block.count(b'\n')
+            self.last_byte = block[-1:]
+        return block
+
+
+class IndexedFile(object):
+    """ Random access to the lines of a file, without reading it all.
+
+        Indexing uses a :class:`LineIndex` to seek close to the line you
+        want, so `indexed_file[n]` reads at most `every` lines no matter
+        how big the file is. Slices are lazy and return
+        :doc:`g() </iterable_wrapper>` objects.
+
+        Lines are returned with their line ending, like when you iterate on
+        a file. Set `encoding` to None to get bytes.
+
+        Args:
+            path: the path of the file to read.
+            every: the number of lines between two offsets in the index.
+            encoding: the encoding used to decode lines. None to get bytes.
+            errors: the policy to use on decoding errors.
+            persist: if True, the index is saved in `index_path` and reused
+                     as long as the file doesn't change.
+            index_path: where to save the index. Default is the path of the
+                        file, with ".lineidx" appended.
+
+        Example:
+
+            >>> import os, tempfile
+            >>> path = os.path.join(tempfile.mkdtemp(), 'file.txt')
+            >>> with open(path, 'w') as f:
+            ...     f.writelines('%s\\n' % i for i in range(1000))
+            >>> with IndexedFile(path, every=100, persist=True) as lines:
+            ...     print(len(lines), lines[-1].strip(), lines[500].strip())
+            1000 999 500
+            >>> os.path.exists(path + '.lineidx')
+            True
+    """
+
+    def __init__(self, path, every=1000, encoding='utf8', errors='strict',
+                 persist=False, index_path=None):
+        # type: (str, int, str, str, bool, str) -> None
+        self.path = path
+        self.encoding = encoding
+        self.errors = errors
+        self.index_path = index_path or path + '.lineidx'
+        self.index = self._get_index(every, persist)
+        self._file = io.open(path, 'rb')
+
+    def _get_index(self, every, persist):
+        # type: (int, bool) -> LineIndex
+        if not persist:
+            return LineIndex.build(self.path, every)
+
+        try:
+            index = LineIndex.load(self.index_path)
+        except (IOError, OSError, ValueError):
+            index = LineIndex.build(self.path, every)
+        else:
+            if index.is_fresh(self.path):
+                return index
+            index.refresh(self.path)
+
+        index.save(self.index_path)
+        return index
+
+    def _decode(self, line):
+        # type: (bytes) -> Union[bytes, str]
+        if self.encoding is None:
+            return line
+        return line.decode(self.encoding, self.errors)
+
+    def _iter_from(self, stream, line):
+        # type: (Any, int) -> Iterable
+        """ Seek `stream` to `line` and return an iterator on the lines """
+        offset, skip = self.index.locate(line)
+        stream.seek(offset)
+        lines = iter(stream.readline, b'')
+        return itertools.islice(lines, skip, None)
+
+    def __len__(self):
+        return self.index.lines
+
+    def __iter__(self):
+        with io.open(self.path, 'rb') as f:
+            for line in f:
+                yield self._decode(line)
+
+    def __getitem__(self, index):
+        # type: (Union[int, slice]) -> Any
+        """ Return a line, or a g() of lines for slices.
+
+            Raises:
+                IndexError: if the line doesn't exist.
+                ValueError: if the step of the slice is negative.
+        """
+        lines = self.index.lines
+
+        if isinstance(index, int):
+            line = index + lines if index < 0 else index
+            if not 0 <= line < lines:
+                raise IndexError('Index "%d" out of range' % index)
+            return self._decode(next(self._iter_from(self._file, line)))
+
+        try:
+            start, stop, step = index.indices(lines)
+        except AttributeError:
+            raise ValueError('Indexing works only with integers or slices')
+
+        if step < 0:
+            raise ValueError("The step can not be negative: '%s' given" % step)
+
+        return ww.g(self._slice(start, stop, step))
+
+    def _slice(self, start, stop, step):
+        # type: (int, int, int) -> Iterable
+        if start >= stop:
+            return
+
+        # each slice gets its own file so they can be consumed in parallel
+        with io.open(self.path, 'rb') as f:
+            lines = itertools.islice(self._iter_from(f, start),
+                                     0, stop - start, step)
+            for line in lines:
+                yield self._decode(line)
+
+    def close(self):
+        # type: () -> None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return "<IndexedFile '{}': {} lines>".format(self.path, len(self))
+
+
+# Default number of rows per batch, for columnar output and batched writes.
+BATCH_SIZE = 10000
+
+SHAPES = ('tuple', 'dict', 'columns')
+
+_JSON_DECODER = json.JSONDecoder()
+
+
+@contextlib.contextmanager
+def open_text(source, mode='r', encoding='utf8', buffer_size=BLOCK_SIZE):
+    # type: (Any, str, str, int) -> Iterable
+    """ Open a path as a buffered text file, or pass file-like objects as-is.
+
+        Files we open are closed at the end of the block, files you pass
+        are left open.
+    """
+    if hasattr(source, 'read') or hasattr(source, 'write'):
+        yield source
+        return
+
+    with io.open(source, mode, encoding=encoding, newline='',
+                 buffering=buffer_size) as f:
+        yield f
+
+
+def _check_shape(shape, batch, choices=SHAPES):
+    # type: (str, int, tuple) -> int
+    """ Validate shape and batch, and return the batch size to use """
+    if shape not in choices:
+        raise ValueError('shape must be one of {} but is {!r}'.format(
+            ', '.join(choices), shape))
+
+    if batch is None:
+        return BATCH_SIZE if shape == 'columns' else 0
+
+    # 0 would yield no batch at all, and lose all the rows
+    batch = require_positive_number(batch, 'batch')
+    if not batch:
+        raise ValueError('batch must be at least 1, or None to not batch '
+                         'rows')
+    return batch
+
+
+def _batched(rows, batch):
+    # type: (Iterable, int) -> Iterable[list]
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, batch))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _to_columns(fields, rows):
+    # type: (Any, list) -> dict
+    """ Turn a list of rows into a dict of columns """
+    columns = (list(col) for col in zip(*rows))
+    if fields is None:
+        return dict(enumerate(columns))
+    return dict(zip(fields, columns))
+
+
+def _shaped(rows, fields, shape, batch):
+    # type: (Iterable[tuple], Any, str, int) -> Iterable
+    """ Yield rows (tuples) as the shape and batch asked by the user """
+    if shape == 'dict':
+        if fields is None:
+            rows = (dict(enumerate(row)) for row in rows)
+        else:
+            rows = (dict(zip(fields, row)) for row in rows)
+    elif shape == 'columns':
+        chunks = _batched(rows, batch)
+        return (_to_columns(fields, chunk) for chunk in chunks)
+
+    if batch:
+        return _batched(rows, batch)
+
+    return rows
+
+
+def read_csv(source, header=True, shape='tuple', batch=None,
+             encoding='utf8', buffer_size=BLOCK_SIZE, **fmtparams):
+    # type: (Any, bool, str, int, str, int, **Any) -> Iterable
+    """ Lazily read rows from a CSV file.
+
+        The file is read through a large buffer, and rows are decoded by the
+        csv module in C.
+
+        Args:
+            source: a path, or a text file-like object.
+            header: if True, the first row is used as field names and not
+                    yielded.
+            shape: 'tuple' to get each row as a tuple, 'dict' to get a dict
+                   of {field: value}, 'columns' to get batches of rows as a
+                   dict of {field: [values]}. Without header, fields are the
+                   column positions.
+            batch: if set, yield lists of `batch` rows instead of rows. For
+                   'columns', it's the number of rows per dict and defaults
+                   to 10000.
+            encoding: the encoding of the file, if you pass a path.
+            buffer_size: the size of the read buffer, if you pass a path.
+            fmtparams: passed to csv.reader(), e.g: delimiter=';'.
+
+        Returns:
+            A generator of rows, or batches of rows.
+
+        Example:
+
+            >>> import io
+            >>> data = u'name,age\\nbob,8\\nalice,10\\n'
+            >>> list(read_csv(io.StringIO(data)))
+            [('bob', '8'), ('alice', '10')]
+            >>> for row in read_csv(io.StringIO(data), shape='dict'):
+            ...     print(sorted(row.items()))
+            [('age', '8'), ('name', 'bob')]
+            [('age', '10'), ('name', 'alice')]
+            >>> for cols in read_csv(io.StringIO(data), shape='columns'):
+            ...     print(sorted(cols.items()))
+            [('age', ['8', '10']), ('name', ['bob', 'alice'])]
+    """
+    batch = _check_shape(shape, batch)
+    return _iter_csv(source, header, shape, batch, encoding, buffer_size,
+                     fmtparams)
+
+
+def _iter_csv(source, header, shape, batch, encoding, buffer_size,
+              fmtparams):
+    # type: (Any, bool, str, int, str, int, dict) -> Iterable
+    with open_text(source, 'r', encoding, buffer_size) as f:
+        rows = builtins.map(tuple, csv.reader(f, **fmtparams))
+        fields = None
+        if header:
+            fields = next(rows, ())
+
+        for item in _shaped(rows, fields, shape, batch):
+            yield item
+
+
+def _check_fields(fields, shape):
+    # type: (Any, str) -> None
+    if shape in ('tuple', 'columns') and fields is None:
+        raise ValueError(ww.s >> """
+            JSON objects have no order, so you need to pass 'fields', the
+            list of keys to extract, to get '{}'.
+        """.format(shape))
+
+
+def _decode_json_lines(lines, offset, objects=False):
+    # type: (list, int, bool) -> list
+    """ Decode a batch of JSON lines, checking each line holds one value
+
+        Joining the lines to decode them at once would accept a line
+        holding several values, or a value spanning several lines.
+        raw_decode() doesn't skip whitespaces nor accept trailing data, and
+        is almost as fast.
+    """
+    raw_decode = _JSON_DECODER.raw_decode
+    values = []
+    append = values.append
+    for i, line in enumerate(lines):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            value, end = raw_decode(line)
+            if end != len(line):
+                raise ValueError('Extra data after the value at '
+                                 'column {}'.format(end + 1))
+            if objects and not isinstance(value, dict):
+                raise ValueError('Expected a JSON object to extract '
+                                 'fields from')
+        except ValueError as e:
+            raise_from(ValueError(
+                'Invalid JSON near line {}: {!r} ({})'.format(
+                    offset + i + 1, line[:100], e)
+            ), e)
+        append(value)
+    return values
+
+
+def read_jsonl(source, shape='object', fields=None, batch=None,
+               encoding='utf8', buffer_size=BLOCK_SIZE):
+    # type: (Any, str, Iterable, int, str, int) -> Iterable
+    """ Lazily read values from a JSON Lines file.
+
+        The file is read by blocks of about `buffer_size` characters, and
+        each line must hold exactly one JSON value.
+
+        Args:
+            source: a path, or a text file-like object.
+            shape: 'object' to get the decoded values as-is, 'dict' to get
+                   only `fields` from each object, 'tuple' to get a tuple of
+                   the values of `fields`, 'columns' to get batches as
+                   a dict of {field: [values]}. Missing keys are None.
+            fields: the keys to extract. Required for 'tuple' and 'columns'.
+            batch: if set, yield lists of `batch` values instead of values.
+                   For 'columns', it's the number of rows per dict and
+                   defaults to 10000.
+            encoding: the encoding of the file, if you pass a path.
+            buffer_size: the number of characters to decode at once.
+
+        Returns:
+            A generator of values, or batches of values.
+
+        Raises:
+            ValueError: if a line is not valid JSON, or not a JSON object
+                        while `shape` is not 'object'.
+
+        Example:
+
+            >>> import io
+            >>> data = u'{"id": 1, "tag": "a"}\\n\\n{"id": 2}\\n'
+            >>> list(read_jsonl(io.StringIO(data), 'tuple', ('id', 'tag')))
+            [(1, 'a'), (2, None)]
+            >>> list(read_jsonl(io.StringIO(data), batch=10))
+            [[{'id': 1, 'tag': 'a'}, {'id': 2}]]
+    """
+    batch = _check_shape(shape, batch, SHAPES + ('object',))
+    _check_fields(fields, shape)
+    rows = _iter_jsonl(source, encoding, buffer_size, shape != 'object')
+
+    if shape == 'object' or (shape == 'dict' and not fields):
+        return _batched(rows, batch) if batch else rows
+
+    fields = tuple(fields)
+    rows = (tuple(obj.get(field) for field in fields) for obj in rows)
+    return _shaped(rows, fields, shape, batch)
+
+
+def _iter_jsonl(source, encoding, buffer_size, objects=False):
+    # type: (Any, str, int, bool) -> Iterable
+    with open_text(source, 'r', encoding, buffer_size) as f:
+        offset = 0
+        while True:
+            lines = f.readlines(buffer_size)
+            if not lines:
+                break
+            for value in _decode_json_lines(lines, offset, objects):
+                yield value
+            offset += len(lines)
+
+
+def write_csv(rows, dest, header=None, batch=BATCH_SIZE, encoding='utf8',
+              buffer_size=BLOCK_SIZE, **fmtparams):
+    # type: (Iterable, Any, Iterable, int, str, int, **Any) -> int
+    """ Write rows to a CSV file, by batches.
+
+        Args:
+            rows: an iterable of sequences, or of dicts.
+            dest: a path, or a text file-like object.
+            header: the field names to write first. If rows are dicts,
+                    it's also the keys to write, and it defaults to the keys
+                    of the first row.
+            batch: the number of rows to send to the writer at once.
+            encoding: the encoding of the file, if you pass a path.
+            buffer_size: the size of the write buffer, if you pass a path.
+            fmtparams: passed to csv.writer(), e.g: delimiter=';'.
+
+        Returns:
+            The number of rows written, not counting the header.
+
+        Example:
+
+            >>> import io
+            >>> out = io.StringIO()
+            >>> write_csv([{'a': 1, 'b': 2}, {'a': 3, 'b': 4}], out, 'ab')
+            2
+            >>> print(out.getvalue().replace('\\r', ''))
+            a,b
+            1,2
+            3,4
+            <BLANKLINE>
+    """
+    batch = require_positive_number(batch, 'batch') or BATCH_SIZE
+    rows = iter(rows)
+    first = next(rows, None)
+    if first is None:
+        chunks = iter(())  # type: Iterable
+    else:
+        chunks = _batched(itertools.chain([first], rows), batch)
+
+    if isinstance(first, dict):
+        header = tuple(header or first)
+        getter = operator.itemgetter(*header)
+        if len(header) == 1:
+            chunks = ([(getter(row),) for row in chunk] for chunk in chunks)
+        else:
+            chunks = ([getter(row) for row in chunk] for chunk in chunks)
+
+    count = 0
+    with open_text(dest, 'w', encoding, buffer_size) as f:
+        writer = csv.writer(f, **fmtparams)
+        if header:
+            writer.writerow(header)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            count += len(chunk)
+
+    return count
+
+
+def write_jsonl(values, dest, batch=BATCH_SIZE, encoding='utf8',
+                buffer_size=BLOCK_SIZE, **dumps_kwargs):
+    # type: (Iterable, Any, int, str, int, **Any) -> int
+    """ Write values to a JSON Lines file, by batches.
+
+        Each batch is encoded then written with a single call to write().
+
+        Args:
+            values: an iterable of JSON serializable values.
+            dest: a path, or a text file-like object.
+            batch: the number of values to write at once.
+            encoding: the encoding of the file, if you pass a path.
+            buffer_size: the size of the write buffer, if you pass a path.
+            dumps_kwargs: passed to json.dumps(), e.g: sort_keys=True.
+
+        Returns:
+            The number of values written.
+
+        Example:
+
+            >>> import io
+            >>> out = io.StringIO()
+            >>> write_jsonl([{'a': 1}, [1, 2], None], out)
+            3
+            >>> print(out.getvalue())
+            {"a": 1}
+            [1, 2]
+            null
+            <BLANKLINE>
+    """
+    batch = require_positive_number(batch, 'batch') or BATCH_SIZE
+    encoder = json.JSONEncoder(**dumps_kwargs).encode
+    count = 0
+    with open_text(dest, 'w', encoding, buffer_size) as f:
+        for chunk in _batched(values, batch):
+            f.write(u'\n'.join(builtins.map(encoder, chunk)) + u'\n')
+            count += len(chunk)
+
+    return count
@@ -30,6 +30,7 @@ import ww
 
 from ww.types import Union, Callable, Iterable, Any, T  # noqa
 from ww.utils import renamed_argument
+from ww.tools.profiling import memory_buffer, accounted_set
 
 from collections import deque
 
@@ -149,7 +150,7 @@ def skip_duplicates(iterable, key=None, fingerprints=()):
 
     """
 
-    fingerprints = fingerprints or set()
+    fingerprints = accounted_set(fingerprints or set(), 'skip_duplicates')
     fingerprint = None  # needed on type errors unrelated to hashing
 
     try:
@@ -239,6 +240,9 @@ def at_index(iterable, index):
     """
     try:
         if index < 0:
+            buffer = memory_buffer('at_index', maxlen=abs(index))
+            if buffer is not None:
+                iterable = buffer.hold(iterable)
             return deque(iterable, maxlen=abs(index)).popleft()
 
         return next(itertools.islice(iterable, index, index + 1))
@@ -299,6 +303,9 @@ def iterslice(iterable, start=0, stop=None, step=1):
 @renamed_argument('key', 'keyfunc')
 def groupby(iterable, keyfunc=None, reverse=False, cast=tuple):
     # type: (Iterable, Callable, bool, Callable) -> Iterable
+    buffer = memory_buffer('groupby')
+    if buffer is not None:
+        iterable = buffer.hold(iterable)
     sorted_iterable = sorted(iterable, key=keyfunc, reverse=reverse)
     for key, group in itertools.groupby(sorted_iterable, keyfunc):
         yield key, cast(group)
@@ -334,6 +341,9 @@ def lasts(iterable, items=1, default=None):
     # type: (Iterable[T], int, T) -> Iterable[T]
     """ Lazily return the last x items from this iterable or default. """
 
+    buffer = memory_buffer('lasts', maxlen=items)
+    if buffer is not None:
+        iterable = buffer.hold(iterable)
     last_items = deque(iterable, maxlen=items)
 
     for _ in range(items - len(last_items)):
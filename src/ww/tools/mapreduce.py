@@ -0,0 +1,253 @@
+# coding: utf-8
+
+"""
+    Map-reduce on a single machine, using all its cores, for aggregations
+    that don't fit in the memory of one process.
+
+    The map phase runs in a pool of processes. Each worker hash-partitions
+    the (key, value) pairs returned by the mapper and appends them to one
+    spill file per partition on disk. Then each partition is reduced in
+    parallel, so only one partition per worker needs to fit in memory.
+
+    It's the parallel version of ww.tools.iterables.groupby().
+
+    Example:
+
+        >>> from ww.tools.mapreduce import map_reduce, count_words, add
+        >>> lines = ['a b', 'b c', 'b']
+        >>> res = map_reduce(lines, count_words, add, tree=True, workers=2)
+        >>> sorted(res)
+        [('a', 1), ('b', 3), ('c', 1)]
+
+    You'll find bellow the detailed documentation for each functions.
+    Go have a look, there is some great stuff here!
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import os
+import glob
+import zlib
+import pickle
+import shutil
+import operator
+import tempfile
+import functools
+import itertools
+import collections
+
+from ww.types import Iterable, Callable, Any  # noqa
+from ww.utils import require_positive_number
+from ww.tools.parallel import process_map
+
+# Ready to use functions for the most common jobs
+add = operator.add
+
+
+def count_words(line):
+    # type: (str) -> Iterable[tuple]
+    """ Mapper yielding (word, 1) for each word of a line. """
+    return ((word, 1) for word in line.split())
+
+
+def _canonical(key):
+    # type: (Any) -> bytes
+    """ Encode a key to bytes that only depend on its value.
+
+        marshal and pickle output depends on string interning and on
+        reference counts, so equal keys can give different bytes.
+    """
+    if isinstance(key, bytes):
+        return b'b' + key
+    if isinstance(key, type(u'')):
+        return b's' + key.encode('utf8', 'backslashreplace')
+    if isinstance(key, tuple):
+        return b't(' + b','.join(_canonical(x) for x in key) + b')'
+    if isinstance(key, frozenset):
+        # Iteration order depends on hash(), which is randomized
+        items = sorted(_canonical(x) for x in key)
+        return b'f(' + b','.join(items) + b')'
+    return b'r' + repr(key).encode('utf8', 'backslashreplace')
+
+
+def partition_of(key, partitions):
+    # type: (Any, int) -> int
+    """ Return the partition of a key, the same in all processes.
+
+        hash() is randomized for each process for strings, so we hash a
+        canonical encoding of the key instead: the text of strings, the
+        bytes of bytes, and repr() for other keys, which must then have a
+        repr() that only depends on their value. Keys that are equal but
+        of different types (e.g: 1 and 1.0) may end up in different
+        partitions.
+    """
+    return zlib.crc32(_canonical(key)) % partitions
+
+
+def _spill_path(directory, partition):
+    # type: (str, int) -> str
+    # one file per partition and per process: no concurrent writes
+    return os.path.join(directory, 'part-{}-{}.spill'.format(partition,
+                                                             os.getpid()))
+
+
+def _combine(pairs, combiner, tree):
+    # type: (Iterable[tuple], Callable, bool) -> list
+    """ Merge the values of the same key, before spilling them """
+    if tree:
+        values = {}  # type: dict
+        for key, value in pairs:
+            if key in values:
+                value = combiner(values[key], value)
+            values[key] = value
+        return list(values.items())
+
+    grouped = collections.defaultdict(list)  # type: dict
+    for key, value in pairs:
+        grouped[key].append(value)
+    return [(key, combiner(key, vals)) for key, vals in grouped.items()]
+
+
+def _map_batch(mapper, combiner, tree, partitions, directory, items):
+    # type: (Callable, Callable, bool, int, str, list) -> int
+    """ Run in the workers: map a batch and spill the pairs to disk """
+    buckets = collections.defaultdict(list)  # type: dict
+    count = 0
+    for item in items:
+        for key, value in mapper(item):
+            buckets[partition_of(key, partitions)].append((key, value))
+            count += 1
+
+    for partition, pairs in buckets.items():
+        if combiner is not None:
+            pairs = _combine(pairs, combiner, tree)
+        with open(_spill_path(directory, partition), 'ab') as f:
+            pickle.dump(pairs, f, pickle.HIGHEST_PROTOCOL)
+
+    return count
+
+
+def _read_spills(directory, partition):
+    # type: (str, int) -> Iterable[tuple]
+    """ Yield all the pairs spilled for a partition """
+    pattern = os.path.join(directory, 'part-{}-*.spill'.format(partition))
+    for path in glob.glob(pattern):
+        with open(path, 'rb') as f:
+            while True:
+                try:
+                    pairs = pickle.load(f)
+                except EOFError:
+                    break
+                for pair in pairs:
+                    yield pair
+
+
+def _reduce_partition(reducer, tree, directory, partition):
+    # type: (Callable, bool, str, int) -> list
+    """ Run in the workers: reduce all the pairs of a partition """
+    pairs = _read_spills(directory, partition)
+    if tree:
+        return _combine(pairs, reducer, tree=True)
+
+    grouped = collections.defaultdict(list)  # type: dict
+    for key, value in pairs:
+        grouped[key].append(value)
+    return [(key, reducer(key, values)) for key, values in grouped.items()]
+
+
+def _batches(iterable, size):
+    # type: (Iterable, int) -> Iterable[list]
+    iterator = iter(iterable)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def map_reduce(iterable, mapper, reducer, partitions=16, workers=None,
+               combiner=None, tree=False, batch=1000, directory=None):
+    # type: (...) -> Iterable[tuple]
+    """ Group and aggregate items in parallel, spilling to disk.
+
+        1. The items are sent by batches to a pool of processes, where
+           `mapper(item)` returns an iterable of (key, value) pairs.
+        2. The pairs are hash-partitioned on their key, and appended to
+           spill files on disk, one per partition.
+        3. Each partition is then reduced in parallel: the values are
+           grouped by key and `reducer(key, values)` is called on each group.
+
+        Only one partition per worker needs to fit in memory during the
+        reduce phase: if it doesn't, use more partitions.
+
+        A `combiner(key, values)` can be passed to reduce the values of
+        each batch in the map workers, before spilling them. It makes spill
+        files much smaller, but the reducer then receives the results of
+        the combiner as values, instead of the original values.
+
+        For associative aggregations (sum, max, set union...), use
+        `tree=True`: `reducer(value1, value2)` then takes two values and
+        returns one, and it's applied as the values come, first in the map
+        workers for each batch, then to merge these partial results in the
+        reduce phase. Values are never grouped in memory.
+
+        .. WARNING::
+
+            All the functions must be picklable, which means they must be
+            defined at the top level of a module: lambdas or nested
+            functions won't work.
+
+        Args:
+            iterable: the items to process.
+            mapper: a callable returning an iterable of (key, value) pairs
+                    for each item. Keys must be hashable and picklable.
+            reducer: reducer(key, values) returning the result for a key, or
+                     reducer(value1, value2) if `tree` is True.
+            partitions: the number of partitions. More partitions means less
+                        memory per partition during the reduce phase.
+            workers: the number of processes. Default is the number of CPU.
+            combiner: optional combiner(key, values) to apply to the values
+                      of each batch in the map phase.
+            tree: if True, `reducer` is a binary associative function.
+            batch: the number of items sent to a map worker at once.
+            directory: where to create the temporary spill files. Default is
+                       the system temporary directory.
+
+        Returns:
+            A generator of (key, result) pairs, in no particular order.
+
+        Example:
+
+            >>> res = map_reduce(['a b', 'a'], count_words, add, tree=True)
+            >>> sorted(res)
+            [('a', 2), ('b', 1)]
+    """
+    partitions = require_positive_number(partitions, 'partitions') or 1
+    batch = require_positive_number(batch, 'batch') or 1
+    if tree and combiner is None:
+        combiner = reducer
+
+    return _map_reduce(iterable, mapper, reducer, partitions, workers,
+                       combiner, tree, batch, directory)
+
+
+def _map_reduce(iterable, mapper, reducer, partitions, workers, combiner,
+                tree, batch, directory):
+    # type: (...) -> Iterable[tuple]
+    spill_dir = tempfile.mkdtemp(prefix='ww-mapreduce-', dir=directory)
+    try:
+        map_batch = functools.partial(_map_batch, mapper, combiner, tree,
+                                      partitions, spill_dir)
+        for _ in process_map(map_batch, _batches(iterable, batch), workers,
+                             batch=1):
+            pass
+
+        reduce_partition = functools.partial(_reduce_partition, reducer,
+                                             tree, spill_dir)
+        results = process_map(reduce_partition, range(partitions), workers,
+                              batch=1)
+        for pairs in results:
+            for pair in pairs:
+                yield pair
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
@@ -0,0 +1,712 @@
+# coding: utf-8
+
+"""
+    Tools to overlap or parallelize the processing of iterables.
+
+    Python generators are lazy: nothing happens until you ask for the next
+    item. It's great for memory, but it means I/O and computations never
+    overlap. The functions of this module use threads or processes to work
+    ahead of the consumer, while keeping memory bounded.
+
+    Example:
+
+        >>> from ww.tools.parallel import prefetch
+        >>> list(prefetch(range(5), 2))
+        [0, 1, 2, 3, 4]
+
+    You'll find bellow the detailed documentation for each functions.
+    Go have a look, there is some great stuff here!
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import sys
+import time
+import queue
+import atexit
+import pickle
+import marshal
+import itertools
+import threading
+import collections
+import multiprocessing
+import multiprocessing.pool  # noqa
+
+import six
+
+from ww.types import Iterable, Callable, Any  # noqa
+from ww.utils import require_positive_number
+
+# How long, in seconds, a blocked worker waits before checking if it
+# should stop.
+POLL_INTERVAL = 0.1
+
+_DONE = object()
+
+
+class _Failure(object):
+    """ Carry an exception raised in a thread to the consuming thread """
+
+    def __init__(self, exc_info):
+        self.exc_info = exc_info
+
+    def reraise(self):
+        six.reraise(*self.exc_info)
+
+
+def _put(buffer, item, stop):
+    # type: (queue.Queue, Any, threading.Event) -> bool
+    """ Put item in the queue, unless we are asked to stop while waiting """
+    while not stop.is_set():
+        try:
+            buffer.put(item, timeout=POLL_INTERVAL)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _drain(buffer):
+    # type: (queue.Queue) -> None
+    """ Empty a queue so that references to items are released """
+    try:
+        while True:
+            buffer.get_nowait()
+    except queue.Empty:
+        pass
+
+
+def prefetch(iterable, size=1, workers=1):
+    # type: (Iterable, int, int) -> Iterable
+    """ Read items ahead of the consumer, in background threads.
+
+        Up to `size` items are read in advance and stored in a bounded
+        queue, so reading (e.g: from disk or the network) overlaps with
+        whatever you do with the items.
+
+        The order of the items is preserved. Reads are serialized with a lock,
+        so the iterable doesn't need to be thread safe. With several workers,
+        one can read the next item while the others wait for space in the
+        queue.
+
+        Exceptions raised by the iterable are raised again in the consumer,
+        at the position they happened. If you stop consuming early, the
+        workers stop at their next item, but the iterable is not closed since
+        a worker may still be reading from it.
+
+        Args:
+            iterable: the iterable to read from.
+            size: the max number of items to read in advance.
+            workers: the number of threads reading from the iterable.
+
+        Returns:
+            A generator yielding the items of the iterable.
+
+        Example:
+
+            >>> gen = prefetch((x * x for x in range(10)), size=3)
+            >>> list(gen)
+            [0, 1, 4, 9, 16, 25, 36, 49, 64, 81]
+    """
+    size = require_positive_number(size, 'size') or 1
+    workers = require_positive_number(workers, 'workers') or 1
+    return _prefetch(iter(iterable), size, workers)
+
+
+def _prefetch(iterator, size, workers):
+    # type: (Iterable, int, int) -> Iterable
+    buffer = queue.Queue(size)  # type: queue.Queue
+    stop = threading.Event()
+    reader = _SerializedReader(iterator)
+
+    for _ in range(workers):
+        thread = threading.Thread(target=_read_ahead,
+                                  args=(reader, buffer, stop))
+        thread.daemon = True
+        thread.start()
+
+    try:
+        for item in _in_order(buffer, workers):
+            yield item
+    finally:
+        stop.set()
+        _drain(buffer)
+
+
+class _SerializedReader(object):
+    """ Let several threads read from one iterator, one at a time.
+
+        Each item is returned with its position, so that the order can be
+        restored after the items went through several threads.
+    """
+
+    def __init__(self, iterator):
+        self.iterator = iterator
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.done = False
+
+    def read(self):
+        # type: () -> Any
+        """ Return (position, item), or None when there is nothing to read """
+        with self.lock:
+            if self.done:
+                return None
+            try:
+                item = next(self.iterator)
+            except StopIteration:
+                self.done = True
+                return None
+            except BaseException:
+                self.done = True
+                item = _Failure(sys.exc_info())
+            self.seq += 1
+            return self.seq - 1, item
+
+
+def _read_ahead(reader, buffer, stop):
+    # type: (_SerializedReader, queue.Queue, threading.Event) -> None
+    """ Move items from the reader to the queue until told to stop """
+    try:
+        while not stop.is_set():
+            entry = reader.read()
+            if entry is None or not _put(buffer, entry, stop):
+                break
+    finally:
+        _put(buffer, (None, _DONE), stop)
+
+
+def _in_order(buffer, workers):
+    # type: (queue.Queue, int) -> Iterable
+    """ Yield items from the queue in their original order.
+
+        Stops when all the workers put _DONE in the queue, and raises
+        again the exceptions they caught.
+    """
+    pending = {}
+    expected = 0
+    running = workers
+    while running:
+        seq, item = buffer.get()
+        if item is _DONE:
+            running -= 1
+            continue
+
+        pending[seq] = item
+        while expected in pending:
+            item = pending.pop(expected)
+            expected += 1
+            if isinstance(item, _Failure):
+                item.reraise()
+            yield item
+
+
+def _get(buffer, stop):
+    # type: (queue.Queue, threading.Event) -> Any
+    """ Get an item from the queue, or _DONE if we are asked to stop """
+    while not stop.is_set():
+        try:
+            return buffer.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            pass
+    return _DONE
+
+
+class SharedIterator(object):
+    """ An iterator that several threads can consume at the same time.
+
+        Generators raise "ValueError: generator already executing" when two
+        threads call next() on them at once. This one reads the underlying
+        iterator under a lock, `batch` items at a time, and keeps the items
+        of each batch in a buffer local to the thread that read them. The
+        lock is taken once per batch instead of once per item, which limits
+        contention, and lets throughput scale with the number of threads on
+        free-threaded Python.
+
+        Each item is given to exactly one thread. The order is preserved
+        within a batch, but not between threads.
+
+        If the underlying iterator raises an exception, the thread reading
+        it gets it, after the items it already read, and the iterator is
+        then exhausted for everybody.
+
+        .. WARNING::
+
+            Items buffered by a thread that stops iterating are not given to
+            the other threads. Use next_batch() if your threads may stop
+            early: it doesn't buffer anything.
+
+        Args:
+            iterable: the iterable to share.
+            batch: the number of items a thread reads at once.
+
+        Example:
+
+            >>> import threading
+            >>> shared = SharedIterator(range(1000), batch=10)
+            >>> results = []
+            >>> def work():
+            ...     results.extend(x * 2 for x in shared)
+            >>> threads = [threading.Thread(target=work) for _ in range(4)]
+            >>> for t in threads:
+            ...     t.start()
+            >>> for t in threads:
+            ...     t.join()
+            >>> len(results), sum(results)
+            (1000, 999000)
+    """
+
+    def __init__(self, iterable, batch=1):
+        # type: (Iterable, int) -> None
+        self.iterator = iter(iterable)
+        self.batch = require_positive_number(batch, 'batch') or 1
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.done = False
+
+    def next_batch(self, size=None):
+        # type: (int) -> list
+        """ Return a list of at most `size` items, empty when exhausted.
+
+            Args:
+                size: the max number of items. Default is `batch`.
+
+            Example:
+
+                >>> shared = SharedIterator(range(5))
+                >>> shared.next_batch(3), shared.next_batch(3)
+                ([0, 1, 2], [3, 4])
+                >>> shared.next_batch(3)
+                []
+        """
+        failure = getattr(self.local, 'failure', None)
+        if failure is not None:
+            self.local.failure = None
+            failure.reraise()
+
+        size = self.batch if size is None else size
+        items = []  # type: list
+        with self.lock:
+            if self.done:
+                return items
+            try:
+                for _ in range(size):
+                    items.append(next(self.iterator))
+            except StopIteration:
+                self.done = True
+            except BaseException:
+                self.done = True
+                if not items:
+                    raise
+                # raised on the next call, after the items already read
+                self.local.failure = _Failure(sys.exc_info())
+        return items
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        buffer = getattr(self.local, 'buffer', None)
+        if not buffer:
+            buffer = self.local.buffer = collections.deque(self.next_batch())
+            if not buffer:
+                raise StopIteration
+        return buffer.popleft()
+
+    next = __next__
+
+    def __repr__(self):
+        return "<SharedIterator: batches of {}>".format(self.batch)
+
+
+StageStats = collections.namedtuple('StageStats', [
+    'name', 'workers', 'processed', 'rate', 'queue_size', 'queue_capacity'
+])
+
+
+class Stage(object):
+    """ One step of a Pipeline: a function applied by a pool of threads.
+
+        The stage reads items from its own bounded input queue, and writes
+        the results in the input queue of the next stage.
+    """
+
+    def __init__(self, func, workers=1, buffer=None, name=None):
+        # type: (Callable, int, int, str) -> None
+        self.func = func
+        self.workers = require_positive_number(workers, 'workers') or 1
+        buffer = require_positive_number(buffer or self.workers * 2, 'buffer')
+        self.input = queue.Queue(buffer)  # type: queue.Queue
+        self.name = name or getattr(func, '__name__', repr(func))
+        self.processed = 0
+        self.running = 0
+        self.lock = threading.Lock()
+
+    def start(self, output, stop):
+        # type: (queue.Queue, threading.Event) -> None
+        self.running = self.workers
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self.work, args=(output, stop))
+            thread.daemon = True
+            thread.start()
+
+    def work(self, output, stop):
+        # type: (queue.Queue, threading.Event) -> None
+        try:
+            while True:
+                item = _get(self.input, stop)
+                if item is _DONE:
+                    # let the other workers of this stage see it too
+                    _put(self.input, _DONE, stop)
+                    break
+
+                if not isinstance(item, _Failure):
+                    try:
+                        item = self.func(item)
+                    except Exception:
+                        item = _Failure(sys.exc_info())
+
+                with self.lock:
+                    self.processed += 1
+
+                if not _put(output, item, stop):
+                    break
+        finally:
+            with self.lock:
+                self.running -= 1
+                last = not self.running
+            # only the last worker tells the next stage we are done
+            if last:
+                _put(output, _DONE, stop)
+
+    def stats(self, elapsed):
+        # type: (float) -> StageStats
+        rate = self.processed / elapsed if elapsed else 0.0
+        return StageStats(self.name, self.workers, self.processed, rate,
+                          self.input.qsize(), self.input.maxsize)
+
+    def __repr__(self):
+        return "<Stage {!r}: {} workers>".format(self.name, self.workers)
+
+
+class Pipeline(object):
+    """ Chain of functions, each running in its own pool of threads.
+
+        Stages are connected by bounded queues: a slow stage makes the
+        previous ones wait instead of letting them fill the memory, and
+        a stage blocked on I/O doesn't stop the others from working.
+
+        The source is read in a thread as well. Threads are started when you
+        start iterating, and stopped when you stop, even early.
+
+        If a stage has more than one worker, results can come out of order.
+
+        Exceptions raised by the functions are passed along the pipeline
+        and raised again when you reach the faulty item.
+
+        Args:
+            iterable: the source of the items.
+
+        Example:
+
+            >>> pipeline = Pipeline(range(10)).stage(str, workers=3)
+            >>> pipeline = pipeline.stage(lambda x: x * 2)
+            >>> sorted(pipeline, key=int)
+            ['00', '11', '22', '33', '44', '55', '66', '77', '88', '99']
+            >>> [(s.name, s.processed) for s in pipeline.stats()]
+            [('str', 10), ('<lambda>', 10)]
+    """
+
+    def __init__(self, iterable):
+        # type: (Iterable) -> None
+        self.source = iterable
+        self.stages = []  # type: list
+        self.started = None  # type: float
+        self._results = None  # type: Iterable
+
+    def stage(self, func, workers=1, buffer=None, name=None):
+        # type: (Callable, int, int, str) -> Pipeline
+        """ Add a step applying `func` to each item.
+
+            Args:
+                func: the callable to apply to each item.
+                workers: the number of threads calling `func`.
+                buffer: how many items can wait for this stage. Default is
+                        twice the number of workers.
+                name: the name of the stage in stats(). Default is the name
+                      of the function.
+
+            Returns:
+                The pipeline, to allow chaining.
+
+            Raises:
+                RuntimeError: if the pipeline already started.
+        """
+        if self.started is not None:
+            raise RuntimeError("You can't add a stage to a pipeline that "
+                               "already started.")
+        self.stages.append(Stage(func, workers, buffer, name))
+        return self
+
+    def copy(self):
+        # type: () -> Pipeline
+        """ Return a pipeline with the same source and stages, not started.
+
+            Example:
+
+                >>> pipeline = Pipeline(range(3)).stage(str)
+                >>> longer = pipeline.copy().stage(len)
+                >>> list(pipeline), longer
+                (['0', '1', '2'], <Pipeline: str -> len>)
+        """
+        pipeline = self.__class__(self.source)
+        for stage in self.stages:
+            pipeline.stage(stage.func, stage.workers, stage.input.maxsize,
+                           stage.name)
+        return pipeline
+
+    def stats(self):
+        # type: () -> list
+        """ Return a StageStats for each stage.
+
+            Each of them contains the name of the stage, its number of
+            workers, the number of items it processed, its throughput in
+            items per second since the pipeline started, and the number of
+            items currently waiting in its input queue, with the max size of
+            this queue.
+        """
+        elapsed = 0.0
+        if self.started is not None:
+            elapsed = time.time() - self.started
+        return [stage.stats(elapsed) for stage in self.stages]
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        # threads are started on the first call, not by iter()
+        if self.started is None:
+            self.started = time.time()
+            self._results = self._run()
+        return next(self._results)
+
+    next = __next__  # Python 2 compat
+
+    def close(self):
+        # type: () -> None
+        """ Stop all the threads of the pipeline """
+        if self.started is not None:
+            self._results.close()
+
+    def _run(self):
+        # type: () -> Iterable
+        stop = threading.Event()
+        output = queue.Queue(self.stages[-1].workers * 2 if self.stages else 1)
+
+        queues = [stage.input for stage in self.stages] + [output]
+        for stage, next_queue in zip(self.stages, queues[1:]):
+            stage.start(next_queue, stop)
+
+        feeder = threading.Thread(target=self._feed, args=(queues[0], stop))
+        feeder.daemon = True
+        feeder.start()
+
+        try:
+            while True:
+                item = output.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, _Failure):
+                    item.reraise()
+                yield item
+        finally:
+            stop.set()
+            for buffer in queues:
+                _drain(buffer)
+
+    def _feed(self, buffer, stop):
+        # type: (queue.Queue, threading.Event) -> None
+        """ Move items from the source to the first queue """
+        try:
+            for item in self.source:
+                if not _put(buffer, item, stop):
+                    return
+        except Exception:
+            _put(buffer, _Failure(sys.exc_info()), stop)
+        _put(buffer, _DONE, stop)
+
+    def __repr__(self):
+        return "<Pipeline: {}>".format(
+            " -> ".join(stage.name for stage in self.stages)
+        )
+
+
+# Pools of processes are expensive to start, so we keep them around and
+# reuse them for all the calls asking for the same number of workers.
+_POOLS = {}  # type: dict
+_POOLS_LOCK = threading.Lock()
+
+
+def get_pool(workers=None):
+    # type: (int) -> multiprocessing.pool.Pool
+    """ Return a long lived pool of `workers` processes.
+
+        The pool is created on the first call, then reused. All pools are
+        closed when the program exits, or when you call shutdown_pools().
+
+        Args:
+            workers: the number of processes. Default is the number of CPU.
+
+        Returns:
+            A multiprocessing.Pool.
+    """
+    workers = require_positive_number(workers or multiprocessing.cpu_count(),
+                                      'workers') or 1
+    with _POOLS_LOCK:
+        pool = _POOLS.get(workers)
+        if pool is None:
+            pool = _POOLS[workers] = multiprocessing.Pool(workers)
+        return pool
+
+
+@atexit.register
+def shutdown_pools():
+    # type: () -> None
+    """ Stop all the pools of processes created by get_pool() """
+    with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            pool.terminate()
+            pool.join()
+        _POOLS.clear()
+
+
+def dumps(values):
+    # type: (list) -> tuple
+    """ Serialize a list with marshal if possible, else with pickle.
+
+        marshal only supports builtin types, but is much faster than pickle
+        for them.
+
+        Returns:
+            ('m', data) for marshal, ('p', data) for pickle.
+    """
+    try:
+        return 'm', marshal.dumps(values)
+    except ValueError:
+        return 'p', pickle.dumps(values, pickle.HIGHEST_PROTOCOL)
+
+
+def loads(kind, data):
+    # type: (str, bytes) -> list
+    """ Deserialize data from dumps() """
+    if kind == 'm':
+        return marshal.loads(data)
+    return pickle.loads(data)
+
+
+def _process_batch(func, kind, data):
+    # type: (Callable, str, bytes) -> tuple
+    """ Run in the workers: apply func to a batch and time it """
+    start = time.time()
+    results = [func(item) for item in loads(kind, data)]
+    kind, data = dumps(results)
+    return kind, data, time.time() - start
+
+
+class _BatchSizer(object):
+    """ Choose batch sizes so that each batch takes about `target` seconds
+
+        Batches that are too small spend their time in serialization and
+        inter process communication, batches that are too big make the
+        workers wait for each other and hold more memory.
+    """
+
+    def __init__(self, batch=None, target=0.05, max_size=10000):
+        # type: (int, float, int) -> None
+        self.fixed = batch
+        self.size = batch or 1
+        self.target = target
+        self.max_size = max_size
+
+    def update(self, items, duration):
+        # type: (int, float) -> None
+        if self.fixed or not items:
+            return
+        if duration <= 0:
+            ideal = self.size * 2
+        else:
+            ideal = int(self.target / (duration / items))
+        # don't change too fast, a single slow item should not matter much
+        ideal = max(self.size // 2, min(ideal, self.size * 2))
+        self.size = max(1, min(ideal, self.max_size))
+
+
+def process_map(func, iterable, workers=None, batch=None, target=0.05):
+    # type: (Callable, Iterable, int, int, float) -> Iterable
+    """ Like map(), but func is applied in a pool of processes.
+
+        Threads don't speed up CPU bound Python code because of the GIL,
+        processes do. To avoid paying the price of inter process
+        communication for each item, items are sent by batches, serialized
+        with marshal when they contain only builtin types, or pickle
+        otherwise.
+
+        By default, the size of the batches adapts so that each one takes
+        about `target` seconds to process. The pool of processes is reused
+        between calls.
+
+        Results are yielded in order, as soon as they are ready, and only a
+        few batches are sent in advance, so memory stays bounded.
+
+        .. WARNING::
+
+            `func` must be picklable, which means it must be defined at the
+            top level of a module: lambdas or nested functions won't work.
+
+        Args:
+            func: the callable to apply to each item.
+            iterable: the items to process.
+            workers: the number of processes. Default is the number of CPU.
+            batch: a fixed number of items per batch. Default is to adapt
+                   the size automatically.
+            target: the duration, in seconds, of a batch when adapting the
+                    size automatically.
+
+        Returns:
+            A generator yielding func(item) for each item.
+
+        Example:
+
+            >>> list(process_map(abs, range(-3, 3), workers=2))
+            [3, 2, 1, 0, 1, 2]
+    """
+    workers = require_positive_number(workers or multiprocessing.cpu_count(),
+                                      'workers') or 1
+    if batch is not None:
+        batch = require_positive_number(batch, 'batch') or 1
+    sizer = _BatchSizer(batch, target)
+    # enough batches to keep all the workers busy while we read the results
+    return _process_map(get_pool(workers), func, iter(iterable), sizer,
+                        workers * 2)
+
+
+def _process_map(pool, func, iterator, sizer, max_pending):
+    # type: (Any, Callable, Iterable, _BatchSizer, int) -> Iterable
+    pending = collections.deque()  # type: collections.deque
+    while True:
+        while len(pending) < max_pending:
+            items = list(itertools.islice(iterator, sizer.size))
+            if not items:
+                break
+            args = (func,) + dumps(items)
+            pending.append((len(items), pool.apply_async(_process_batch,
+                                                         args)))
+
+        if not pending:
+            return
+
+        count, result = pending.popleft()
+        kind, data, duration = result.get()
+        sizer.update(count, duration)
+        for item in loads(kind, data):
+            yield item
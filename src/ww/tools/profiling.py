@@ -0,0 +1,470 @@
+# coding: utf-8
+
+"""
+    Tools to find out where the time goes in a chain of iterables.
+
+    A chain of g() calls is a chain of anonymous generators, each pulling
+    items from the previous one: a regular profiler only sees a lot of
+    calls to next(). A Profiler wraps each stage of the chain in a probe
+    that counts its items and measures the time spent in it.
+
+    Some operations, such as sorted() or groupby(), also have to hold items
+    in memory. Within a track_memory() block, they report how many items
+    and roughly how many bytes they buffered, and can be stopped before
+    they eat all the memory of the machine.
+
+    Nothing is measured, and nothing costs anything, unless you ask for it
+    with g().profile() or track_memory().
+
+    Example:
+
+        >>> from ww import g
+        >>> gen = g(range(100)).profile(output=False)
+        >>> gen.map(str).skip_duplicates(len).list()
+        ['0', '10']
+        >>> [(stage.name, stage.items) for stage in gen.profiler.report()]
+        [('source', 100), ('map', 100), ('skip_duplicates', 2)]
+
+    You'll find bellow the detailed documentation for each functions.
+    Go have a look, there is some great stuff here!
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import sys
+import time
+import contextlib
+import collections
+
+import ww
+
+from ww.types import Iterable, Any  # noqa
+
+try:
+    timer = time.perf_counter
+    cpu_timer = time.process_time
+except AttributeError:  # pragma: no cover
+    timer = time.time
+    cpu_timer = time.clock
+
+StageReport = collections.namedtuple('StageReport', [
+    'name', 'items', 'wall', 'cpu', 'own_wall', 'own_cpu', 'rate'
+])
+
+StageReport.__doc__ = """ What a stage did, times being in seconds.
+
+    `wall` and `cpu` include the time spent in the previous stages, while
+    `own_wall` and `own_cpu` only count the time spent in this stage. The
+    bottleneck is the stage with the biggest `own_wall`.
+
+    `rate` is the number of items this stage produced per second.
+"""
+
+
+class _StageStats(object):
+
+    __slots__ = ('name', 'items', 'wall', 'cpu', 'own_wall', 'own_cpu')
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.wall = self.cpu = self.own_wall = self.own_cpu = 0.0
+
+
+class StageProbe(object):
+    """ Iterator measuring the time spent getting each item of another one.
+
+        The time spent in the probes of the previous stages, which are
+        called from this one, is subtracted to get the own time of the
+        stage.
+    """
+
+    __slots__ = ('iterator', 'stats', 'profiler')
+
+    def __init__(self, iterator, stats, profiler):
+        # type: (Iterable, _StageStats, Profiler) -> None
+        self.iterator = iterator
+        self.stats = stats
+        self.profiler = profiler
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        stats = self.stats
+        nested = self.profiler.nested
+        # time spent in the probes called while we get our item
+        nested.append([0.0, 0.0])
+        wall, cpu = timer(), cpu_timer()
+        done = False
+        try:
+            item = next(self.iterator)
+        except StopIteration:
+            done = True
+        finally:
+            wall, cpu = timer() - wall, cpu_timer() - cpu
+            inner_wall, inner_cpu = nested.pop()
+            stats.wall += wall
+            stats.cpu += cpu
+            stats.own_wall += wall - inner_wall
+            stats.own_cpu += cpu - inner_cpu
+            if nested:
+                nested[-1][0] += wall
+                nested[-1][1] += cpu
+        if done:
+            self.profiler.stage_done(stats)
+            raise StopIteration
+        stats.items += 1
+        return item
+
+    next = __next__
+
+
+class Profiler(object):
+    """ Collect the stats of each stage of a chain of iterables.
+
+        Probes are not thread safe: don't profile stages that run in other
+        threads, such as with prefetch() or stage().
+
+        Args:
+            output: a file to write the report to once the last stage is
+                    exhausted. Default is sys.stderr. False to not write it.
+    """
+
+    def __init__(self, output=None):
+        # type: (Any) -> None
+        self.output = output
+        self.stages = []  # type: list
+        self.nested = []  # type: list
+        self.reported = False
+
+    def probe(self, iterator, name):
+        # type: (Iterable, str) -> StageProbe
+        """ Return an iterator measuring `iterator` as a new stage """
+        stats = _StageStats(name if self.stages else 'source')
+        self.stages.append(stats)
+        return StageProbe(iterator, stats, self)
+
+    def stage_done(self, stats):
+        # type: (_StageStats) -> None
+        """ Write the report when the last stage is exhausted """
+        if self.reported or stats is not self.stages[-1]:
+            return
+        self.reported = True
+        if self.output is not False:
+            output = sys.stderr if self.output is None else self.output
+            output.write(format_report(self.report()) + '\n')
+
+    def report(self):
+        # type: () -> list
+        """ Return a list of StageReport, from the source to the last stage.
+
+            You can call it anytime, even if the iteration is not over.
+        """
+        return [
+            StageReport(stats.name, stats.items, stats.wall, stats.cpu,
+                        stats.own_wall, stats.own_cpu,
+                        stats.items / stats.wall if stats.wall else 0.0)
+            for stats in self.stages
+        ]
+
+    def __repr__(self):
+        return "<Profiler: {} stages>".format(len(self.stages))
+
+
+def format_report(report):
+    # type: (Iterable[StageReport]) -> str
+    """ Format a profiling report as a table.
+
+        Args:
+            report: the StageReport of each stage.
+
+        Returns:
+            The table, as a string.
+
+        Example:
+
+            >>> print(format_report([
+            ...     StageReport('source', 10, 0.5, 0.25, 0.5, 0.25, 20),
+            ...     StageReport('map', 10, 2.5, 2.25, 2, 2, 4),
+            ... ]))
+              # stage              items  own wall (s)  own cpu (s)  items/s
+              1 source                10         0.500        0.250       20
+              2 map                   10         2.000        2.000        4
+    """
+    lines = ['{:>3} {:<16} {:>7} {:>13} {:>12} {:>8}'.format(
+        '#', 'stage', 'items', 'own wall (s)', 'own cpu (s)', 'items/s'
+    )]
+    for i, stage in enumerate(report, 1):
+        lines.append('{:>3} {:<16} {:>7} {:>13.3f} {:>12.3f} {:>8.0f}'.format(
+            i, stage.name[:16], stage.items, stage.own_wall, stage.own_cpu,
+            stage.rate
+        ))
+    return '\n'.join(lines)
+
+
+class ProfiledMixin(object):
+    """ Mixin for wrappers whose new instances get profiled.
+
+        Each time a method creates a new wrapper, its iterator is wrapped in
+        a probe named after the method. `profiler` is set on subclasses.
+    """
+
+    profiler = None  # type: Profiler
+
+    def __init__(self, iterable, *args, **kwargs):
+        super(ProfiledMixin, self).__init__(iterable, *args, **kwargs)
+        name = sys._getframe(1).f_code.co_name
+        self.iterator = self.profiler.probe(self.iterator, name)
+
+
+def profiled(cls, profiler):
+    # type: (type, Profiler) -> type
+    """ Return a subclass of `cls` whose instances are profiled """
+    name = str('Profiled' + cls.__name__)
+    return type(name, (ProfiledMixin, cls), {'profiler': profiler})
+
+
+# What holding one more item costs in a list, a set or a deque, besides the
+# item itself: roughly one pointer, plus some slack.
+SLOT_SIZE = 16
+
+BufferStats = collections.namedtuple('BufferStats', [
+    'operation', 'peak_items', 'peak_bytes'
+])
+
+
+class MemoryLimitExceeded(MemoryError):
+    """ An operation buffered more than the limit given to track_memory() """
+
+
+class Buffer(object):
+    """ Count the items an operation holds in memory, and their size.
+
+        Sizes are approximations: sys.getsizeof() of each item, which doesn't
+        include the objects it refers to, plus SLOT_SIZE.
+
+        Args:
+            operation: the name of the operation, used in reports.
+            limit: the max number of bytes to hold, or None.
+            maxlen: if set, the buffer only keeps the last `maxlen` items,
+                    like a deque.
+    """
+
+    def __init__(self, operation, limit=None, maxlen=None):
+        # type: (str, int, int) -> None
+        self.operation = operation
+        self.limit = limit
+        self.maxlen = maxlen
+        self.sizes = collections.deque() if maxlen else None
+        self.items = self.bytes = 0
+        self.peak_items = self.peak_bytes = 0
+
+    def add(self, item):
+        # type: (Any) -> None
+        """ Account for one more item held """
+        size = sys.getsizeof(item) + SLOT_SIZE
+        self.items += 1
+        self.bytes += size
+        if self.sizes is not None:
+            self.sizes.append(size)
+            if self.items > self.maxlen:
+                self.items -= 1
+                self.bytes -= self.sizes.popleft()
+        self._update_peak()
+
+    def set(self, items, nbytes):
+        # type: (int, int) -> None
+        """ Set the number of items held and their size """
+        self.items = items
+        self.bytes = nbytes
+        self._update_peak()
+
+    def hold(self, iterable):
+        # type: (Iterable) -> Iterable
+        """ Yield the items of the iterable, accounting for each of them """
+        for item in iterable:
+            self.add(item)
+            yield item
+
+    def _update_peak(self):
+        # type: () -> None
+        if self.items > self.peak_items:
+            self.peak_items = self.items
+        if self.bytes > self.peak_bytes:
+            self.peak_bytes = self.bytes
+            if self.limit is not None and self.bytes > self.limit:
+                raise MemoryLimitExceeded(ww.s >> """
+                    {}() buffered {} items, about {} bytes, which is more
+                    than the limit of {} bytes given to track_memory().
+                    Reduce the size of the data before this step (e.g: by
+                    filtering or slicing it), or process it by chunks.
+                """.format(self.operation, self.items, self.bytes,
+                           self.limit))
+
+    def __repr__(self):
+        return "<Buffer of {}(): {} items, ~{} bytes>".format(
+            self.operation, self.items, self.bytes
+        )
+
+
+class MemoryTracker(object):
+    """ Collect the buffers of the operations run in a track_memory() block.
+
+        Args:
+            limit: the max number of bytes a single operation may buffer, or
+                   None for no limit.
+    """
+
+    def __init__(self, limit=None):
+        # type: (int) -> None
+        self.limit = limit
+        self.buffers = []  # type: list
+
+    def buffer(self, operation, maxlen=None):
+        # type: (str, int) -> Buffer
+        """ Return a new Buffer to account for what `operation` holds """
+        buffer = Buffer(operation, self.limit, maxlen)
+        self.buffers.append(buffer)
+        return buffer
+
+    def report(self):
+        # type: () -> list
+        """ Return the BufferStats of each operation, in call order """
+        return [
+            BufferStats(buffer.operation, buffer.peak_items,
+                        buffer.peak_bytes)
+            for buffer in self.buffers
+        ]
+
+    @property
+    def peak_bytes(self):
+        # type: () -> int
+        """ The biggest peak of all the operations """
+        return max([buffer.peak_bytes for buffer in self.buffers] or [0])
+
+    def __repr__(self):
+        return "<MemoryTracker: {} buffers>".format(len(self.buffers))
+
+
+_TRACKERS = []  # type: list
+
+
+@contextlib.contextmanager
+def track_memory(limit=None):
+    # type: (int) -> Iterable[MemoryTracker]
+    """ Account for the items buffered by g() operations in this block.
+
+        sorted(), groupby(), tee(), lasts(), negative indexing, substraction
+        and skip_duplicates() have to hold items in memory. Inside this
+        block, each call records the peak number of items it held, and
+        roughly how many bytes they used.
+
+        The tracker is global: operations running in other threads are
+        accounted too. Outside of the block, nothing is measured.
+
+        Args:
+            limit: if set, raise MemoryLimitExceeded, a subclass of
+                   MemoryError, as soon as an operation holds more than
+                   this number of bytes.
+
+        Returns:
+            A MemoryTracker. Call report() on it to get a BufferStats for
+            each operation.
+
+        Example:
+
+            >>> from ww import g
+            >>> with track_memory() as tracker:
+            ...     g(range(1000)).sorted().lasts(3).list()
+            [997, 998, 999]
+            >>> [(s.operation, s.peak_items) for s in tracker.report()]
+            [('sorted', 1000), ('lasts', 3)]
+            >>> try:
+            ...     with track_memory(limit=1000):
+            ...         g(range(1000)).sorted().list()
+            ... except MemoryError as e:
+            ...     print(e.__class__.__name__)
+            MemoryLimitExceeded
+    """
+    tracker = MemoryTracker(limit)
+    _TRACKERS.append(tracker)
+    try:
+        yield tracker
+    finally:
+        _TRACKERS.remove(tracker)
+
+
+class AccountedSet(object):
+    """ Proxy to a set, or anything with add() and `in`, accounting for
+        the items added to it.
+    """
+
+    def __init__(self, container, buffer):
+        # type: (Any, Buffer) -> None
+        self.container = container
+        self.buffer = buffer
+
+    def __contains__(self, item):
+        return item in self.container
+
+    def add(self, item):
+        # type: (Any) -> None
+        self.container.add(item)
+        self.buffer.add(item)
+
+
+def accounted_set(container, operation):
+    # type: (Any, str) -> Any
+    """ Return an AccountedSet on the container if memory is tracked, or
+        the container itself.
+    """
+    buffer = memory_buffer(operation)
+    if buffer is None:
+        return container
+    return AccountedSet(container, buffer)
+
+
+class _TeeAccounting(object):
+    """ Account for the items tee() holds for its slowest copy """
+
+    def __init__(self, num, buffer):
+        # type: (int, Buffer) -> None
+        self.positions = [0] * num
+        self.sizes = collections.deque()  # type: collections.deque
+        self.first = 0  # position of the first item in `sizes`
+        self.buffer = buffer
+
+    def copy(self, index, iterator):
+        # type: (int, Iterable) -> Iterable
+        positions = self.positions
+        sizes = self.sizes
+        for item in iterator:
+            positions[index] += 1
+            if positions[index] > self.first + len(sizes):
+                sizes.append(sys.getsizeof(item) + SLOT_SIZE)
+                self.buffer.set(len(sizes), self.buffer.bytes + sizes[-1])
+            slowest = min(positions)
+            while self.first < slowest:
+                self.first += 1
+                self.buffer.set(len(sizes) - 1,
+                                self.buffer.bytes - sizes.popleft())
+            yield item
+
+
+def account_tee(copies, buffer):
+    # type: (Iterable[Iterable], Buffer) -> list
+    """ Wrap the copies returned by itertools.tee() to account for the items
+        they buffer.
+    """
+    copies = list(copies)
+    accounting = _TeeAccounting(len(copies), buffer)
+    return [accounting.copy(i, copy) for i, copy in enumerate(copies)]
+
+
+def memory_buffer(operation, maxlen=None):
+    # type: (str, int) -> Buffer
+    """ Return a Buffer for the operation, or None if nothing is tracked """
+    if not _TRACKERS:
+        return None
+    return _TRACKERS[-1].buffer(operation, maxlen)
@@ -0,0 +1,365 @@
+# coding: utf-8
+
+"""
+    Numeric batches stored in shared memory, to send to other processes
+    without copying them.
+
+    Sending a list of floats to another process means pickling it, copying
+    the bytes through a pipe, then unpickling it. With a SharedArray, the
+    numbers are written once in a block of shared memory, and only the name
+    of the block is sent. Workers read and write the same memory.
+
+    Blocks are recycled by a SharedMemoryPool, so creating batches in a loop
+    doesn't create a new block of shared memory every time.
+
+    This requires Python 3.8+.
+
+    Example:
+
+        >>> from ww.tools.sharedmem import SharedMemoryPool
+        >>> with SharedMemoryPool() as pool:
+        ...     batch = pool.array([1.5, 2.5, 3.5])
+        ...     print(batch.tolist(), sum(batch))
+        ...     batch.release()
+        [1.5, 2.5, 3.5] 7.5
+
+    You'll find bellow the detailed documentation for each functions.
+    Go have a look, there is some great stuff here!
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import atexit
+import weakref
+import itertools
+import threading
+import collections
+
+from array import array
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:  # pragma: no cover
+    shared_memory = None
+
+import ww
+
+from ww.types import Iterable, Any  # noqa
+from ww.utils import require_positive_number
+
+# Blocks smaller than this are rounded up to it, so they are easier to reuse.
+MIN_BLOCK_SIZE = 4096
+
+# The number of blocks a worker process keeps mapped, to avoid mapping
+# the same recycled blocks again and again.
+ATTACHED_CACHE_SIZE = 64
+
+
+def _size_class(nbytes):
+    # type: (int) -> int
+    """ Round up to the next power of 2 so that blocks can be recycled """
+    size = MIN_BLOCK_SIZE
+    while size < nbytes:
+        size *= 2
+    return size
+
+
+def _require_shared_memory():
+    # type: () -> None
+    if shared_memory is None:  # pragma: no cover
+        raise RuntimeError(ww.s >> """
+            Shared memory is only available in Python 3.8 and above.
+            Use regular lists or tuples instead.
+        """)
+
+
+class SharedMemoryPool(object):
+    """ Recycle blocks of shared memory.
+
+        Released blocks are kept to be reused for the next batch of a
+        similar size, instead of being destroyed.
+
+        All the blocks, used or not, are destroyed when you call close(), or
+        at the end of a `with` block. Arrays still using them become
+        invalid.
+
+        Example:
+
+            >>> with SharedMemoryPool() as pool:
+            ...     a = pool.array(range(10), 'q')
+            ...     name = a.name
+            ...     a.release()
+            ...     b = pool.array(range(20), 'q')
+            ...     print(b.name == name)
+            True
+    """
+
+    def __init__(self):
+        _require_shared_memory()
+        self.free = collections.defaultdict(list)  # type: dict
+        self.blocks = {}  # type: dict
+        self.lock = threading.Lock()
+
+    def acquire(self, nbytes):
+        # type: (int) -> Any
+        """ Return a block of shared memory of at least `nbytes` bytes """
+        size = _size_class(nbytes)
+        with self.lock:
+            free = self.free[size]
+            if free:
+                return free.pop()
+
+        block = shared_memory.SharedMemory(create=True, size=size)
+        with self.lock:
+            self.blocks[block.name] = block
+        _OWNED[block.name] = block
+        return block
+
+    def release(self, block):
+        # type: (Any) -> None
+        """ Give a block back to the pool, so it can be reused """
+        with self.lock:
+            if block.name in self.blocks:
+                self.free[_size_class(block.size)].append(block)
+
+    def empty(self, length, typecode='d'):
+        # type: (int, str) -> SharedArray
+        """ Return a SharedArray of `length` items, with undefined values.
+
+            Args:
+                length: the number of items.
+                typecode: the type of the items, as in the array module.
+        """
+        length = require_positive_number(length, 'length')
+        itemsize = array(typecode).itemsize
+        block = self.acquire(length * itemsize)
+        return SharedArray(block, typecode, length, self)
+
+    def array(self, values, typecode='d'):
+        # type: (Iterable, str) -> SharedArray
+        """ Return a SharedArray containing these values.
+
+            Args:
+                values: an iterable of numbers.
+                typecode: the type of the items, as in the array module.
+        """
+        if not isinstance(values, array) or values.typecode != typecode:
+            values = array(typecode, values)
+        shared = self.empty(len(values), typecode)
+        if values:
+            shared.array[:] = memoryview(values)
+        return shared
+
+    def close(self):
+        # type: () -> None
+        """ Destroy all the blocks of the pool """
+        with self.lock:
+            blocks = list(self.blocks.values())
+            self.blocks.clear()
+            self.free.clear()
+
+        for block in blocks:
+            _OWNED.pop(block.name, None)
+            # arrays using this block would crash the process if used
+            for shared in list(_ARRAYS.pop(block.name, ())):
+                shared.invalidate()
+            _close_block(block)
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def __repr__(self):
+        return "<SharedMemoryPool: {} blocks>".format(len(self))
+
+
+class SharedArray(object):
+    """ A batch of numbers stored in shared memory.
+
+        It behaves like a read/write sequence of numbers. Pickling it, which
+        multiprocessing does when you send it to another process, only
+        serializes the name of the block: the other process maps the same
+        memory, and can read or modify the numbers in place.
+
+        Don't create it directly: use SharedMemoryPool.array() or
+        array_chunks().
+
+        Call release() when you are done with it, or use it as a context
+        manager, so the block can be reused.
+    """
+
+    def __init__(self, block, typecode, length, pool=None):
+        # type: (Any, str, int, SharedMemoryPool) -> None
+        self.block = block
+        self.typecode = typecode
+        self.length = length
+        self.pool = pool
+        itemsize = array(typecode).itemsize
+        self.array = block.buf[:length * itemsize].cast(typecode)
+        _ARRAYS.setdefault(block.name, weakref.WeakSet()).add(self)
+
+    @property
+    def name(self):
+        # type: () -> str
+        return self.block.name
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        return self.array[index]
+
+    def __setitem__(self, index, value):
+        self.array[index] = value
+
+    def __iter__(self):
+        return iter(self.array)
+
+    def tolist(self):
+        # type: () -> list
+        return self.array.tolist()
+
+    def numpy(self):
+        # type: () -> Any
+        """ Return a numpy array sharing the same memory. Requires numpy. """
+        import numpy
+        return numpy.frombuffer(self.array, dtype=self.typecode)
+
+    def invalidate(self):
+        # type: () -> bool
+        """ Stop using the memory. Return False if it was already done. """
+        if self.array is None:
+            return False
+        try:
+            self.array.release()
+        except BufferError:  # pragma: no cover
+            pass  # there is a numpy array on it, it will keep the memory
+        self.array = None
+        return True
+
+    def release(self):
+        # type: () -> None
+        """ Give the memory back to the pool. Don't use the array after. """
+        if self.invalidate() and self.pool is not None:
+            self.pool.release(self.block)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+    def __reduce__(self):
+        return attach, (self.name, self.typecode, self.length)
+
+    def __repr__(self):
+        return "<SharedArray {!r}: {} items of type '{}'>".format(
+            self.name, self.length, self.typecode
+        )
+
+
+# Blocks created in this process, so that we don't map them twice when
+# SharedArray objects come back from other processes.
+_OWNED = {}  # type: dict
+
+# Arrays using each block, so we can invalidate them when it's destroyed.
+_ARRAYS = {}  # type: dict
+
+# Blocks created by other processes, that we mapped.
+_ATTACHED = collections.OrderedDict()  # type: collections.OrderedDict
+
+
+def attach(name, typecode, length):
+    # type: (str, str, int) -> SharedArray
+    """ Return a SharedArray on a block created by another process.
+
+        This is called when unpickling a SharedArray. Releasing it does
+        nothing: the process that created the block owns it.
+    """
+    block = _OWNED.get(name) or _ATTACHED.pop(name, None)
+    if block is None:
+        block = _open_block(name)
+        while len(_ATTACHED) >= ATTACHED_CACHE_SIZE:
+            _close_block(_ATTACHED.popitem(last=False)[1])
+
+    if name not in _OWNED:
+        _ATTACHED[name] = block
+
+    return SharedArray(block, typecode, length)
+
+
+def _open_block(name):
+    # type: (str) -> Any
+    """ Map an existing block, without taking ownership of it """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # pragma: no cover
+        # Before Python 3.13, processes share the resource tracker of their
+        # parent, which already tracks the block, so it's not a problem.
+        return shared_memory.SharedMemory(name=name)
+
+
+def _close_block(block):
+    # type: (Any) -> None
+    try:
+        block.close()
+    except BufferError:  # pragma: no cover
+        pass  # an array still uses it, it will be unmapped when collected
+
+
+_DEFAULT_POOL = []  # type: list
+
+
+def default_pool():
+    # type: () -> SharedMemoryPool
+    """ Return the pool used when you don't pass one. Closed at exit. """
+    if not _DEFAULT_POOL:
+        _DEFAULT_POOL.append(SharedMemoryPool())
+        atexit.register(_DEFAULT_POOL[0].close)
+    return _DEFAULT_POOL[0]
+
+
+def array_chunks(iterable, size, typecode='d', pool=None):
+    # type: (Iterable, int, str, SharedMemoryPool) -> Iterable[SharedArray]
+    """ Yield the numbers of the iterable by chunks stored in shared memory.
+
+        Like chunks(), but each chunk is a SharedArray, that you can send
+        to other processes (e.g: with process_map()) without copying the
+        data.
+
+        Chunks are not released automatically, since other processes may
+        still be using them: call release() on them once you are done, or
+        close the pool.
+
+        Args:
+            iterable: the numbers to store.
+            size: the number of items per chunk.
+            typecode: the type of the items, as in the array module.
+            pool: the SharedMemoryPool to take memory from. Default is a
+                  pool closed when the program exits.
+
+        Example:
+
+            >>> with SharedMemoryPool() as pool:
+            ...     for chunk in array_chunks(range(5), 2, 'i', pool):
+            ...         print(chunk.tolist())
+            ...         chunk.release()
+            [0, 1]
+            [2, 3]
+            [4]
+    """
+    size = require_positive_number(size, 'size') or 1
+    if pool is None:
+        pool = default_pool()
+    iterator = iter(iterable)
+    while True:
+        values = array(typecode, itertools.islice(iterator, size))
+        if not values:
+            return
+        yield pool.array(values, typecode)
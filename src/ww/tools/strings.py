@@ -34,12 +34,19 @@
 from __future__ import absolute_import, division, print_function
 
 import re
+import codecs
 
 from past.builtins import basestring
 
+try:
+    from chardet import UniversalDetector
+except ImportError:  # chardet < 5
+    from chardet.universaldetector import UniversalDetector
+
 import ww
-from ww.utils import require_positive_number, ensure_tuple
-from ww.types import unicode, str_istr, str_istr_icallable, C, I  # noqa
+from ww.utils import require_positive_number, ensure_tuple, byte_view
+from ww.types import (unicode, str_istr, str_istr_icallable, C, I,  # noqa
+                      Union, Iterable, Any)  # noqa
 
 REGEX_FLAGS = {
     'm': re.MULTILINE,
@@ -53,6 +60,26 @@ REGEX_FLAGS = {
     'l': re.LOCALE,
 }
 
+# detect_encoding() feeds the detector with up to DETECTION_SAMPLES slices of
+# DETECTION_SAMPLE_SIZE bytes, spread over the data, instead of all of it.
+DETECTION_SAMPLE_SIZE = 64 * 1024
+DETECTION_SAMPLES = 8
+
+# UTF-8 is checked on blocks of this size, to not create a huge string.
+VALIDATION_BLOCK_SIZE = 1024 * 1024
+
+# Like the re module, we empty the cache when it gets too big instead of
+# tracking which source was used last.
+MAX_CACHED_ENCODINGS = 1024
+
+_ENCODINGS = {}  # type: dict
+
+# Size of the blocks of bytes iter_decode() reads from streams
+DECODE_BLOCK_SIZE = 1024 * 1024
+
+# Line boundaries, as for text files opened in universal newlines mode
+LINE_BREAKS = re.compile(u'\r\n|\r|\n')
+
 try:
     # Python2 doesn't support re.ASCII flag
     REGEX_FLAGS['a'] = re.ASCII
@@ -298,3 +325,345 @@ def multireplace(string,  # type: unicode
             break
 
     return string
+
+
+def _utf8_or_ascii(data):
+    # type: (memoryview) -> Union[str, None]
+    """ Return 'ascii' or 'utf-8' if data is valid for them, else None """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    is_ascii = True
+    size = len(data)
+    try:
+        for start in range(0, size, VALIDATION_BLOCK_SIZE):
+            block = data[start:start + VALIDATION_BLOCK_SIZE]
+            if not hasattr(block, 'cast'):  # pragma: no cover
+                # Python 2 decoders don't accept memoryviews
+                block = block.tobytes()
+            final = start + VALIDATION_BLOCK_SIZE >= size
+            # Only ASCII decodes to as many chars as bytes
+            decoded = decoder.decode(block, final)
+            is_ascii = is_ascii and len(decoded) == len(block)
+    except UnicodeDecodeError:
+        return None
+    return 'ascii' if is_ascii else 'utf-8'
+
+
+def _sample_offsets(size, sample_size, samples):
+    # type: (int, int, int) -> Iterable[int]
+    """ Return the start of each sample, evenly spread over the data """
+    if size <= sample_size * samples:
+        return range(0, size, sample_size)
+    step = (size - sample_size) // max(samples - 1, 1)
+    return range(0, step * samples, step)
+
+
+def _detect_with_samples(data, sample_size, samples):
+    # type: (memoryview, int, int) -> Union[str, None]
+    detector = UniversalDetector()
+    for offset in _sample_offsets(len(data), sample_size, samples):
+        detector.feed(data[offset:offset + sample_size].tobytes())
+        # The detector is done when it reached its confidence threshold
+        if detector.done:
+            break
+    detector.close()
+    encoding = detector.result['encoding']
+    return encoding.lower() if encoding else None
+
+
+def detect_encoding(data,  # type: Any
+                    source=None,  # type: Any
+                    sample_size=DETECTION_SAMPLE_SIZE,  # type: int
+                    samples=DETECTION_SAMPLES  # type: int
+                    ):  # type: (...) -> Union[str, None]
+    """ Guess the encoding of bytes, without reading all of them
+
+        First, we check if the data is ASCII or UTF-8, which is fast and
+        reliable. If it's not, chardet is fed with a few slices of the
+        data, spread from the start to the end, and stops as soon as it's
+        confident enough.
+
+        Args:
+            data: bytes, bytearray, memoryview or any buffer.
+            source: where the data comes from, such as a file path or an
+                    URL. If given, the encoding detected for this source is
+                    cached, and returned for the next data from the same
+                    source without looking at it.
+            sample_size: the size of each slice fed to chardet.
+            samples: the maximum number of slices fed to chardet.
+
+        Returns:
+            The name of the encoding, or None if it's unknown.
+
+        Example:
+
+            >>> from ww.tools.strings import detect_encoding
+            >>> detect_encoding(b'abc')
+            'ascii'
+            >>> detect_encoding(u'Père Noël'.encode('utf8'))
+            'utf-8'
+            >>> detect_encoding(u'Père Noël'.encode('utf16'))
+            'utf-16'
+    """
+    if source is not None and source in _ENCODINGS:
+        return _ENCODINGS[source]
+
+    data = byte_view(data)
+    sample_size = require_positive_number(sample_size, 'sample_size') or 1
+    encoding = _utf8_or_ascii(data)
+    if encoding is None:
+        encoding = _detect_with_samples(data, sample_size, samples)
+
+    if source is not None:
+        if len(_ENCODINGS) >= MAX_CACHED_ENCODINGS:
+            _ENCODINGS.clear()
+        _ENCODINGS[source] = encoding
+    return encoding
+
+
+def _detect_stream_encoding(block):
+    # type: (bytes) -> str
+    """ Guess the encoding of a stream from its first block """
+    try:
+        # Not final: the block can end in the middle of a character
+        codecs.getincrementaldecoder('utf-8')().decode(block)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        encoding = detect_encoding(block)
+    if encoding is None:
+        raise ValueError(ww.s >> """
+            Unable to detect the encoding of the stream. Pass it
+            explicitly, or try 'utf8' with errors='replace'.
+        """)
+    return encoding
+
+
+def iter_decode(stream,  # type: Any
+                encoding=None,  # type: str
+                errors='strict',  # type: str
+                block_size=DECODE_BLOCK_SIZE  # type: int
+                ):  # type: (...) -> Iterable[unicode]
+    """ Lazily decode a binary stream into chunks of text
+
+        Bytes are read by blocks and decoded with an incremental decoder
+        from the codecs module, which keeps the bytes of a character cut
+        at the end of a block until the next block. So the memory used
+        stays around block_size, whatever the size of the stream.
+
+        Args:
+            stream: a binary file-like object, with a read() method.
+            encoding: the encoding of the stream. If None, it's detected
+                      from the first block with detect_encoding().
+            errors: the policy to use when encountering error while trying
+                    to decode the text, as for bytes.decode().
+            block_size: the number of bytes read at once.
+
+        Returns:
+            A generator of decoded chunks of text, never empty.
+
+        Raises:
+            ValueError: if the encoding can't be detected.
+            UnicodeDecodeError: if the bytes can't be decoded, with
+                                errors='strict'.
+
+        Example:
+
+            >>> import io
+            >>> from ww.tools.strings import iter_decode
+            >>> stream = io.BytesIO(u'Père Noël'.encode('utf8'))
+            >>> print(u'|'.join(iter_decode(stream, 'utf8', block_size=3)))
+            Pè|re |No|ël
+    """
+    block_size = require_positive_number(block_size, 'block_size') or 1
+    return _iter_decode(stream, encoding, errors, block_size)
+
+
+def _iter_decode(stream, encoding, errors, block_size):
+    # type: (Any, str, str, int) -> Iterable[unicode]
+    read = stream.read
+    block = read(block_size)
+    if not isinstance(block, (bytes, bytearray, memoryview)):
+        raise TypeError(ww.s >> """
+            iter_decode() expects a binary stream, but read() returned
+            {}. Open the file in 'rb' mode.
+        """.format(type(block)))
+
+    if encoding is None:
+        encoding = _detect_stream_encoding(block)
+    decode = codecs.getincrementaldecoder(encoding)(errors).decode
+
+    while block:
+        text = decode(block)
+        if text:
+            yield text
+        block = read(block_size)
+
+    text = decode(b'', True)
+    if text:
+        yield text
+
+
+def iter_lines(chunks):
+    # type: (Iterable[unicode]) -> Iterable[unicode]
+    """ Lazily turn chunks of text into lines, keeping the line breaks
+
+        Lines can span several chunks. '\\n', '\\r\\n' and '\\r'
+        end a line, like for a text file opened in universal newlines mode,
+        even when a '\\r\\n' is cut between two chunks.
+
+        Args:
+            chunks: an iterable of strings.
+
+        Returns:
+            A generator of lines.
+
+        Example:
+
+            >>> from ww.tools.strings import iter_lines
+            >>> lines = iter_lines([u'a\\nb', u'c\\r', u'\\nd'])
+            >>> list(lines) == [u'a\\n', u'bc\\r\\n', u'd']
+            True
+    """
+    # Parts of the current line, joined once we find its end
+    parts = []  # type: list
+    for chunk in chunks:
+        start = 0
+        # A '\r' at the end of the previous chunk that is not followed by
+        # a '\n' is a line break by itself
+        if parts and parts[-1].endswith(u'\r') and chunk[:1] != u'\n':
+            yield u''.join(parts)
+            parts = []
+        for match in LINE_BREAKS.finditer(chunk):
+            end = match.end()
+            if end == len(chunk) and match.group() == u'\r':
+                break  # wait for the next chunk to see if it's a '\r\n'
+            parts.append(chunk[start:end])
+            yield u''.join(parts)
+            parts = []
+            start = end
+        if start < len(chunk):
+            parts.append(chunk[start:])
+    if parts:
+        yield u''.join(parts)
+
+
+def _read_chunks(stream, chunk_size):
+    # type: (Any, int) -> Iterable
+    read = stream.read
+    chunk = read(chunk_size)
+    while chunk:
+        yield chunk
+        chunk = read(chunk_size)
+
+
+def _join_separators(separators):
+    # type: (tuple) -> Any
+    """ Return one regex matching any of the separators """
+    if isinstance(separators[0], bytes):
+        return b'|'.join(b'(?:' + sep + b')' for sep in separators)
+    return u'|'.join(u'(?:' + sep + u')' for sep in separators)
+
+
+def _tokens(regex, text, final, skip_empty):
+    # type: (Any, Any, bool, bool) -> tuple
+    """ Return the tokens found in text, and the position after them
+
+        If final is False, a separator touching the end of the text is
+        not used, since it may be longer once we get the next chunk.
+    """
+    tokens = []
+    start = 0
+    for match in regex.finditer(text):
+        if match.end() == match.start():
+            continue  # splitting on nothing makes no sense for a stream
+        if not final and match.end() == len(text):
+            break
+        token = text[start:match.start()]
+        if token or not skip_empty:
+            tokens.append(token)
+        start = match.end()
+    return tokens, start
+
+
+def isplit(source, *separators, **kwargs):
+    # type: (Any, *Any, **Any) -> Iterable
+    """ Like multisplit(), but lazily, on a stream or on chunks of text
+
+        Text is read chunk by chunk, and only the end of the current chunk
+        that is not a complete token yet is kept for the next one. So
+        memory stays bounded, whatever the size of the text, as long as
+        tokens are not huge.
+
+        A separator matching at the very end of a chunk is not used until
+        the next chunk is read: a regex like '\\s+' could match more of
+        it.
+
+        Args:
+            source: a file-like object with a read() method, an iterable of
+                    chunks of text, or just a string. Chunks can be bytes
+                    if the separators are bytes too.
+            separators: strings you can split on. Each string can be a
+                        regex. Without separators, split on whitespaces and
+                        skip empty tokens, like str.split().
+            flags: flags you wish to pass if you use regexes, as for
+                   multisplit().
+            chunk_size: the number of characters read at once from a
+                        stream.
+
+        Returns:
+            A generator of tokens.
+
+        Example:
+
+            >>> from ww.tools.strings import isplit
+            >>> chunks = [u'fat, bl', u'ack;', u' cat']
+            >>> for token in isplit(chunks, u',', u'; *'):
+            ...     print(token)
+            fat
+             black
+            cat
+            >>> import io
+            >>> stream = io.StringIO(u'big   bad\\n dog')
+            >>> list(isplit(stream, chunk_size=4)) == [u'big', u'bad', u'dog']
+            True
+    """
+    flags = parse_re_flags(kwargs.get('flags', 0))
+    chunk_size = require_positive_number(kwargs.get('chunk_size',
+                                                    DECODE_BLOCK_SIZE),
+                                         'chunk_size') or 1
+    if hasattr(source, 'read'):
+        chunks = _read_chunks(source, chunk_size)
+    elif isinstance(source, (basestring, bytes)):
+        chunks = [source]
+    else:
+        chunks = source
+
+    pattern = _join_separators(separators) if separators else None
+    return _isplit(chunks, pattern, flags)
+
+
+def _isplit(chunks, pattern, flags):
+    # type: (Iterable, Any, int) -> Iterable
+    skip_empty = pattern is None
+    regex = tail = None
+    for chunk in chunks:
+        if not chunk:
+            continue
+        if tail is None:
+            tail = chunk[:0]
+            if pattern is None:
+                pattern = b'\\s+' if isinstance(chunk, bytes) else u'\\s+'
+            regex = re.compile(pattern, flags)
+        tail += chunk
+        tokens, start = _tokens(regex, tail, False, skip_empty)
+        for token in tokens:
+            yield token
+        tail = tail[start:]
+
+    if tail is None:
+        return
+
+    tokens, start = _tokens(regex, tail, True, skip_empty)
+    for token in tokens:
+        yield token
+    if tail[start:] or not skip_empty:
+        yield tail[start:]
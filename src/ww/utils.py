@@ -59,3 +59,15 @@ def renamed_argument(old_names, new_names):
             return func(*args, **kwargs)
         return decorated
     return decorator
+
+
+def byte_view(data):
+    """ Return a memoryview on the bytes of `data`, without copying them
+
+        Python 2 memoryviews can't be cast, but they only accept objects
+        such as bytes and bytearray, which are made of bytes already.
+    """
+    view = memoryview(data)
+    if hasattr(view, 'cast'):
+        return view.cast('B')
+    return view  # pragma: no cover
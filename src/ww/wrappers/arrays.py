@@ -0,0 +1,687 @@
+# coding: utf-8
+
+"""
+    ArrayWrapper is a wrapper for 1 dimension arrays of numbers, with some
+    numpy like properties: element-wise arithmetic, reductions and boolean
+    masks, all chainable.
+
+    If numpy is installed, the numbers are stored in a numpy array, and
+    operations are vectorized. If not, they are stored in an array.array,
+    and operations loop over the numbers in C when possible, with map().
+
+    Both backends give the same numbers: integers wrap around when they
+    overflow their type, and dividing by zero gives inf, nan or 0 with a
+    RuntimeWarning instead of raising an exception. The type of the
+    results can differ though:
+
+    - numpy keeps the type of the operands, e.g: adding two arrays of 'B'
+      gives 'B', wrapping around at 256. The array backend computes
+      arithmetic with two arrays or an array and a number on 64 bits: 'q'
+      for integers, 'd' for floats.
+    - integers to a negative power give floats with the array backend, and
+      raise a ValueError with numpy.
+
+    Example:
+
+        Import::
+
+            >>> from ww import a
+
+        You always have the more explicit import at your disposal::
+
+            >>> from ww.wrappers.arrays import ArrayWrapper
+
+        `a` is just an alias of ArrayWrapper, but it's what most people
+        will want to use most of the time. Hence it's what we will use in the
+        examples.
+
+        Basic usages::
+
+            >>> prices = a([10, 20, 30, 40])
+            >>> prices
+            a([10, 20, 30, 40])
+            >>> (prices * 2 + 1).tolist()
+            [21, 41, 61, 81]
+            >>> prices.sum(), prices.mean()
+            (100, 25.0)
+            >>> prices[prices > 15]
+            a([20, 30, 40])
+            >>> prices[(prices > 15) & (prices < 35)].tolist()
+            [20, 30]
+
+        It's iterable, so it works with g() and friends::
+
+            >>> from ww import g
+            >>> g(prices).map(str).join(',')
+            u'10,20,30,40'
+
+    Numbers are never copied when they already are in a buffer: wrapping an
+    array.array, a numpy array, a memoryview or the chunks yielded by
+    g().array_chunks() shares their memory. Lists, tuples and other
+    iterables are copied, since their numbers are Python objects.
+
+    You'll find bellow the detailed documentation for each method of
+    ArrayWrapper. Go have a look, there is some great stuff here!
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import math
+import array
+import builtins
+import numbers
+import operator
+import warnings
+import itertools
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import ww
+
+from ww.tools.sharedmem import SharedArray
+from ww.types import Union, Iterable, Callable, Any  # noqa
+
+# The array typecodes we can store without copying, '?' being for booleans
+TYPECODES = 'bBhHiIlLqQfd?'
+FLOAT_TYPECODES = 'fd'
+INT_TYPECODES = 'bhilqBHILQ'
+
+# The typecode we report for integers of each size, so that both backends
+# agree, e.g: numpy uses 'l' for 64 bits integers, the array module 'q'.
+SIGNED_TYPECODES = {1: 'b', 2: 'h', 4: 'i', 8: 'q'}
+UNSIGNED_TYPECODES = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+
+BACKENDS = ('numpy', 'array')
+
+# How many numbers are converted to Python objects at once when iterating
+# on a numpy array.
+ITER_BLOCK_SIZE = 4096
+
+
+def _is_numpy(value):
+    # type: (Any) -> bool
+    return numpy is not None and isinstance(value, numpy.ndarray)
+
+
+def _infer_typecode(values):
+    # type: (list) -> str
+    """ Return the smallest typecode that can hold all these numbers """
+    if all(isinstance(x, bool) for x in values):
+        return '?' if values else 'd'
+    if all(isinstance(x, numbers.Integral) for x in values):
+        return 'q'
+    if all(isinstance(x, numbers.Real) for x in values):
+        return 'd'
+    raise TypeError(ww.s >> """
+        a() only accepts real numbers and booleans, but got {!r}.
+    """.format(values[:10]))
+
+
+def _pure_array(values, typecode=None):
+    # type: (Iterable, str) -> Union[array.array, memoryview]
+    """ Store the numbers in an array.array, or a memoryview for booleans """
+    if typecode is None:
+        values = values if isinstance(values, list) else list(values)
+        typecode = _infer_typecode(values)
+    if typecode == '?':
+        return memoryview(array.array('B', values)).cast('?')
+    return array.array(typecode, values)
+
+
+def _canonical_typecode(typecode, itemsize):
+    # type: (str, int) -> str
+    """ Return the same typecode for all the integer types of a size """
+    if typecode in 'bhilq':
+        return SIGNED_TYPECODES.get(itemsize, typecode)
+    if typecode in 'BHILQ':
+        return UNSIGNED_TYPECODES.get(itemsize, typecode)
+    return typecode
+
+
+def _wrap_around(values, typecode):
+    # type: (list, str) -> list
+    """ Make integers fit in typecode, keeping the lowest bits like numpy """
+    bits = array.array(typecode).itemsize * 8
+    mask = (1 << bits) - 1
+    if typecode.isupper():
+        return [x & mask for x in values]
+    half = 1 << (bits - 1)
+    return [((x + half) & mask) - half for x in values]
+
+
+def _store(values, typecode):
+    # type: (Iterable, str) -> Union[array.array, memoryview]
+    """ Like _pure_array(), but integers wrap around on overflow """
+    values = values if isinstance(values, list) else list(values)
+    try:
+        return _pure_array(values, typecode)
+    except OverflowError:
+        if typecode not in INT_TYPECODES:
+            raise
+        return _pure_array(_wrap_around(values, typecode), typecode)
+
+
+def _nan_or_inf(x, y):
+    # type: (float, float) -> float
+    """ Return x / y when y is 0, as IEEE 754 does """
+    if not x or x != x:
+        return float('nan')
+    return math.copysign(float('inf'), x) * math.copysign(1, y)
+
+
+# What numpy returns instead of raising ZeroDivisionError, for each
+# operation, for integer and float results
+DIVIDED_BY_ZERO = {
+    operator.truediv: (_nan_or_inf, _nan_or_inf),
+    operator.floordiv: (lambda x, y: 0, _nan_or_inf),
+    operator.mod: (lambda x, y: 0, lambda x, y: float('nan')),
+}
+
+
+def _zero_safe(op, is_float):
+    # type: (Callable, bool) -> Callable
+    """ Return op, not raising ZeroDivisionError, like numpy """
+    on_zero = DIVIDED_BY_ZERO[op][is_float]
+
+    def safe(x, y):
+        try:
+            return op(x, y)
+        except ZeroDivisionError:
+            return on_zero(x, y)
+    return safe
+
+
+def _pure_buffer(values, typecode):
+    # type: (Any, str) -> Union[array.array, memoryview]
+    """ Use the memory of a buffer, or copy it if we can't """
+    view = memoryview(values)
+    if view.ndim != 1:
+        raise TypeError(ww.s >> """
+            a() only accepts one dimension arrays, but got {} dimensions.
+            Use l.build() for matrices.
+        """.format(view.ndim))
+    fmt = view.format
+    if fmt in TYPECODES and typecode in (None, fmt):
+        return view
+    if fmt == 'B' and typecode in TYPECODES:
+        if view.nbytes % array.array(typecode).itemsize == 0:
+            return view.cast(typecode)
+    return _pure_array(view.tolist(), typecode)
+
+
+def _as_pure(values, typecode=None):
+    # type: (Any, str) -> Union[array.array, memoryview]
+    if isinstance(values, array.array):
+        if typecode in (None, values.typecode):
+            return values
+        return array.array(typecode, values)
+    try:
+        memoryview(values)
+    except TypeError:
+        return _pure_array(values, typecode)
+    return _pure_buffer(values, typecode)
+
+
+def _as_numpy(values, typecode=None):
+    # type: (Any, str) -> Any
+    if isinstance(values, array.array):
+        values = numpy.frombuffer(values, dtype=values.typecode)
+    elif not _is_numpy(values):
+        try:
+            values = numpy.asarray(memoryview(values))
+        except TypeError:
+            if not isinstance(values, (list, tuple)):
+                values = list(values)
+            values = numpy.array(values, dtype=typecode)
+
+    if values.ndim != 1 or values.dtype.char not in TYPECODES:
+        raise TypeError(ww.s >> """
+            a() only accepts one dimension arrays of real numbers and
+            booleans, but got {} dimensions of type '{}'.
+        """.format(values.ndim, values.dtype))
+
+    if typecode is not None and values.dtype != numpy.dtype(typecode):
+        values = values.astype(typecode)
+    return values
+
+
+def _check_backend(backend):
+    # type: (str) -> str
+    if backend is None:
+        return 'array' if numpy is None else 'numpy'
+    if backend not in BACKENDS:
+        raise ValueError(ww.s >> """
+            backend must be one of {}, not {!r}.
+        """.format(BACKENDS, backend))
+    if backend == 'numpy' and numpy is None:
+        raise ImportError(ww.s >> """
+            The numpy backend requires numpy. Install it with
+            "pip install numpy", or use backend='array'.
+        """)
+    return backend
+
+
+class ArrayWrapper(object):
+    """ A chainable array of numbers, vectorized with numpy if available.
+
+        Args:
+            values: an iterable of numbers. Buffers such as array.array,
+                    numpy arrays, memoryviews and the chunks of
+                    g().array_chunks() are used without copy.
+            typecode: the type of the numbers, as in the array module: 'q'
+                      for integers, 'd' for floats, '?' for booleans, etc.
+                      Default is guessed from the values.
+            backend: 'numpy' or 'array'. Default is 'numpy' if it's
+                     installed.
+
+        Example:
+
+            >>> import array
+            >>> from ww import a
+            >>> numbers = array.array('d', [1.5, 2.5])
+            >>> doubled = a(numbers) * 2
+            >>> doubled
+            a([3.0, 5.0])
+            >>> doubled.typecode
+            'd'
+            >>> a(numbers)[0] = 10
+            >>> numbers  # the memory is shared
+            array('d', [10.0, 2.5])
+    """
+
+    __hash__ = None  # type: ignore  # == is element-wise
+
+    def __init__(self, values=(), typecode=None, backend=None):
+        # type: (Any, str, str) -> None
+        if isinstance(values, ArrayWrapper):
+            backend = backend or values.backend
+            values = values.data
+        elif isinstance(values, SharedArray):
+            values = values.array
+
+        if typecode is not None and typecode not in TYPECODES:
+            raise ValueError(ww.s >> """
+                typecode must be one of '{}', not {!r}.
+            """.format(TYPECODES, typecode))
+
+        self.backend = _check_backend(backend)
+        if self.backend == 'numpy':
+            self.data = _as_numpy(values, typecode)
+        else:
+            self.data = _as_pure(values, typecode)
+
+    def _new(self, values, typecode=None):
+        # type: (Any, str) -> ArrayWrapper
+        return self.__class__(values, typecode, self.backend)
+
+    @property
+    def typecode(self):
+        # type: () -> str
+        """ The type of the numbers, as in the array module
+
+            Integers are reported with the same typecode for each size,
+            whatever the backend: 'b', 'h', 'i' and 'q' for 1, 2, 4 and 8
+            bytes, and their uppercase for unsigned ones.
+        """
+        if self.backend == 'numpy':
+            dtype = self.data.dtype
+            return _canonical_typecode(dtype.char, dtype.itemsize)
+        typecode = getattr(self.data, 'typecode', None)
+        if typecode is None:
+            typecode = self.data.format
+        return _canonical_typecode(typecode, self.data.itemsize)
+
+    @property
+    def len(self):
+        # type: () -> int
+        """ Return the number of items
+
+            Example:
+
+                >>> from ww import a
+                >>> a([1, 2, 3]).len
+                3
+        """
+        return len(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        """ Yield the numbers as Python objects """
+        if self.backend != 'numpy':
+            return iter(self.data)
+        return self._iter_numpy()
+
+    def _iter_numpy(self):
+        # type: () -> Iterable
+        for start in range(0, len(self.data), ITER_BLOCK_SIZE):
+            for value in self.data[start:start + ITER_BLOCK_SIZE].tolist():
+                yield value
+
+    def __getitem__(self, index):
+        # type: (Any) -> Any
+        """ Return a number, or an array for a slice or a boolean mask.
+
+            Example:
+
+                >>> from ww import a
+                >>> numbers = a([1, 2, 3, 4])
+                >>> numbers[-1]
+                4
+                >>> numbers[1:3]
+                a([2, 3])
+                >>> numbers[[True, False, True, False]]
+                a([1, 3])
+        """
+        if isinstance(index, numbers.Integral):
+            value = self.data[index]
+            return value.item() if self.backend == 'numpy' else value
+
+        if isinstance(index, slice):
+            return self._new(self.data[index])
+
+        return self._masked(index)
+
+    def _masked(self, mask):
+        # type: (Any) -> ArrayWrapper
+        if isinstance(mask, ArrayWrapper):
+            mask = mask.data
+        if len(mask) != len(self):
+            raise IndexError(ww.s >> """
+                The boolean mask has {} items, but the array has {}. They
+                must have the same size.
+            """.format(len(mask), len(self)))
+
+        if self.backend == 'numpy':
+            return self._new(self.data[numpy.asarray(mask, dtype=bool)])
+
+        values = itertools.compress(self.data, mask)
+        return self._new(_pure_array(values, self.typecode))
+
+    def __setitem__(self, index, value):
+        # type: (Union[int, slice], Any) -> None
+        if isinstance(index, slice) and self.backend != 'numpy':
+            size = len(range(*index.indices(len(self))))
+            if isinstance(value, numbers.Number):
+                value = itertools.repeat(value, size)
+            value = _pure_array(value, self.typecode)
+        self.data[index] = value
+
+    def _binary(self, op, other, reverse=False, typecode=None):
+        # type: (Callable, Any, bool, str) -> ArrayWrapper
+        """ Apply op on each number and other, or each number of other """
+        if isinstance(other, ArrayWrapper):
+            other = other.data
+        elif not isinstance(other, numbers.Number):
+            if not hasattr(other, '__len__'):
+                return NotImplemented
+
+        if self.backend == 'numpy' or _is_numpy(other):
+            data = numpy.asarray(self.data)
+            if not isinstance(other, numbers.Number):
+                other = numpy.asarray(other)
+            result = op(other, data) if reverse else op(data, other)
+            return self.__class__(result, None, 'numpy')
+
+        return self._binary_pure(op, other, reverse, typecode)
+
+    def _binary_pure(self, op, other, reverse, typecode):
+        # type: (Callable, Any, bool, str) -> ArrayWrapper
+        if isinstance(other, numbers.Number):
+            others = itertools.repeat(other)  # type: Iterable
+            is_float = isinstance(other, float)
+        else:
+            self._check_size(other)
+            others = other
+            code = getattr(other, 'typecode', getattr(other, 'format', 'q'))
+            is_float = code in FLOAT_TYPECODES
+        is_float = is_float or self.typecode in FLOAT_TYPECODES
+
+        args = (others, self.data) if reverse else (self.data, others)
+        try:
+            values = list(map(op, *args))
+        except ZeroDivisionError:
+            if op not in DIVIDED_BY_ZERO:
+                raise
+            values = list(map(_zero_safe(op, is_float), *args))
+            warnings.warn('divide by zero encountered in {}'.format(
+                op.__name__), RuntimeWarning, stacklevel=3)
+
+        if typecode is None:
+            typecode = 'd' if is_float else 'q'
+        try:
+            return self._new(_store(values, typecode))
+        except TypeError:
+            # integers to a negative power give floats
+            return self._new(_pure_array(values, 'd'))
+
+    def _check_size(self, other):
+        # type: (Any) -> None
+        if len(other) != len(self):
+            raise ValueError(ww.s >> """
+                Can't combine an array of {} items with one of {} items.
+                They must have the same size.
+            """.format(len(self), len(other)))
+
+    def __add__(self, other):
+        return self._binary(operator.add, other)
+
+    def __radd__(self, other):
+        return self._binary(operator.add, other, reverse=True)
+
+    def __sub__(self, other):
+        return self._binary(operator.sub, other)
+
+    def __rsub__(self, other):
+        return self._binary(operator.sub, other, reverse=True)
+
+    def __mul__(self, other):
+        return self._binary(operator.mul, other)
+
+    def __rmul__(self, other):
+        return self._binary(operator.mul, other, reverse=True)
+
+    def __truediv__(self, other):
+        return self._binary(operator.truediv, other, typecode='d')
+
+    def __rtruediv__(self, other):
+        return self._binary(operator.truediv, other, True, 'd')
+
+    __div__ = __truediv__
+    __rdiv__ = __rtruediv__
+
+    def __floordiv__(self, other):
+        return self._binary(operator.floordiv, other)
+
+    def __rfloordiv__(self, other):
+        return self._binary(operator.floordiv, other, reverse=True)
+
+    def __mod__(self, other):
+        return self._binary(operator.mod, other)
+
+    def __pow__(self, other):
+        return self._binary(operator.pow, other)
+
+    def __rpow__(self, other):
+        return self._binary(operator.pow, other, reverse=True)
+
+    def __eq__(self, other):
+        return self._binary(operator.eq, other, typecode='?')
+
+    def __ne__(self, other):
+        return self._binary(operator.ne, other, typecode='?')
+
+    def __lt__(self, other):
+        return self._binary(operator.lt, other, typecode='?')
+
+    def __le__(self, other):
+        return self._binary(operator.le, other, typecode='?')
+
+    def __gt__(self, other):
+        return self._binary(operator.gt, other, typecode='?')
+
+    def __ge__(self, other):
+        return self._binary(operator.ge, other, typecode='?')
+
+    def __and__(self, other):
+        return self._binary(operator.and_, other, typecode=self._bitwise())
+
+    def __or__(self, other):
+        return self._binary(operator.or_, other, typecode=self._bitwise())
+
+    def _bitwise(self):
+        # type: () -> str
+        return '?' if self.typecode == '?' else None
+
+    def _unary(self, op):
+        # type: (Callable) -> ArrayWrapper
+        """ Apply op on each number, keeping the typecode, like numpy """
+        if self.backend == 'numpy':
+            return self._new(op(self.data))
+        return self._new(_store(map(op, self.data), self.typecode))
+
+    def __invert__(self):
+        if self.typecode == '?' and self.backend != 'numpy':
+            return self._new(_pure_array(map(operator.not_, self.data), '?'))
+        return self._unary(operator.invert)
+
+    def __neg__(self):
+        if self.typecode == '?':
+            raise TypeError(ww.s >> """
+                Can't negate an array of booleans, use ~ instead.
+            """)
+        return self._unary(operator.neg)
+
+    def __abs__(self):
+        return self._unary(abs)
+
+    def _reduce(self, name, func):
+        # type: (str, Callable) -> Any
+        if not len(self):
+            raise ValueError(ww.s >> """
+                Can't compute the {} of an empty array.
+            """.format(name))
+        if self.backend == 'numpy':
+            return getattr(self.data, name)().item()
+        return func(self.data)
+
+    def sum(self):
+        # type: () -> Union[int, float]
+        """ Return the sum of the numbers, 0 for an empty array
+
+            Example:
+
+                >>> from ww import a
+                >>> a([1, 2, 3]).sum()
+                6
+        """
+        if self.backend == 'numpy':
+            return self.data.sum().item()
+        return sum(self.data)
+
+    def min(self):
+        # type: () -> Union[int, float]
+        """ Return the smallest number
+
+            Raises:
+                ValueError: if the array is empty.
+        """
+        return self._reduce('min', min)
+
+    def max(self):
+        # type: () -> Union[int, float]
+        """ Return the biggest number
+
+            Raises:
+                ValueError: if the array is empty.
+        """
+        return self._reduce('max', max)
+
+    def mean(self):
+        # type: () -> float
+        """ Return the arithmetic mean of the numbers
+
+            Raises:
+                ValueError: if the array is empty.
+
+            Example:
+
+                >>> from ww import a
+                >>> a([1, 2, 3, 4]).mean()
+                2.5
+        """
+        return self._reduce('mean', lambda data: self.sum() / len(data))
+
+    def std(self):
+        # type: () -> float
+        """ Return the standard deviation of the numbers, as numpy does
+
+            Raises:
+                ValueError: if the array is empty.
+
+            Example:
+
+                >>> from ww import a
+                >>> a([2, 4, 4, 4, 5, 5, 7, 9]).std()
+                2.0
+        """
+        def std(data):
+            mean = self.mean()
+            return math.sqrt(sum((x - mean) ** 2 for x in data) / len(data))
+        return self._reduce('std', std)
+
+    def any(self):
+        # type: () -> bool
+        """ Return True if at least one number is not 0 """
+        if self.backend == 'numpy':
+            return bool(self.data.any())
+        return any(self.data)
+
+    def all(self):
+        # type: () -> bool
+        """ Return True if no number is 0 """
+        if self.backend == 'numpy':
+            return bool(self.data.all())
+        return all(self.data)
+
+    def map(self, callable, typecode=None):
+        # type: (Callable, str) -> ArrayWrapper
+        """ Apply callable to each number, in Python, and return an array
+
+            This is slow: use arithmetic operators when you can.
+
+            Example:
+
+                >>> from ww import a
+                >>> a([1, 4, 9]).map(lambda x: x ** 0.5)
+                a([1.0, 2.0, 3.0])
+        """
+        return self._new(_pure_array(builtins.map(callable, self), typecode))
+
+    def tolist(self):
+        # type: () -> list
+        """ Return the numbers in a list """
+        return self.data.tolist()
+
+    def to_l(self):
+        # type: () -> ww.l
+        """ Return the numbers in a ListWrapper """
+        return ww.l(self.data.tolist())
+
+    def numpy(self):
+        # type: () -> Any
+        """ Return a numpy array. It shares the memory when possible. """
+        if numpy is None:
+            raise ImportError('This method requires numpy')
+        return numpy.asarray(self.data)
+
+    def __repr__(self):
+        if len(self) > 20:
+            head = repr(self[:10].tolist())[:-1]
+            tail = repr(self[-10:].tolist())[1:]
+            return 'a({}, ..., {})'.format(head, tail)
+        return 'a({!r})'.format(self.tolist())
@@ -1,13 +1,452 @@
+# coding: utf-8
+
 """
-    Wrapper for bytes
+    BytesWrapper gives access to binary data without copying it, with the
+    same feel as s().
+
+    It works on bytes, bytearray, mmap, memoryview, or anything supporting
+    the buffer protocol, by keeping a memoryview on it. Slicing, splitting
+    it or iterating on its lines returns other wrappers sharing the same
+    memory. Only replace() creates new bytes.
+
+    It needs Python 3: Python 2 memoryviews can't be cast to bytes, give
+    strings when you index them, and can't be searched with regexes.
+
+    Example:
+
+        Import::
+
+            >>> from ww import b
+
+        You always have the more explicit import at your disposal::
+
+            >>> from ww.wrappers.bytes import BytesWrapper
+
+        `b` is just an alias of BytesWrapper, but it's what most people
+        will want to use most of the time. Hence it's what we will use in the
+        examples.
+
+        Basic usages::
+
+            >>> packet = b(b'GET /index.html HTTP/1.1\\r\\nHost: foo\\r\\n')
+            >>> packet.startswith(b'POST', b'GET')
+            True
+            >>> packet.lines().map(bytes).list()
+            [b'GET /index.html HTTP/1.1', b'Host: foo']
+            >>> packet.split(b' ', b'\\r\\n', maxsplit=2).map(bytes).list()
+            [b'GET', b'/index.html', b'HTTP/1.1\\r\\nHost: foo\\r\\n']
+            >>> packet[:3].decode()
+            u'GET'
+
+        It also reads binary records::
+
+            >>> from ww.tools.binary import pack_many
+            >>> data = b(pack_many('<HH', [(1, 2), (3, 4), (5, 6)]))
+            >>> data.iter_unpack('<HH').list()
+            [(1, 2), (3, 4), (5, 6)]
+            >>> data[4:].unpack('<HH')
+            (3, 4)
+
+    You'll find bellow the detailed documentation for each method of
+    BytesWrapper.
 """
 
-# unpack
+from __future__ import absolute_import, division, print_function
+
+import re
+import itertools
+
+import ww
+
+from ww.tools import binary
+from ww.tools.strings import multireplace, parse_re_flags
+from ww.utils import require_positive_number
+from ww.types import Union, Iterable, Any  # noqa
+
+# Like the re module, we empty the cache when it gets too big instead of
+# tracking which pattern was used last.
+MAX_CACHED_PATTERNS = 512
+
+_PATTERNS = {}  # type: dict
+
+# Line boundaries, as for bytes.splitlines()
+LINE_BREAKS = re.compile(b'\r\n|\r|\n')
+WHITESPACES = re.compile(br'\s+')
+NON_WHITESPACE = re.compile(br'\S')
+TRAILING_WHITESPACES = re.compile(br'\s*\Z')
+
+
+def _prefixes(prefixes):
+    # type: (tuple) -> Iterable[Any]
+    """ Accept prefixes as arguments, or as one tuple of prefixes """
+    if len(prefixes) == 1 and isinstance(prefixes[0], (tuple, list)):
+        return prefixes[0]
+    return prefixes
+
+
+def _as_pattern(sub):
+    # type: (Any) -> bytes
+    """ Return the bytes of a buffer, or of a byte value, escaped
+
+        Like for bytes, an int is a byte value, not a number of bytes.
+    """
+    if isinstance(sub, int):
+        if not 0 <= sub < 256:
+            raise ValueError('byte must be in range(0, 256)')
+        return re.escape(bytes(bytearray((sub,))))
+    return memoryview(sub).tobytes()
+
+
+def _compile(pattern, flags=0):
+    # type: (bytes, int) -> Any
+    """ Compile a regex, cached """
+    try:
+        return _PATTERNS[pattern, flags]
+    except KeyError:
+        if len(_PATTERNS) >= MAX_CACHED_PATTERNS:
+            _PATTERNS.clear()
+        compiled = _PATTERNS[pattern, flags] = re.compile(pattern, flags)
+        return compiled
+
+
+class BytesWrapper(object):
+    """ Zero copy wrapper around a buffer of bytes """
+
+    __slots__ = ('view',)
+
+    def __init__(self, data=b''):
+        # type: (Any) -> None
+        """ Wrap `data`, which must support the buffer protocol
+
+            Args:
+                data: bytes, bytearray, mmap, memoryview, another
+                      BytesWrapper...
+
+            Example:
+
+                >>> from ww.wrappers.bytes import BytesWrapper
+                >>> BytesWrapper(b'abc')
+                BytesWrapper(b'abc')
+                >>> BytesWrapper(bytearray(b'abc')).view.readonly
+                False
+        """
+        if isinstance(data, BytesWrapper):
+            data = data.view
+        view = memoryview(data)
+        if not hasattr(view, 'cast'):  # pragma: no cover
+            raise RuntimeError(ww.s >> """
+                b() is only available in Python 3. Use bytes or bytearray
+                instead, or ww.tools.binary to unpack records.
+            """)
+        self.view = view.cast('B')
+
+    def __len__(self):
+        return len(self.view)
+
+    @property
+    def len(self):
+        # type: () -> int
+        """ Return the number of bytes """
+        return len(self.view)
+
+    def __getitem__(self, index):
+        # type: (Union[int, slice]) -> Union[int, BytesWrapper]
+        """ Get one byte, as an int, or a wrapper on a slice, not a copy
+
+            Example:
+
+                >>> from ww.wrappers.bytes import BytesWrapper
+                >>> data = BytesWrapper(b'abcdef')
+                >>> data[0]
+                97
+                >>> data[1:3]
+                BytesWrapper(b'bc')
+        """
+        if isinstance(index, slice):
+            return self.__class__(self.view[index])
+        return self.view[index]
+
+    def __iter__(self):
+        return iter(self.view)
+
+    def __bytes__(self):
+        return self.view.tobytes()
+
+    def tobytes(self):
+        # type: () -> bytes
+        """ Copy the data in a bytes object """
+        return self.view.tobytes()
+
+    def __eq__(self, other):
+        if isinstance(other, BytesWrapper):
+            other = other.view
+        try:
+            return self.view == memoryview(other).cast('B')
+        except TypeError:
+            return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None  # type: ignore
+
+    def release(self):
+        # type: () -> None
+        """ Stop using the memory of the wrapped object
+
+            Call this before closing a mmap you wrapped.
+        """
+        self.view.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+    def _boundaries(self, pattern, maxsplit=0):
+        # type: (Any, int) -> Iterable[tuple]
+        """ Yield the (start, end) of the parts between pattern matches """
+        start = 0
+        matches = pattern.finditer(self.view)
+        if maxsplit:
+            matches = itertools.islice(matches, maxsplit)
+        for match in matches:
+            yield start, match.start()
+            start = match.end()
+        yield start, len(self.view)
+
+    def split(self, *separators, **kwargs):
+        # type: (*bytes, **Any) -> ww.g
+        """ Like bytes.split, but accept several separators and regexes
+
+            The parts are views on the wrapped memory, not copies.
+
+            Args:
+                separators: bytes you can split on. Each one can be a regex.
+                            An int is a byte value, matched as is.
+                            Without separators, split on whitespaces and
+                            skip the empty parts, like bytes.split().
+                maxsplit: max number of time you wish to split. default is
+                          0, which means no limit.
+                flags: flags you wish to pass if you use regexes, as for
+                       s().split().
+
+            Returns:
+                A g() of BytesWrapper.
+
+            Example:
+
+                >>> from ww import b
+                >>> data = b(b'a,b;c/d')
+                >>> data.split(b',', b';', b'[/=]').map(bytes).list()
+                [b'a', b'b', b'c', b'd']
+                >>> b(b'  fat  cat ').split().map(bytes).list()
+                [b'fat', b'cat']
+        """
+        flags = parse_re_flags(kwargs.get('flags', 0))
+        maxsplit = require_positive_number(kwargs.get('maxsplit', 0),
+                                           'maxsplit')
+        if not separators:
+            stripped = self.strip()
+            if not stripped.len:
+                return ww.g([])
+            return stripped._split(WHITESPACES, maxsplit)
+        pattern = b'|'.join(b'(?:' + _as_pattern(separator) + b')'
+                            for separator in separators)
+        return self._split(_compile(pattern, flags), maxsplit)
+
+    def _split(self, pattern, maxsplit=0):
+        # type: (Any, int) -> ww.g
+        parts = self._boundaries(pattern, maxsplit)
+        return ww.g(self[start:end] for start, end in parts)
+
+    def strip(self):
+        # type: () -> BytesWrapper
+        """ Return a view without the whitespaces at both ends
+
+            Example:
+
+                >>> from ww import b
+                >>> b(b' abc  ').strip()
+                BytesWrapper(b'abc')
+        """
+        first = NON_WHITESPACE.search(self.view)
+        if first is None:
+            return self[:0]
+        end = TRAILING_WHITESPACES.search(self.view, first.start()).start()
+        return self[first.start():end]
+
+    def lines(self, keepends=False):
+        # type: (bool) -> ww.g
+        """ Iterate on the lines, as views on the wrapped memory
+
+            Lines end with '\\n', '\\r\\n' or '\\r', like with
+            bytes.splitlines().
+
+            Args:
+                keepends: keep the line breaks at the end of the lines.
+
+            Returns:
+                A g() of BytesWrapper.
+
+            Example:
+
+                >>> from ww import b
+                >>> data = b(b'foo\\r\\nbar\\nbaz')
+                >>> data.lines().map(bytes).list()
+                [b'foo', b'bar', b'baz']
+                >>> data.lines(keepends=True).map(bytes).list()
+                [b'foo\\r\\n', b'bar\\n', b'baz']
+        """
+        return ww.g(self._lines(keepends))
+
+    def _lines(self, keepends):
+        # type: (bool) -> Iterable[BytesWrapper]
+        start = 0
+        for match in LINE_BREAKS.finditer(self.view):
+            yield self[start:match.end() if keepends else match.start()]
+            start = match.end()
+        if start < len(self.view):
+            yield self[start:]
+
+    def startswith(self, *prefixes):
+        # type: (*bytes) -> bool
+        """ Return True if the data starts with any of the prefixes
+
+            Args:
+                prefixes: bytes or any buffer, or one tuple of them.
+
+            Example:
+
+                >>> from ww import b
+                >>> b(b'GET /').startswith(b'POST', b'GET')
+                True
+                >>> b(b'GET /').startswith((b'PUT', b'POST'))
+                False
+        """
+        view = self.view
+        for prefix in _prefixes(prefixes):
+            prefix = memoryview(prefix).cast('B')
+            if view[:len(prefix)] == prefix:
+                return True
+        return False
+
+    def endswith(self, *suffixes):
+        # type: (*bytes) -> bool
+        """ Return True if the data ends with any of the suffixes
+
+            Example:
+
+                >>> from ww import b
+                >>> b(b'foo.tar.gz').endswith(b'.zip', b'.gz')
+                True
+        """
+        view = self.view
+        for suffix in _prefixes(suffixes):
+            suffix = memoryview(suffix).cast('B')
+            start = len(view) - len(suffix)
+            if start >= 0 and view[start:] == suffix:
+                return True
+        return False
+
+    def replace(self, patterns, substitutions, maxreplace=0, flags=0):
+        # type: (Any, Any, int, Any) -> BytesWrapper
+        """ Like bytes.replace() but accept several substitutions and regexes
+
+            This creates new bytes, since the size changes.
+
+            Args:
+                patterns: bytes, or an iterable of bytes to be replaced.
+                substitutions: bytes or an iterable of bytes to use as a
+                               replacement, or a callable, as with
+                               s().replace().
+                maxreplace: the max number of replacement to make. 0 is no
+                            limit, which is the default.
+                flags: flags you wish to pass if you use regexes, as for
+                       s().replace().
+
+            Returns:
+                A BytesWrapper of the new bytes.
+
+            Raises:
+                ValueError: if you pass the wrong number of substitution.
+
+            Example:
+
+                >>> from ww import b
+                >>> b(b'a,b;c').replace((b',', b';'), b'-')
+                BytesWrapper(b'a-b-c')
+                >>> b(b'a1b22').replace(b'[0-9]+', b'', maxreplace=1)
+                BytesWrapper(b'ab22')
+        """
+        result = multireplace(self.view, patterns, substitutions, maxreplace,
+                              flags)
+        return self.__class__(result)
+
+    def __contains__(self, sub):
+        # type: (Any) -> bool
+        """ Like for bytes, `sub` can be bytes, any buffer, or a byte value
+
+            Example:
+
+                >>> from ww import b
+                >>> b'bc' in b(b'abc'), 97 in b(b'abc'), 0 in b(b'abc')
+                (True, True, False)
+        """
+        if isinstance(sub, int):
+            pattern = _as_pattern(sub)
+        else:
+            pattern = re.escape(memoryview(sub).tobytes())
+        return _compile(pattern).search(self.view) is not None
+
+    def decode(self, encoding='utf8', errors='strict'):
+        # type: (str, str) -> ww.s
+        """ Decode the data to a s()
+
+            Example:
+
+                >>> from ww import b
+                >>> b('é'.encode('utf8')).decode()
+                u'\\xe9'
+        """
+        return ww.s(str(self.view, encoding, errors))
+
+    def unpack(self, fmt, offset=0, fields=None):
+        # type: (Any, int, Iterable[str]) -> ww.t
+        """ Unpack one record, following a struct format
+
+            See ww.tools.binary.unpack() for the details.
+
+            Example:
+
+                >>> from ww.wrappers.bytes import BytesWrapper
+                >>> BytesWrapper(b'\\x01\\x02').unpack('BB', fields='xy')
+                Record(x=1, y=2)
+        """
+        return binary.unpack(fmt, self.view, offset, fields)
+
+    def iter_unpack(self, fmt, offset=0, count=None, fields=None):
+        # type: (Any, int, int, Iterable[str]) -> ww.g
+        """ Lazily unpack the records following a struct format
+
+            Records are read directly from the wrapped memory. See
+            ww.tools.binary.iter_unpack() for the details.
 
-# decode
+            Returns:
+                A g() of t() or of records.
 
-# detect encoding
+            Example:
 
-# help with text mixed with bytes
+                >>> from ww.wrappers.bytes import BytesWrapper
+                >>> data = BytesWrapper(b'\\x01\\x02\\x03\\x04')
+                >>> data.iter_unpack('>H').list()
+                [(258,), (772,)]
+                >>> data.iter_unpack('B', offset=1, count=2).list()
+                [(2,), (3,)]
+        """
+        return ww.g(binary.iter_unpack(fmt, self.view, offset, count, fields))
 
-# b[0] return a letter, not a number
+    def __repr__(self):
+        return 'BytesWrapper({!r})'.format(self.view.tobytes())
@@ -179,6 +179,14 @@ import ww  # absolute import to avoid some circular references
 
 from ww.tools.iterables import (at_index, iterslice, first_true,
                                 skip_duplicates, chunks, window, firsts, lasts)
+from ww.tools.files import (IndexedFile, BLOCK_SIZE, BATCH_SIZE, read_csv,
+                            read_jsonl, write_csv, write_jsonl)
+from ww.tools.parallel import (prefetch, Pipeline, process_map,
+                               SharedIterator)
+from ww.tools.sharedmem import array_chunks
+from ww.tools.mapreduce import map_reduce
+from ww.tools.profiling import (Profiler, profiled, memory_buffer,
+                                account_tee)
 from ww.utils import ensure_tuple
 from .base import BaseWrapper
 
@@ -191,6 +199,9 @@ from .base import BaseWrapper
 
 class IterableWrapper(Iterator, IterableAbc, BaseWrapper):
 
+    # set by stage(), so you can get the stats of the pipeline
+    pipeline = None  # type: Pipeline
+
     def __init__(self, iterable, *more_iterables):
         # type: (Iterable, *Iterable) -> None
         """ Initialize self.iterator to iter(iterable)
@@ -339,7 +350,11 @@ class IterableWrapper(Iterator, IterableAbc, BaseWrapper):
                 >>> (g(range(6)) - [1, 2, 3]).list()
                 [0, 4, 5]
         """
-        filter_from = set(ensure_tuple(other))
+        other = ensure_tuple(other)
+        buffer = memory_buffer('__sub__')
+        if buffer is not None:
+            other = buffer.hold(other)
+        filter_from = set(other)
         return self.__class__(x for x in self.iterator if x not in filter_from)
 
     # TODO: catch the exception when items are not hashable and raise
@@ -364,7 +379,11 @@ class IterableWrapper(Iterator, IterableAbc, BaseWrapper):
                 >>> (range(5) - g(range(3))).list()
                 [3, 4]
         """
-        filter_from = set(self.iterator)
+        iterator = self.iterator
+        buffer = memory_buffer('__rsub__')
+        if buffer is not None:
+            iterator = buffer.hold(iterator)
+        filter_from = set(iterator)
         return self.__class__(x for x in other if x not in filter_from)
 
     def __mul__(self, num):
@@ -385,6 +404,9 @@ class IterableWrapper(Iterator, IterableAbc, BaseWrapper):
                 [0, 1, 2, 0, 1, 2]
         """
         clones = itertools.tee(self.iterator, num)
+        buffer = memory_buffer('__mul__')
+        if buffer is not None:
+            clones = account_tee(clones, buffer)
         return self.__class__(itertools.chain(*clones))
 
     __rmul__ = __mul__
@@ -409,7 +431,11 @@ class IterableWrapper(Iterator, IterableAbc, BaseWrapper):
                 [(0, 1, 2), (0, 1, 2), (0, 1, 2)]
         """
         cls = self.__class__
-        gen = cls(cls(x) for x in itertools.tee(self.iterator, num))
+        clones = itertools.tee(self.iterator, num)
+        buffer = memory_buffer('tee')
+        if buffer is not None:
+            clones = account_tee(clones, buffer)
+        gen = cls(cls(x) for x in clones)
         self._tee_called = True
         return gen
 
@@ -489,6 +515,43 @@ class IterableWrapper(Iterator, IterableAbc, BaseWrapper):
         """
         return self.__class__(builtins.map(callable, self.iterator))
 
+    def process_map(self, callable, workers=None, batch=None, target=0.05):
+        # type: (Callable, int, int, float) -> IterableWrapper
+        """ Like map(), but callable is applied in a pool of processes.
+
+            Use it for CPU bound functions, which threads can't speed up.
+            Items are sent to the processes by batches, serialized with
+            marshal when they are builtin types, or pickle otherwise.
+
+            By default, the size of the batches adapts so that each one takes
+            about `target` seconds. The processes are reused between calls.
+            Results are yielded in order, and only a few batches are sent in
+            advance, so memory stays bounded.
+
+            .. WARNING::
+
+                `callable` must be picklable, which means it must be defined
+                at the top level of a module: lambdas or nested functions
+                won't work.
+
+            Args:
+                callable: the callable to apply to each item.
+                workers: the number of processes. Default is the number of
+                         CPU.
+                batch: a fixed number of items per batch. Default is to adapt
+                       the size automatically.
+                target: the duration, in seconds, of a batch when adapting
+                        the size automatically.
+
+            Example:
+
+                >>> from ww import g
+                >>> g(range(-3, 3)).process_map(abs, workers=2).list()
+                [3, 2, 1, 0, 1, 2]
+        """
+        return self.__class__(process_map(callable, self.iterator, workers,
+                                          batch, target))
+
     def zip(self, *others):
         # type: (*Iterable) -> IterableWrapper
         """ Apply zip() then wrap in g()
@@ -588,7 +651,11 @@ class IterableWrapper(Iterator, IterableAbc, BaseWrapper):
                 monkey
         """
         # using builtins to avoid shadowing
-        lst = builtins.sorted(self.iterator, key=keyfunc, reverse=reverse)
+        iterator = self.iterator
+        buffer = memory_buffer('sorted')
+        if buffer is not None:
+            iterator = buffer.hold(iterator)
+        lst = builtins.sorted(iterator, key=keyfunc, reverse=reverse)
         return self.__class__(lst)
 
     # TODO: add a sort_func argument to allow to choose the sorting strategy
@@ -641,6 +708,68 @@ class IterableWrapper(Iterator, IterableAbc, BaseWrapper):
         gen = ww.tools.iterables.groupby(self.iterator, keyfunc, reverse, cast)
         return self.__class__(gen)
 
+    def map_reduce(self, mapper, reducer, partitions=16, workers=None,
+                   combiner=None, tree=False, batch=1000, directory=None):
+        # type: (...) -> IterableWrapper
+        """ Group and aggregate items in a pool of processes.
+
+            It's the parallel, out of core, version of groupby():
+
+            1. `mapper(item)` returns (key, value) pairs, in a pool of
+               processes.
+            2. The pairs are hash-partitioned on their key into spill files
+               on disk.
+            3. Each partition is reduced in parallel, calling
+               `reducer(key, values)` for each key.
+
+            Only one partition per worker needs to fit in memory: if it
+            doesn't, use more partitions.
+
+            An optional `combiner(key, values)` reduces the values of each
+            batch in the map phase, so less data is spilled. The reducer then
+            receives the results of the combiner as values.
+
+            For associative aggregations (sum, max, set union...), use
+            `tree=True`: `reducer(value1, value2)` is then applied as the
+            values come, in the map workers, then to merge their partial
+            results. Values are never grouped in memory.
+
+            .. WARNING::
+
+                All the functions must be picklable: lambdas or nested
+                functions won't work.
+
+            Args:
+                mapper: a callable returning an iterable of (key, value)
+                        pairs for each item.
+                reducer: reducer(key, values) returning the result for a key,
+                         or reducer(value1, value2) if `tree` is True.
+                partitions: the number of partitions.
+                workers: the number of processes. Default is the number of
+                         CPU.
+                combiner: optional combiner(key, values) to apply to the
+                          values of each batch in the map phase.
+                tree: if True, `reducer` is a binary associative function.
+                batch: the number of items sent to a map worker at once.
+                directory: where to create the temporary spill files.
+
+            Returns:
+                An IterableWrapper yielding (key, result), in no particular
+                order.
+
+            Example:
+
+                >>> from ww import g
+                >>> from ww.tools.mapreduce import count_words, add
+                >>> lines = ['to be', 'or not', 'to be']
+                >>> words = g(lines).map_reduce(count_words, add, tree=True)
+                >>> words.sorted().list()
+                [('be', 2), ('not', 1), ('or', 1), ('to', 2)]
+        """
+        return self.__class__(map_reduce(self.iterator, mapper, reducer,
+                                         partitions, workers, combiner, tree,
+                                         batch, directory))
+
     def enumerate(self, start=0):
         # type: (int) -> IterableWrapper
         """ Give you the position of each element as you iterate.
@@ -751,6 +880,38 @@ class IterableWrapper(Iterator, IterableAbc, BaseWrapper):
         """
         return self.__class__(chunks(self.iterator, size, cast))
 
+    def array_chunks(self, size, typecode='d', pool=None):
+        # type: (int, str, Any) -> IterableWrapper
+        """ Yield numbers by chunks stored in shared memory.
+
+            Like chunks(), but each chunk is a SharedArray of numbers that
+            you can send to other processes, e.g. with process_map(),
+            without copying them: only the name of the memory block is sent,
+            and workers can read and write the numbers in place.
+
+            Blocks come from a SharedMemoryPool and are recycled. Call
+            release() on each chunk when you are done with it, and close()
+            on the pool to destroy all its blocks. Requires Python 3.8+.
+
+            Args:
+                size: the number of items per chunk.
+                typecode: the type of the items, as in the array module.
+                pool: the SharedMemoryPool to take memory from. Default is a
+                      pool closed when the program exits.
+
+            Example:
+
+                >>> from ww import g
+                >>> for chunk in g(range(5)).array_chunks(2, 'q'):
+                ...     print(chunk.tolist())
+                ...     chunk.release()
+                [0, 1]
+                [2, 3]
+                [4]
+        """
+        chunks = array_chunks(self.iterator, size, typecode, pool)
+        return self.__class__(chunks)
+
     def window(self, size=2, cast=tuple):
         # type: (int, Callable) -> IterableWrapper
         """ Yield items using a sliding window.
@@ -856,4 +1017,346 @@ class IterableWrapper(Iterator, IterableAbc, BaseWrapper):
         uniques = skip_duplicates(self.iterator, key, fingerprints)
         return self.__class__(uniques)
 
+    def prefetch(self, size=1, workers=1):
+        # type: (int, int) -> IterableWrapper
+        """ Read items ahead in background threads, into a bounded queue.
+
+            Use it right after a slow source (disk, network, a slow
+            generator...) so that reading the next items overlaps with the
+            processing of the current one.
+
+            The order of the items is preserved, and the iterable is never
+            read by two threads at the same time. Exceptions are raised again
+            in your thread, where they would have been without prefetch().
+
+            Args:
+                size: the max number of items read in advance.
+                workers: the number of threads reading from the iterable.
+
+            Returns:
+                An IterableWrapper yielding the same items.
+
+            Example:
+
+                >>> from ww import g
+                >>> g(range(10)).prefetch(3).map(lambda x: x * 2).list()
+                [0, 2, 4, 6, 8, 10, 12, 14, 16, 18]
+        """
+        return self.__class__(prefetch(self.iterator, size, workers))
+
+    def shared(self, batch=1):
+        # type: (int) -> SharedIterator
+        """ Return an iterator that several threads can consume at once.
+
+            Generators, including the ones g() chains, raise "generator
+            already executing" when two threads call next() at the same
+            time. The returned iterator reads this one under a lock, `batch`
+            items at a time, and gives each item to exactly one thread.
+
+            Bigger batches mean less contention on the lock, so better
+            scaling with the number of threads, especially on free-threaded
+            Python. Smaller batches spread the items more evenly.
+
+            Each thread can wrap it in its own g() to chain more operations,
+            or call next_batch() to get a list of items at once.
+
+            Args:
+                batch: the number of items a thread reads at once.
+
+            Returns:
+                A SharedIterator.
+
+            Example:
+
+                >>> import threading
+                >>> from ww import g
+                >>> shared = g(range(100)).map(str).shared(batch=8)
+                >>> lengths = []
+                >>> def work():
+                ...     lengths.extend(g(shared).map(len))
+                >>> threads = [threading.Thread(target=work) for _ in range(4)]
+                >>> for t in threads:
+                ...     t.start()
+                >>> for t in threads:
+                ...     t.join()
+                >>> sum(lengths)
+                190
+        """
+        return SharedIterator(self.iterator, batch)
+
+    def profile(self, output=None):
+        # type: (Any) -> IterableWrapper
+        """ Measure the time spent in each of the next chained calls.
+
+            Each g() method returns a generator wrapping the previous one, so
+            regular profilers can't tell which of them is slow. After
+            profile(), every new stage of the chain counts its items, and
+            the wall and CPU time spent in it, with and without the time
+            spent in the previous stages.
+
+            When the last stage is exhausted, a table is written to
+            `output`. You can also get the stats anytime as a list of
+            StageReport with `.profiler.report()`.
+
+            Profiling only applies to the wrappers created after calling
+            profile(): the others pay no cost at all.
+
+            Args:
+                output: a file to write the table to. Default is sys.stderr.
+                        False to not write anything.
+
+            Returns:
+                An IterableWrapper yielding the same items, with a
+                `profiler` attribute.
+
+            Example:
+
+                >>> from ww import g
+                >>> gen = g(range(10)).profile(output=False)
+                >>> gen.map(lambda x: x * 2).firsts(3).list()
+                [0, 2, 4]
+                >>> [(s.name, s.items) for s in gen.profiler.report()]
+                [('source', 3), ('map', 3), ('firsts', 3)]
+        """
+        cls = profiled(self.__class__, Profiler(output))
+        return cls(self.iterator)
+
+    def stage(self, func, workers=1, buffer=None, name=None):
+        # type: (Callable, int, int, str) -> IterableWrapper
+        """ Apply func to each item in a pool of threads.
+
+            Unlike map(), each stage runs in its own threads, and stages
+            are connected by bounded queues. A slow stage makes the previous
+            ones wait instead of letting them buffer without limit, and a
+            stage waiting for I/O doesn't stop the other stages from working.
+
+            Chaining stage() calls builds a pipeline, which you can access
+            with the `pipeline` attribute to get the stats of each stage:
+            items processed, throughput and queue depth. Each call returns
+            a wrapper with a new pipeline, the one of the wrapper you call
+            it on is left as is.
+
+            Threads are started when you start iterating.
+
+            .. WARNING::
+
+                If a stage has more than one worker, the results may come
+                out of order.
+
+            Args:
+                func: the callable to apply to each item.
+                workers: the number of threads calling `func`.
+                buffer: how many items can wait for this stage. Default is
+                        twice the number of workers.
+                name: the name of the stage in the stats. Default is the
+                      name of the function.
+
+            Returns:
+                An IterableWrapper yielding the results of the last stage.
+
+            Example:
+
+                >>> from ww import g
+                >>> gen = g(range(5)).stage(str, workers=4).stage(int)
+                >>> gen.sorted().list()
+                [0, 1, 2, 3, 4]
+                >>> [(s.name, s.workers, s.processed)
+                ...  for s in gen.pipeline.stats()]
+                [('str', 4, 5), ('int', 1, 5)]
+        """
+        pipeline = self.pipeline
+        if pipeline is None or pipeline.started is not None:
+            pipeline = Pipeline(self.iterator)
+        else:
+            # Adding the stage in place would change what self yields
+            pipeline = pipeline.copy()
+
+        wrapper = self.__class__(pipeline.stage(func, workers, buffer, name))
+        wrapper.pipeline = pipeline
+        return wrapper
+
+    @classmethod
+    def indexed_file(cls, path, every=1000, encoding='utf8', errors='strict',
+                     persist=False, index_path=None):
+        # type: (str, int, str, str, bool, str) -> IndexedFile
+        """ Open a file for random access to its lines.
+
+            `g(open(path))[n]` has to read the n first lines of the file
+            every time. This builds a sparse index of the file, storing the
+            offset of one line every `every` lines, and then seeks directly
+            next to the line you want.
+
+            Integer indexing returns a line, slicing returns a lazy g().
+            Negative indices work too, without reading the file.
+
+            Args:
+                path: the path of the file to read.
+                every: the number of lines between two offsets in the index.
+                       Lower values mean faster access, but a bigger index.
+                encoding: the encoding used to decode lines. None to get
+                          bytes.
+                errors: the policy to use on decoding errors.
+                persist: if True, save the index next to the file, and reuse
+                         it as long as the file doesn't change. If the file
+                         only grew, only the new lines are indexed.
+                index_path: where to save the index. Default is the path of
+                            the file, with ".lineidx" appended.
+
+            Returns:
+                An IndexedFile, which you should close() when you are done,
+                or use as a context manager.
+
+            Example:
+
+                >>> import os, tempfile
+                >>> from ww import g
+                >>> path = os.path.join(tempfile.mkdtemp(), 'file.txt')
+                >>> with open(path, 'w') as f:
+                ...     f.writelines('%s\\n' % i for i in range(100))
+                >>> with g.indexed_file(path, every=10) as lines:
+                ...     print(lines[42].strip())
+                ...     print(lines[-3:].map(str.strip).list())
+                42
+                ['97', '98', '99']
+        """
+        return IndexedFile(path, every, encoding, errors, persist, index_path)
+
+    @classmethod
+    def from_csv(cls, source, header=True, shape='tuple', batch=None,
+                 encoding='utf8', buffer_size=BLOCK_SIZE, **fmtparams):
+        # type: (Any, bool, str, int, str, int, **Any) -> IterableWrapper
+        """ Lazily read rows from a CSV file.
+
+            Args:
+                source: a path, or a text file-like object.
+                header: if True, the first row is used as field names and
+                        not yielded.
+                shape: 'tuple', 'dict', or 'columns' to get batches of rows
+                       as a dict of {field: [values]}.
+                batch: if set, yield lists of `batch` rows instead of rows.
+                       For 'columns', it's the number of rows per dict and
+                       defaults to 10000.
+                encoding: the encoding of the file, if you pass a path.
+                buffer_size: the size of the read buffer.
+                fmtparams: passed to csv.reader(), e.g: delimiter=';'.
+
+            Returns:
+                An IterableWrapper yielding rows, or batches of rows.
+
+            Example:
+
+                >>> import io
+                >>> from ww import g
+                >>> data = io.StringIO(u'name,age\\nbob,8\\nalice,10\\n')
+                >>> g.from_csv(data).map(lambda row: row[0]).list()
+                ['bob', 'alice']
+        """
+        return cls(read_csv(source, header, shape, batch, encoding,
+                            buffer_size, **fmtparams))
+
+    @classmethod
+    def from_jsonl(cls, source, shape='object', fields=None, batch=None,
+                   encoding='utf8', buffer_size=BLOCK_SIZE):
+        # type: (Any, str, Iterable, int, str, int) -> IterableWrapper
+        """ Lazily read values from a JSON Lines file.
+
+            Lines are read by blocks of about `buffer_size` characters,
+            and each line must hold exactly one JSON value.
+
+            Args:
+                source: a path, or a text file-like object.
+                shape: 'object' to get the decoded values as-is, 'dict' to
+                       get only `fields` from each object, 'tuple' to get a
+                       tuple of the values of `fields`, 'columns' to get
+                       batches as a dict of {field: [values]}.
+                fields: the keys to extract. Required for 'tuple' and
+                        'columns'.
+                batch: if set, yield lists of `batch` values instead of
+                       values. For 'columns', it's the number of rows per
+                       dict and defaults to 10000.
+                encoding: the encoding of the file, if you pass a path.
+                buffer_size: the number of characters to decode at once.
+
+            Returns:
+                An IterableWrapper yielding values, or batches of values.
+
+            Raises:
+                ValueError: if a line is not valid JSON.
+
+            Example:
+
+                >>> import io
+                >>> from ww import g
+                >>> data = io.StringIO(u'{"id": 1}\\n{"id": 2}\\n')
+                >>> g.from_jsonl(data, 'tuple', ['id']).list()
+                [(1,), (2,)]
+        """
+        return cls(read_jsonl(source, shape, fields, batch, encoding,
+                              buffer_size))
+
+    def to_csv(self, dest, header=None, batch=BATCH_SIZE, encoding='utf8',
+               buffer_size=BLOCK_SIZE, **fmtparams):
+        # type: (Any, Iterable, int, str, int, **Any) -> int
+        """ Write all the items to a CSV file, by batches.
+
+            Args:
+                dest: a path, or a text file-like object.
+                header: the field names to write first. If items are dicts,
+                        it's also the keys to write, and it defaults to the
+                        keys of the first item.
+                batch: the number of rows to send to the writer at once.
+                encoding: the encoding of the file, if you pass a path.
+                buffer_size: the size of the write buffer.
+                fmtparams: passed to csv.writer(), e.g: delimiter=';'.
+
+            Returns:
+                The number of rows written, not counting the header.
+
+            Example:
+
+                >>> import io
+                >>> from ww import g
+                >>> out = io.StringIO()
+                >>> g(range(3)).map(lambda x: (x, x * x)).to_csv(out)
+                3
+                >>> print(out.getvalue().replace('\\r', ''))
+                0,0
+                1,1
+                2,4
+                <BLANKLINE>
+        """
+        return write_csv(self.iterator, dest, header, batch, encoding,
+                         buffer_size, **fmtparams)
+
+    def to_jsonl(self, dest, batch=BATCH_SIZE, encoding='utf8',
+                 buffer_size=BLOCK_SIZE, **dumps_kwargs):
+        # type: (Any, int, str, int, **Any) -> int
+        """ Write all the items to a JSON Lines file, by batches.
+
+            Args:
+                dest: a path, or a text file-like object.
+                batch: the number of values to encode and write at once.
+                encoding: the encoding of the file, if you pass a path.
+                buffer_size: the size of the write buffer.
+                dumps_kwargs: passed to json.dumps(), e.g: sort_keys=True.
+
+            Returns:
+                The number of values written.
+
+            Example:
+
+                >>> import io
+                >>> from ww import g
+                >>> out = io.StringIO()
+                >>> g(range(3)).map(lambda x: {'x': x}).to_jsonl(out)
+                3
+                >>> print(out.getvalue())
+                {"x": 0}
+                {"x": 1}
+                {"x": 2}
+                <BLANKLINE>
+        """
+        return write_jsonl(self.iterator, dest, batch, encoding, buffer_size,
+                           **dumps_kwargs)
+
     # TODO: add a consume() method
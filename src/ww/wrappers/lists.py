@@ -1,8 +1,14 @@
 # coding: utf-8
 
+import array
+
 import ww
 
-# TODO: ease creation of multi dimensional array
+from ww.tools import binary
+from ww.wrappers.matrices import Matrix
+from ww.wrappers.sortedlists import SortedList
+from ww.wrappers.views import SequenceView
+
 # TODO: allow subclass to chose the string class
 # TODO, implement most  list methods as wrappers:
 # 'clear' => chainable
@@ -10,7 +16,6 @@ import ww
 # 'insert' => make it chainable
 # 'remove', => chainable, error tolerant
 # 'reverse' and sort() => chainable
-# TODO: list.build(*dimensions, default=value) as a wrapper for data.matrix
 # TODO: similar things for sets, bytes,
 
 
@@ -99,3 +104,231 @@ class ListWrapper(list):
         for value in iterables:
             list.extend(self, value)
         return self
+
+    def pack_many(self, fmt):
+        """Pack each item, a row of values, in one buffer of bytes
+
+        The buffer is allocated once, and each row is packed directly in
+        it, following a struct format.
+
+        Args:
+            fmt: a struct format, or a struct.Struct.
+
+        Returns:
+            A bytearray of all the records.
+
+        Raises:
+            struct.error: if the values don't match the format.
+
+        Example:
+
+            >>> from ww import l
+            >>> l([(1, 2), (3, 4)]).pack_many('BB')
+            bytearray(b'\\x01\\x02\\x03\\x04')
+        """
+        return binary.pack_many(fmt, self)
+
+    def view(self, start=None, stop=None, step=None):
+        """Return a view on a part of the list, without copying it
+
+        Unlike a slice, creating a view is O(1), and so is creating a view
+        of a view. Changes to the list are visible in the view.
+
+        Args:
+            start: index of the first item, as for a slice.
+            stop: index after the last item, as for a slice.
+            step: step between each item, as for a slice.
+
+        Returns:
+            A SequenceView.
+
+        Example:
+
+            >>> from ww import l
+            >>> lst = l(range(10))
+            >>> window = lst.view(2, 6)
+            >>> window
+            SequenceView([2, 3, 4, 5])
+            >>> window.view(step=2).to_l()
+            [2, 4]
+        """
+        return SequenceView(self)[start:stop:step]
+
+    @classmethod
+    def typed(cls, typecode, iterable=()):
+        """Create a list storing numbers in a compact, contiguous block
+
+        A list stores a pointer to a Python object for each item, and each
+        int or float object takes 24 bytes or more. A typed list stores the
+        raw numbers in an array.array instead: 8 bytes for each 'd' or 'q'
+        item, 4 for 'i', etc.
+
+        It has the same API as l(), and supports the buffer protocol, so you
+        can pass it to numpy, memoryview() or file.write() without copying
+        it.
+
+        Args:
+            typecode: the type of the items, as in the array module. E.G:
+                      'd' for floats, 'q' for 64 bits ints, 'i' for 32
+                      bits ints, 'B' for bytes...
+            iterable: the initial items.
+
+        Returns:
+            A TypedListWrapper.
+
+        Raises:
+            ValueError: if the typecode is not supported.
+            TypeError: if an item doesn't match the typecode.
+
+        Example:
+
+            >>> from ww import l
+            >>> lst = l.typed('d', [1, 2])
+            >>> lst.append(3).extend([4, 5])
+            TypedListWrapper('d', [1.0, 2.0, 3.0, 4.0, 5.0])
+            >>> lst.len, lst.itemsize
+            (5, 8)
+            >>> memoryview(lst)[1:3].tolist()
+            [2.0, 3.0]
+        """
+        return TypedListWrapper(typecode, iterable)
+
+    @classmethod
+    def build(cls, *dimensions, **kwargs):
+        """Create a multi dimensional matrix with all items set to a value
+
+        Unlike nested lists, the items are stored in one flat buffer:
+        an array.array for numbers, a list for anything else. Rows,
+        columns, transpositions and reshapes are views on this buffer.
+
+        Args:
+            dimensions: the size of each dimension.
+            default: the value of all the items. Default to 0.
+            typecode: the array typecode used to store the items. Default
+                      to 'q' for ints, 'd' for floats, and to a list for
+                      any other value.
+
+        Returns:
+            A Matrix.
+
+        Example:
+
+            >>> from ww import l
+            >>> grid = l.build(2, 3, default=0.5)
+            >>> grid[0, 1] = 2
+            >>> grid
+            Matrix([[0.5, 2.0, 0.5], [0.5, 0.5, 0.5]])
+            >>> grid[:, 1].tolist()
+            [2.0, 0.5]
+            >>> l.build(2, 2, default='.')
+            Matrix([['.', '.'], ['.', '.']])
+        """
+        return Matrix.filled(dimensions, kwargs.get('default', 0),
+                             kwargs.get('typecode'))
+
+    @classmethod
+    def sorted_list(cls, iterable=(), key=None):
+        """Create a list that keeps its items sorted as you add them
+
+        Adding, removing and finding an item is done by bisection, without
+        sorting the whole list again.
+
+        Args:
+            iterable: the initial items.
+            key: a function returning the value to sort each item on.
+
+        Returns:
+            A SortedList.
+
+        Example:
+
+            >>> from ww import l
+            >>> bids = l.sorted_list([101, 99])
+            >>> bids.add(100).add(98)
+            SortedList([98, 99, 100, 101])
+            >>> bids.irange(99, 100).list()
+            [99, 100]
+        """
+        return SortedList(iterable, key)
+
+
+class TypedListWrapper(array.array):
+    """ Like ListWrapper, but storing numbers in an array.array
+
+        Use l.typed() to create it.
+    """
+
+    def __new__(cls, typecode, iterable=()):
+        # array.array doesn't accept generators as initializer
+        if not isinstance(iterable, (list, tuple, bytes, array.array)):
+            self = array.array.__new__(cls, typecode)
+            array.array.extend(self, iterable)
+            return self
+        return array.array.__new__(cls, typecode, iterable)
+
+    @property
+    def len(self):
+        """Return object length
+
+        Example:
+
+            >>> from ww import l
+            >>> l.typed('q', range(4)).len
+            4
+        """
+        return len(self)
+
+    def join(self, joiner, formatter=lambda s, t: t.format(s),
+             template="{}"):
+        """Join values and convert to string
+
+        Example:
+
+            >>> from ww import l
+            >>> l.typed('q', range(3)).join(',')
+            u'0,1,2'
+        """
+        return ww.s(joiner).join(self, formatter, template)
+
+    def append(self, *values):
+        """Append values at the end of the list
+
+        Allow chaining.
+
+        Args:
+            values: values to be appened at the end.
+
+        Example:
+
+            >>> from ww import l
+            >>> l.typed('q').append(1).append(2, 3)
+            TypedListWrapper('q', [1, 2, 3])
+        """
+        array.array.extend(self, values)
+        return self
+
+    def extend(self, *iterables):
+        """Add all values of all iterables at the end of the list
+
+        Args:
+            iterables: iterable which content to add at the end
+
+        Example:
+
+            >>> from ww import l
+            >>> l.typed('q').extend([1, 2], range(3, 5))
+            TypedListWrapper('q', [1, 2, 3, 4])
+        """
+        for iterable in iterables:
+            array.array.extend(self, iterable)
+        return self
+
+    def __getitem__(self, index):
+        item = array.array.__getitem__(self, index)
+        if isinstance(index, slice):
+            return self.__class__(self.typecode, item)
+        return item
+
+    def to_l(self):
+        """ Return the items in a regular ListWrapper """
+        return ListWrapper(self.tolist())
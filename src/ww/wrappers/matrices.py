@@ -0,0 +1,564 @@
+# coding: utf-8
+
+"""
+    Matrix is a N dimensions container, like nested lists, but storing all
+    its items in one flat buffer.
+
+    Numbers are stored in an array.array, so a 1000x1000 matrix of floats
+    takes 8MB instead of about 32MB for nested lists of floats. Any other
+    value is stored in a flat list.
+
+    Items are found using strides: the number of items to skip in the
+    buffer to move by one along each dimension. This is what makes rows,
+    columns, sub matrices, transpositions and most reshapes simple views
+    sharing the same buffer: nothing is copied, only the shape, strides and
+    offset change.
+
+    Example:
+
+        You usually create it with l.build()::
+
+            >>> from ww import l
+            >>> m = l.build(2, 3)
+            >>> m
+            Matrix([[0, 0, 0], [0, 0, 0]])
+            >>> m.shape, m.strides
+            ((2, 3), (3, 1))
+
+        Indexing works one dimension after the other, or with a tuple::
+
+            >>> m[1][2] = 5
+            >>> m[0, 1] = 4
+            >>> m[1, 2], m[0][1]
+            (5, 4)
+
+        Rows and columns are views::
+
+            >>> column = m[:, 1]
+            >>> column
+            Matrix([4, 0])
+            >>> column.fill(7)
+            Matrix([7, 7])
+            >>> m
+            Matrix([[0, 7, 0], [0, 7, 5]])
+
+        And so are transpositions and reshapes::
+
+            >>> m.T
+            Matrix([[0, 0], [7, 7], [0, 5]])
+            >>> m.reshape(3, -1)
+            Matrix([[0, 7], [0, 0], [7, 5]])
+
+    You'll find bellow the detailed documentation for each method of
+    Matrix.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import array
+import numbers
+import operator
+
+from functools import reduce
+
+import ww
+
+from ww.utils import require_positive_number
+from ww.types import Union, Iterable, Any  # noqa
+
+
+def _product(values):
+    # type: (Iterable[int]) -> int
+    return reduce(operator.mul, values, 1)
+
+
+def _contiguous_strides(shape):
+    # type: (tuple) -> tuple
+    """ Return the strides of a row-major matrix of this shape """
+    strides = []
+    stride = 1
+    for size in reversed(shape):
+        strides.append(stride)
+        stride *= size
+    return tuple(reversed(strides))
+
+
+def _infer_typecode(value):
+    # type: (Any) -> Union[str, None]
+    """ Return the array typecode to store this value, if any """
+    # bools would come back as ints from an array
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, numbers.Integral):
+        return 'q'
+    if isinstance(value, numbers.Real):
+        return 'd'
+    return None
+
+
+def _make_storage(typecode, values):
+    # type: (Union[str, None], Iterable) -> Union[array.array, list]
+    if typecode is None:
+        return list(values)
+    return array.array(typecode, values)
+
+
+def _buffer_slice(start, size, stride):
+    # type: (int, int, int) -> slice
+    """ Return the slice of the buffer for `size` items from `start` """
+    stop = start + size * stride
+    # A negative stop would count from the end of the buffer
+    return slice(start, stop if stop >= 0 else None, stride or None)
+
+
+def _flatten(value):
+    # type: (Any) -> list
+    """ Return the items of a Matrix or nested lists/tuples, in order """
+    if isinstance(value, Matrix):
+        return list(value.flat())
+    if isinstance(value, (list, tuple)):
+        return [item for sub in value for item in _flatten(sub)]
+    return [value]
+
+
+class Matrix(object):
+    """ N dimensions view on a flat buffer
+
+        Use l.build() to create it.
+    """
+
+    def __init__(self,
+                 data,  # type: Union[array.array, list]
+                 shape,  # type: Iterable[int]
+                 strides=None,  # type: Iterable[int]
+                 offset=0  # type: int
+                 ):
+        """ Create a view on `data`, a flat array.array or list
+
+            Args:
+                data: the buffer to store the items in.
+                shape: the size of each dimension.
+                strides: the number of items to skip in `data` to move by
+                         one along each dimension. Default to the strides
+                         of a row-major matrix.
+                offset: the position in `data` of the first item.
+
+            Example:
+
+                >>> from ww.wrappers.matrices import Matrix
+                >>> Matrix(list(range(6)), (2, 3))
+                Matrix([[0, 1, 2], [3, 4, 5]])
+                >>> Matrix(list(range(6)), (2, 3), (1, 2))
+                Matrix([[0, 2, 4], [1, 3, 5]])
+        """
+        self.data = data
+        self.shape = tuple(require_positive_number(size, 'dimension')
+                           for size in shape)
+        if not self.shape:
+            raise ValueError('A matrix needs at least one dimension')
+        if strides is None:
+            strides = _contiguous_strides(self.shape)
+        self.strides = tuple(strides)
+        self.offset = offset
+
+    @classmethod
+    def filled(cls,
+               shape,  # type: Iterable[int]
+               default=0,  # type: Any
+               typecode=None  # type: str
+               ):
+        # type: (...) -> Matrix
+        """ Create a contiguous matrix with all items set to `default`
+
+            Args:
+                shape: the size of each dimension.
+                default: the value of all items.
+                typecode: the array typecode used to store the items.
+                          Default to 'q' for ints, 'd' for floats, and to
+                          a list for any other value.
+
+            Returns:
+                A new Matrix.
+
+            Example:
+
+                >>> from ww.wrappers.matrices import Matrix
+                >>> Matrix.filled((2, 2), 1.5).data
+                array('d', [1.5, 1.5, 1.5, 1.5])
+                >>> Matrix.filled((2, 2), 'a').data
+                ['a', 'a', 'a', 'a']
+                >>> Matrix.filled((1, 2), 1, 'B').data
+                array('B', [1, 1])
+        """
+        shape = tuple(require_positive_number(size, 'dimension')
+                      for size in shape)
+        if typecode is None:
+            typecode = _infer_typecode(default)
+        size = _product(shape)
+        if typecode is None:
+            return cls([default] * size, shape)
+        return cls(array.array(typecode, [default]) * size, shape)
+
+    @property
+    def ndim(self):
+        # type: () -> int
+        """ Number of dimensions """
+        return len(self.shape)
+
+    @property
+    def size(self):
+        # type: () -> int
+        """ Number of items """
+        return _product(self.shape)
+
+    @property
+    def typecode(self):
+        # type: () -> Union[str, None]
+        """ The array typecode of the buffer, or None if it's a list """
+        return getattr(self.data, 'typecode', None)
+
+    @property
+    def is_contiguous(self):
+        # type: () -> bool
+        """ True if the items follow each other in the buffer, in order
+
+            Example:
+
+                >>> from ww import l
+                >>> m = l.build(2, 3)
+                >>> m.is_contiguous, m[1].is_contiguous
+                (True, True)
+                >>> m.T.is_contiguous, m[:, 1].is_contiguous
+                (False, False)
+        """
+        return self.strides == _contiguous_strides(self.shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def _view(self, shape, strides, offset):
+        # type: (tuple, tuple, int) -> Matrix
+        return self.__class__(self.data, shape, strides, offset)
+
+    def _locate(self, key):
+        # type: (Any) -> tuple
+        """ Return the shape, strides and offset of the items at `key` """
+        if not isinstance(key, tuple):
+            key = (key,)
+        if len(key) > self.ndim:
+            raise IndexError('Too many indices for a matrix of {} '
+                             'dimension(s)'.format(self.ndim))
+        shape, strides, offset = [], [], self.offset
+        for axis, index in enumerate(key):
+            size, stride = self.shape[axis], self.strides[axis]
+            if isinstance(index, slice):
+                start, stop, step = index.indices(size)
+                length = len(range(start, stop, step))
+                shape.append(length)
+                strides.append(stride * step)
+                # An empty reversed slice starts at -1, outside the matrix
+                if length:
+                    offset += start * stride
+                continue
+            index = operator.index(index)
+            if not -size <= index < size:
+                raise IndexError('Index {} out of range for dimension {} of '
+                                 'size {}'.format(index, axis, size))
+            offset += (index % size) * stride
+        shape.extend(self.shape[len(key):])
+        strides.extend(self.strides[len(key):])
+        return tuple(shape), tuple(strides), offset
+
+    def __getitem__(self, key):
+        """ Get an item, or a view on several items
+
+            Integers select one position along a dimension, slices a range
+            of positions. Missing dimensions are selected entirely.
+
+            Example:
+
+                >>> from ww.wrappers.matrices import Matrix
+                >>> m = Matrix(list(range(12)), (3, 4))
+                >>> m[1, 2], m[-1][-1]
+                (6, 11)
+                >>> m[1]
+                Matrix([4, 5, 6, 7])
+                >>> m[:, 0]
+                Matrix([0, 4, 8])
+                >>> m[::2, 1:3]
+                Matrix([[1, 2], [9, 10]])
+        """
+        shape, strides, offset = self._locate(key)
+        if not shape:
+            return self.data[offset]
+        return self._view(shape, strides, offset)
+
+    def __setitem__(self, key, value):
+        """ Set an item, or several ones
+
+            If `key` selects several items, `value` can be one value to
+            fill them all with, or a Matrix or nested lists with the same
+            number of items.
+
+            Example:
+
+                >>> from ww import l
+                >>> m = l.build(2, 3)
+                >>> m[0, 0] = 1
+                >>> m[1] = 2
+                >>> m[:, 2] = [8, 9]
+                >>> m
+                Matrix([[1, 0, 8], [2, 2, 9]])
+        """
+        shape, strides, offset = self._locate(key)
+        if not shape:
+            self.data[offset] = value
+        elif isinstance(value, (Matrix, list, tuple)):
+            self._view(shape, strides, offset).assign(value)
+        else:
+            self._view(shape, strides, offset).fill(value)
+
+    def _row_slices(self):
+        # type: () -> Iterable[slice]
+        """ Yield the slice of the buffer of each row of the last axis """
+        if not self.size:
+            return
+        bases = [self.offset]
+        for size, stride in zip(self.shape[:-1], self.strides[:-1]):
+            bases = [base + i * stride for base in bases for i in range(size)]
+        size, stride = self.shape[-1], self.strides[-1]
+        for base in bases:
+            yield _buffer_slice(base, size, stride)
+
+    def fill(self, value):
+        # type: (Any) -> Matrix
+        """ Set all the items to `value`
+
+            It's fast: for each row, the buffer is updated with a single
+            slice assignment.
+
+            Args:
+                value: the value to set.
+
+            Returns:
+                The matrix itself, to allow chaining.
+
+            Example:
+
+                >>> from ww import l
+                >>> m = l.build(2, 3)
+                >>> m.fill(1)
+                Matrix([[1, 1, 1], [1, 1, 1]])
+                >>> m[:, 1:].fill(2)
+                Matrix([[2, 2], [2, 2]])
+                >>> m
+                Matrix([[1, 2, 2], [1, 2, 2]])
+        """
+        if not self.size:
+            return self
+        if self.is_contiguous:
+            slices = [_buffer_slice(self.offset, self.size, 1)]
+            size = self.size
+        else:
+            slices = self._row_slices()
+            size = self.shape[-1]
+        row = _make_storage(self.typecode, [value]) * size
+        for buffer_slice in slices:
+            self.data[buffer_slice] = row
+        return self
+
+    def assign(self, values):
+        # type: (Any) -> Matrix
+        """ Set all the items from a Matrix, or from nested lists
+
+            Args:
+                values: a Matrix or nested lists/tuples with as many items
+                        as this matrix.
+
+            Returns:
+                The matrix itself, to allow chaining.
+
+            Raises:
+                ValueError: if the number of items doesn't match.
+
+            Example:
+
+                >>> from ww import l
+                >>> m = l.build(2, 2)
+                >>> m.assign([[1, 2], [3, 4]])
+                Matrix([[1, 2], [3, 4]])
+                >>> m.assign(m.T)
+                Matrix([[1, 3], [2, 4]])
+        """
+        # Copy first, values may be a view on the same buffer
+        values = _flatten(values)
+        if len(values) != self.size:
+            raise ValueError(ww.s >> """
+                Can't assign {} items to a matrix of shape {}.
+            """.format(len(values), self.shape))
+        size = self.shape[-1]
+        for i, buffer_slice in enumerate(self._row_slices()):
+            row = values[i * size:(i + 1) * size]
+            self.data[buffer_slice] = _make_storage(self.typecode, row)
+        return self
+
+    def flat(self):
+        # type: () -> Iterable
+        """ Iterate on all the items, in row-major order
+
+            Example:
+
+                >>> from ww import l
+                >>> list(l.build(2, 2, default=1).flat())
+                [1, 1, 1, 1]
+        """
+        for buffer_slice in self._row_slices():
+            for item in self.data[buffer_slice]:
+                yield item
+
+    def __iter__(self):
+        """ Iterate on the first dimension: the rows, or the items """
+        if self.ndim == 1:
+            if not self.size:
+                return iter(())
+            return iter(self.data[_buffer_slice(self.offset, self.shape[0],
+                                                self.strides[0])])
+        return (self[i] for i in range(self.shape[0]))
+
+    def transpose(self, *axes):
+        # type: (*int) -> Matrix
+        """ Return a view with the dimensions in a different order
+
+            Args:
+                axes: the new order of the dimensions. Default to reversing
+                      them.
+
+            Returns:
+                A Matrix sharing the same buffer.
+
+            Raises:
+                ValueError: if axes is not a permutation of the dimensions.
+
+            Example:
+
+                >>> from ww.wrappers.matrices import Matrix
+                >>> m = Matrix(list(range(6)), (1, 2, 3))
+                >>> m.transpose().shape
+                (3, 2, 1)
+                >>> m.transpose(1, 0, 2)
+                Matrix([[[0, 1, 2]], [[3, 4, 5]]])
+        """
+        axes = axes or tuple(reversed(range(self.ndim)))
+        if sorted(axes) != list(range(self.ndim)):
+            raise ValueError(ww.s >> """
+                {} is not a permutation of the {} dimensions of the matrix.
+            """.format(axes, self.ndim))
+        shape = tuple(self.shape[axis] for axis in axes)
+        strides = tuple(self.strides[axis] for axis in axes)
+        return self._view(shape, strides, self.offset)
+
+    @property
+    def T(self):
+        # type: () -> Matrix
+        """ Shortcut for transpose() """
+        return self.transpose()
+
+    def reshape(self, *shape):
+        # type: (*int) -> Matrix
+        """ Return the same items in a matrix of a different shape
+
+            Args:
+                shape: the size of each dimension. One of them can be -1,
+                       and will be computed from the others.
+
+            Returns:
+                A Matrix sharing the same buffer if the items are
+                contiguous, or a reshaped copy otherwise.
+
+            Raises:
+                ValueError: if the number of items doesn't match.
+
+            Example:
+
+                >>> from ww.wrappers.matrices import Matrix
+                >>> m = Matrix(list(range(6)), (2, 3))
+                >>> m.reshape(3, 2)
+                Matrix([[0, 1], [2, 3], [4, 5]])
+                >>> m.reshape(-1)
+                Matrix([0, 1, 2, 3, 4, 5])
+                >>> m.T.reshape(6)
+                Matrix([0, 3, 1, 4, 2, 5])
+        """
+        shape = list(shape)
+        if shape.count(-1) == 1:
+            known = _product(size for size in shape if size != -1)
+            shape[shape.index(-1)] = self.size // known if known else 0
+        if _product(shape) != self.size:
+            raise ValueError(ww.s >> """
+                Can't reshape a matrix of shape {} to {}.
+            """.format(self.shape, tuple(shape)))
+        if self.is_contiguous:
+            return self._view(tuple(shape), None, self.offset)
+        return self.copy().reshape(*shape)
+
+    def copy(self):
+        # type: () -> Matrix
+        """ Return a contiguous copy, with its own buffer
+
+            Example:
+
+                >>> from ww import l
+                >>> m = l.build(2, 2)
+                >>> column = m[:, 0].copy()
+                >>> column.fill(1)
+                Matrix([1, 1])
+                >>> m
+                Matrix([[0, 0], [0, 0]])
+        """
+        data = _make_storage(self.typecode, self.flat())
+        return self.__class__(data, self.shape)
+
+    def tolist(self):
+        # type: () -> list
+        """ Return the items as nested lists
+
+            Example:
+
+                >>> from ww import l
+                >>> l.build(2, 2).tolist()
+                [[0, 0], [0, 0]]
+        """
+        if self.ndim == 1:
+            return list(self)
+        return [row.tolist() for row in self]
+
+    def to_l(self):
+        # type: () -> ww.l
+        """ Return the items as nested ListWrapper
+
+            Example:
+
+                >>> from ww import l
+                >>> l.build(2, 2).to_l()[0].append(1)
+                [0, 0, 1]
+        """
+        if self.ndim == 1:
+            return ww.l(self)
+        return ww.l(row.to_l() for row in self)
+
+    def __eq__(self, other):
+        if isinstance(other, Matrix):
+            return (self.shape == other.shape and
+                    self.tolist() == other.tolist())
+        if isinstance(other, list):
+            return self.tolist() == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self):
+        return 'Matrix({!r})'.format(self.tolist())
@@ -0,0 +1,460 @@
+# coding: utf-8
+
+"""
+    SortedList is a list that keeps its items sorted while you add and
+    remove them, without calling sorted() again.
+
+    Items are stored in a list of small sorted lists, the "chunks", plus
+    the biggest key of each chunk. Finding an item is a bisection on these
+    maxes, then a bisection in one chunk, and inserting or deleting only
+    moves the items of this chunk. Chunks are split when they grow bigger
+    than twice LOAD items, and merged with their neighbour when they get
+    smaller than half of it.
+
+    Example:
+
+        You usually create it with l.sorted_list()::
+
+            >>> from ww import l
+            >>> prices = l.sorted_list([30, 10, 20])
+            >>> prices
+            SortedList([10, 20, 30])
+            >>> prices.add(15).add(25)
+            SortedList([10, 15, 20, 25, 30])
+            >>> prices[0], prices[-1]
+            (10, 30)
+            >>> prices.bisect_left(20), prices.index(25)
+            (2, 3)
+            >>> prices.irange(12, 25).list()
+            [15, 20, 25]
+            >>> prices.remove(20)
+            SortedList([10, 15, 25, 30])
+
+        With a key, items are sorted on the result of the key::
+
+            >>> orders = l.sorted_list(key=lambda order: order[1])
+            >>> orders.update([('sell', 12), ('buy', 10), ('sell', 11)])
+            SortedList([('buy', 10), ('sell', 11), ('sell', 12)], key=...)
+
+    You'll find bellow the detailed documentation for each method of
+    SortedList.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import itertools
+
+from bisect import bisect_left, bisect_right, insort_right
+
+import ww
+
+from ww.types import Union, Iterable, Callable, Any  # noqa
+
+# Number of items in a chunk we aim for. Bigger chunks mean less chunks to
+# bisect and manage, but slower inserts and deletes in each of them.
+LOAD = 1000
+
+
+class SortedList(object):
+    """ List keeping its items sorted
+
+        Use l.sorted_list() to create it.
+    """
+
+    def __init__(self, iterable=(), key=None):
+        # type: (Iterable, Callable) -> None
+        self.key = key
+        self.clear()
+        self.update(iterable)
+
+    def clear(self):
+        # type: () -> SortedList
+        """ Remove all the items
+
+            Returns:
+                The sorted list itself, to allow chaining.
+        """
+        self._lists = []  # type: list
+        # With no key, the keys are the values and we only store them once
+        self._keys = [] if self.key else self._lists  # type: list
+        self._maxes = []  # type: list
+        self._offsets = None  # type: Union[list, None]
+        self._len = 0
+        return self
+
+    def _key(self, value):
+        # type: (Any) -> Any
+        return self.key(value) if self.key else value
+
+    def _reset(self, values):
+        # type: (list) -> None
+        """ Replace all the items by these sorted values """
+        self.clear()
+        for start in range(0, len(values), LOAD):
+            chunk = values[start:start + LOAD]
+            self._lists.append(chunk)
+            if self.key:
+                self._keys.append([self.key(value) for value in chunk])
+            self._maxes.append(self._keys[-1][-1])
+        self._len = len(values)
+
+    def update(self, iterable):
+        # type: (Iterable) -> SortedList
+        """ Add all the items of an iterable
+
+            If there are many of them, the whole list is sorted again,
+            which is faster than adding them one by one.
+
+            Args:
+                iterable: the items to add.
+
+            Returns:
+                The sorted list itself, to allow chaining.
+
+            Example:
+
+                >>> from ww import l
+                >>> l.sorted_list([3, 1]).update([2, 0])
+                SortedList([0, 1, 2, 3])
+        """
+        values = list(iterable)
+        if len(values) * 4 >= self._len:
+            # Existing items first, so they stay before equal new items
+            values = list(self) + values
+            self._reset(sorted(values, key=self.key))
+        else:
+            for value in values:
+                self.add(value)
+        return self
+
+    def add(self, value):
+        # type: (Any) -> SortedList
+        """ Insert an item at its sorted position, after equal items
+
+            Args:
+                value: the item to add.
+
+            Returns:
+                The sorted list itself, to allow chaining.
+
+            Example:
+
+                >>> from ww import l
+                >>> l.sorted_list([1, 3]).add(2).add(0)
+                SortedList([0, 1, 2, 3])
+        """
+        key = self._key(value)
+        if not self._maxes:
+            self._lists.append([value])
+            if self.key:
+                self._keys.append([key])
+            self._maxes.append(key)
+        else:
+            pos = min(bisect_right(self._maxes, key), len(self._maxes) - 1)
+            keys = self._keys[pos]
+            if self.key:
+                idx = bisect_right(keys, key)
+                keys.insert(idx, key)
+                self._lists[pos].insert(idx, value)
+            else:
+                insort_right(keys, key)
+            self._maxes[pos] = keys[-1]
+            self._split(pos)
+        self._len += 1
+        self._offsets = None
+        return self
+
+    def _split(self, pos):
+        # type: (int) -> None
+        """ Cut the chunk at `pos` in two halves if it grew too big """
+        if len(self._lists[pos]) <= LOAD * 2:
+            return
+        for chunks in ((self._lists, self._keys) if self.key
+                       else (self._lists,)):
+            chunk = chunks[pos]
+            chunks[pos:pos + 1] = [chunk[:LOAD], chunk[LOAD:]]
+        self._maxes[pos:pos + 1] = [self._keys[pos][-1],
+                                    self._keys[pos + 1][-1]]
+
+    def _delete(self, pos, idx):
+        # type: (int, int) -> Any
+        """ Remove the item at `idx` in the chunk at `pos`, and return it """
+        value = self._lists[pos].pop(idx)
+        if self.key:
+            self._keys[pos].pop(idx)
+        self._len -= 1
+        self._offsets = None
+        if not self._lists[pos]:
+            del self._lists[pos], self._maxes[pos]
+            if self.key:
+                del self._keys[pos]
+        else:
+            self._maxes[pos] = self._keys[pos][-1]
+            self._merge(pos)
+        return value
+
+    def _merge(self, pos):
+        # type: (int) -> None
+        """ Join the chunk at `pos` with its neighbour if it got too small """
+        if len(self._lists[pos]) >= LOAD // 2 or len(self._lists) < 2:
+            return
+        pos = max(pos - 1, 0)
+        for chunks in ((self._lists, self._keys) if self.key
+                       else (self._lists,)):
+            chunks[pos:pos + 2] = [chunks[pos] + chunks[pos + 1]]
+        self._maxes[pos:pos + 2] = [self._keys[pos][-1]]
+        self._split(pos)
+
+    def _find(self, value):
+        # type: (Any) -> Union[tuple, None]
+        """ Return the chunk and the position in the chunk of `value` """
+        key = self._key(value)
+        pos = bisect_left(self._maxes, key)
+        # Several items can have the same key, and be in several chunks
+        while pos < len(self._maxes):
+            keys, values = self._keys[pos], self._lists[pos]
+            idx = bisect_left(keys, key)
+            while idx < len(keys) and keys[idx] == key:
+                if values[idx] == value:
+                    return pos, idx
+                idx += 1
+            if idx < len(keys):
+                return None
+            pos += 1
+        return None
+
+    def remove(self, value):
+        # type: (Any) -> SortedList
+        """ Remove the first item equal to `value`
+
+            Args:
+                value: the item to remove.
+
+            Returns:
+                The sorted list itself, to allow chaining.
+
+            Raises:
+                ValueError: if the item is not in the list.
+
+            Example:
+
+                >>> from ww import l
+                >>> l.sorted_list([1, 2, 2]).remove(2)
+                SortedList([1, 2])
+        """
+        location = self._find(value)
+        if location is None:
+            raise ValueError('{!r} is not in the sorted list'.format(value))
+        self._delete(*location)
+        return self
+
+    def discard(self, value):
+        # type: (Any) -> SortedList
+        """ Like remove(), but do nothing if the item is not in the list
+
+            Example:
+
+                >>> from ww import l
+                >>> l.sorted_list([1, 2]).discard(3).discard(1)
+                SortedList([2])
+        """
+        location = self._find(value)
+        if location is not None:
+            self._delete(*location)
+        return self
+
+    def __contains__(self, value):
+        return self._find(value) is not None
+
+    def _offset(self, pos):
+        # type: (int) -> int
+        """ Return the index in the sorted list of the chunk at `pos` """
+        if self._offsets is None:
+            offsets = [0]
+            for chunk in self._lists:
+                offsets.append(offsets[-1] + len(chunk))
+            self._offsets = offsets
+        return self._offsets[pos]
+
+    def _locate(self, index):
+        # type: (int) -> tuple
+        """ Return the chunk and the position in the chunk of an index """
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError('sorted list index out of range')
+        self._offset(0)
+        pos = bisect_right(self._offsets, index) - 1
+        return pos, index - self._offsets[pos]
+
+    def _bisect(self, key, bisect):
+        # type: (Any, Callable) -> int
+        pos = bisect(self._maxes, key)
+        if pos == len(self._maxes):
+            return self._len
+        return self._offset(pos) + bisect(self._keys[pos], key)
+
+    def bisect_left(self, value):
+        # type: (Any) -> int
+        """ Return the index where to insert value, before equal items
+
+            Example:
+
+                >>> from ww import l
+                >>> l.sorted_list([1, 2, 2, 3]).bisect_left(2)
+                1
+        """
+        return self._bisect(self._key(value), bisect_left)
+
+    def bisect_right(self, value):
+        # type: (Any) -> int
+        """ Return the index where to insert value, after equal items
+
+            Example:
+
+                >>> from ww import l
+                >>> l.sorted_list([1, 2, 2, 3]).bisect_right(2)
+                3
+        """
+        return self._bisect(self._key(value), bisect_right)
+
+    def index(self, value):
+        # type: (Any) -> int
+        """ Return the index of the first item equal to `value`
+
+            Raises:
+                ValueError: if the item is not in the list.
+
+            Example:
+
+                >>> from ww import l
+                >>> l.sorted_list([3, 1, 2]).index(3)
+                2
+        """
+        location = self._find(value)
+        if location is None:
+            raise ValueError('{!r} is not in the sorted list'.format(value))
+        pos, idx = location
+        return self._offset(pos) + idx
+
+    def count(self, value):
+        # type: (Any) -> int
+        """ Return the number of items equal to `value` """
+        if not self.key:
+            return self.bisect_right(value) - self.bisect_left(value)
+        return sum(1 for item in self.irange(value, value) if item == value)
+
+    def _islice(self, start, stop):
+        # type: (int, int) -> Iterable
+        """ Iterate on the items from index `start` to index `stop` """
+        if start >= stop:
+            return iter(())
+        pos, idx = self._locate(start)
+        chunks = itertools.chain([self._lists[pos][idx:]],
+                                 itertools.islice(self._lists, pos + 1, None))
+        items = itertools.chain.from_iterable(chunks)
+        return itertools.islice(items, stop - start)
+
+    def irange(self, minimum=None, maximum=None, inclusive=(True, True),
+               reverse=False):
+        # type: (Any, Any, tuple, bool) -> ww.g
+        """ Iterate on the items between minimum and maximum
+
+            Args:
+                minimum: the lowest item to yield. None means no limit.
+                maximum: the highest item to yield. None means no limit.
+                inclusive: a pair of booleans telling if items equal to
+                           minimum and maximum are included.
+                reverse: yield the items from the highest to the lowest.
+
+            Returns:
+                A g() of the items.
+
+            Example:
+
+                >>> from ww import l
+                >>> numbers = l.sorted_list(range(10))
+                >>> numbers.irange(3, 6).list()
+                [3, 4, 5, 6]
+                >>> numbers.irange(3, 6, inclusive=(False, False)).list()
+                [4, 5]
+                >>> numbers.irange(maximum=2, reverse=True).list()
+                [2, 1, 0]
+        """
+        start, stop = 0, self._len
+        if minimum is not None:
+            bisect = bisect_left if inclusive[0] else bisect_right
+            start = self._bisect(self._key(minimum), bisect)
+        if maximum is not None:
+            bisect = bisect_right if inclusive[1] else bisect_left
+            stop = self._bisect(self._key(maximum), bisect)
+        if reverse:
+            return ww.g(self[index] for index in range(stop - 1, start - 1,
+                                                       -1))
+        return ww.g(self._islice(start, stop))
+
+    def __getitem__(self, index):
+        """ Get an item by index, or a l() of items with a slice
+
+            Example:
+
+                >>> from ww import l
+                >>> numbers = l.sorted_list([4, 2, 3, 1])
+                >>> numbers[1], numbers[-1]
+                (2, 4)
+                >>> numbers[1:3]
+                [2, 3]
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step == 1:
+                return ww.l(self._islice(start, stop))
+            return ww.l(self)[index]
+        pos, idx = self._locate(index)
+        return self._lists[pos][idx]
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            values = ww.l(self)
+            del values[index]
+            self._reset(values)
+        else:
+            self._delete(*self._locate(index))
+
+    def pop(self, index=-1):
+        # type: (int) -> Any
+        """ Remove the item at `index` and return it
+
+            Example:
+
+                >>> from ww import l
+                >>> numbers = l.sorted_list([1, 2, 3])
+                >>> numbers.pop(), numbers.pop(0), numbers
+                (3, 1, SortedList([2]))
+        """
+        return self._delete(*self._locate(index))
+
+    def __len__(self):
+        return self._len
+
+    @property
+    def len(self):
+        # type: () -> int
+        """ Return the number of items """
+        return self._len
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self._lists)
+
+    def __reversed__(self):
+        return (value for chunk in reversed(self._lists)
+                for value in reversed(chunk))
+
+    def to_l(self):
+        # type: () -> ww.l
+        """ Return the items in a ListWrapper """
+        return ww.l(self)
+
+    def __repr__(self):
+        key = ', key=...' if self.key else ''
+        return 'SortedList({!r}{})'.format(list(self), key)
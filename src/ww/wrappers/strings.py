@@ -138,7 +138,6 @@ import inspect
 from textwrap import dedent
 
 import six
-import chardet
 
 from future.utils import raise_from
 
@@ -151,7 +150,8 @@ except ImportError:  # pragma: no cover
 from six import with_metaclass
 
 import ww
-from ww.tools.strings import multisplit, multireplace
+from ww.tools.strings import (multisplit, multireplace, detect_encoding,
+                              iter_decode, iter_lines, DECODE_BLOCK_SIZE)
 from ww.types import (Union, unicode, str_istr, str_istr_icallable,  # noqa
                       C, I, Iterable, Callable, Any)
 
@@ -644,8 +644,9 @@ class StringWrapper(with_metaclass(MetaS, unicode)):  # type: ignore
         return self.__class__(unicode.join(self, formatted_iterable))
 
     @classmethod
-    def from_bytes(cls, byte_string, encoding=None, errors='strict'):
-        # type: (bytes, str, str) -> ww.s.StringWrapper
+    def from_bytes(cls, byte_string, encoding=None, errors='strict',
+                   detect=False, source=None):
+        # type: (bytes, str, str, bool, Any) -> ww.s.StringWrapper
         u""" Convenience proxy to byte.decode().
 
             This let you decode bytes from the StringWrapper class the
@@ -663,9 +664,20 @@ class StringWrapper(with_metaclass(MetaS, unicode)):  # type: ignore
                         an exception.  'ignore' will skip the faulty bits.
                         'replace' will replace them with '?'.
 
+                detect: if True and no encoding is given, guess it with
+                        ww.tools.strings.detect_encoding(). If False, the
+                        bytes are never looked at to find the encoding.
+
+                source: where the bytes come from, such as a file path, to
+                        cache the detected encoding for this source. Only
+                        used with detect=True.
+
             Returns:
                 The decoded strings wrapped in StringWrapper.
 
+            Raises:
+                ValueError: if there is no encoding and we can't detect it.
+
             Example:
 
                 >>> from ww import s
@@ -678,21 +690,76 @@ class StringWrapper(with_metaclass(MetaS, unicode)):  # type: ignore
                 P��re No��l
                 >>> print(s.from_bytes(utf8_text, 'ascii', 'ignore'))
                 Pre Nol
+                >>> print(s.from_bytes(utf8_text, detect=True))
+                Père Noël
         """
-        if encoding is None:
-            encoding = chardet.detect(byte_string)['encoding']
+        if encoding is None and detect:
             # TODO: strip() and ignore first line ?
-            raise ValueError(ww.f >> """
+            encoding = detect_encoding(byte_string, source)
+            if encoding is None:
+                raise ValueError(ww.s >> """
+                                 from_bytes() could not detect the encoding
+                                 of these bytes. If you can't find out what
+                                 has been used, you can get a partial
+                                 decoding with encoding="ascii" and
+                                 errors='replace' or 'ignore'.
+                                 """)
+
+        if encoding is None:
+            raise ValueError(ww.s >> """
                              from_bytes() expects a second argument:
                              'encoding'. If you don't know which encoding,
-                             try '{encoding}' or 'utf8'. If it fails and you
-                             can't find out what has been used, you can get
-                             a partial decoding with encoding="ascii" and
-                             errors='replace' or 'ignore'.
+                             try 'utf8', or pass detect=True to guess it.
+                             If it fails and you can't find out what has
+                             been used, you can get a partial decoding
+                             with encoding="ascii" and errors='replace'
+                             or 'ignore'.
                              """)
 
         return cls(byte_string.decode(encoding, errors=errors))
 
+    @classmethod
+    def from_stream(cls, stream, encoding=None, errors='strict',
+                    block_size=DECODE_BLOCK_SIZE, lines=False):
+        # type: (Any, str, str, int, bool) -> ww.g
+        u""" Lazily decode a binary stream into s() chunks, or lines
+
+            Unlike from_bytes(), the whole content is never in memory:
+            bytes are read by blocks, and decoded with an incremental
+            decoder that handles characters cut between two blocks.
+
+            Args:
+                stream: a binary file-like object, with a read() method.
+                encoding: the encoding of the stream. If None, it's
+                          detected from the first block.
+                errors: the policy to use when encountering error while
+                        trying to decode the text, as for from_bytes().
+                block_size: the number of bytes read at once.
+                lines: yield lines, with their line break, instead of
+                       chunks of about block_size characters.
+
+            Returns:
+                A g() of StringWrapper.
+
+            Raises:
+                ValueError: if the encoding can't be detected.
+
+            Example:
+
+                >>> import io
+                >>> from ww import s
+                >>> data = u'Père Noël\\nest là\\n'.encode('utf8')
+                >>> lines = s.from_stream(io.BytesIO(data), 'utf8', lines=True)
+                >>> for line in lines:
+                ...     print(line.strip())
+                Père Noël
+                est là
+        """
+        chunks = iter_decode(stream, encoding, errors, block_size)
+        if lines:
+            chunks = iter_lines(chunks)
+        return ww.g(chunks).map(cls)
+
     def format(self, *args, **kwargs):
         # type: (*Any, **Any) -> ww.s.StringWrapper
         """ Like str.format(), with f-string features. Returns StringWrapper
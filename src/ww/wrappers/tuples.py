@@ -1,11 +1,21 @@
-# TODO: anonymous namedtuple that can be created inline
 # TODO: tuples can be either with names or not (but not both)
 
+import re
+import keyword
+import operator
+
 import ww
 
+from ww.tools import binary
+from ww.wrappers.views import SequenceView
+
 
 # TODO: inherit from BaseWrapper
 class TupleWrapper(tuple):
+
+    # No __dict__, so each tuple is as small as a builtin one
+    __slots__ = ()
+
     @property
     def len(self):
         return len(self)
@@ -41,11 +51,151 @@ class TupleWrapper(tuple):
             ValueError: value is not in list
         """
 
-        for i, x in enumerate(self):
-            if x == value:
-                return i
+        try:
+            return tuple.index(self, value)
+        except ValueError:
+            raise ValueError("{} is not in list".format(value))
+
+    def indexed(self):
+        """Return a copy of the tuple with a hash index of its values
+
+        Use it when you call index(), count() or `in` many times on the
+        same tuple: they become O(1) instead of O(n). The index is built
+        on the first lookup, and not at all for tuples smaller than
+        INDEX_THRESHOLD, for which a linear search is fast enough.
+
+        Returns:
+            An IndexedTupleWrapper.
+
+        Example:
+
+            >>> from ww import t
+            >>> tple = t('abcab' * 10).indexed()
+            >>> tple.index('c'), tple.count('a'), 'z' in tple
+            (2, 20, False)
+            >>> tple.positions('b')[:3]
+            (1, 4, 6)
+        """
+        return IndexedTupleWrapper(self)
+
+    @classmethod
+    def record(cls, **fields):
+        """Create a record: a tuple with named fields, like a namedtuple
+
+        The record class is created once for each set of field names, and
+        cached. Records use the memory of a tuple, much less than a dict,
+        and reading a field is as fast as indexing.
+
+        Keyword arguments have no order before Python 3.6, so fields are
+        sorted by name, here and in t.records(): the same fields always
+        give the same class, with the same layout.
+
+        A field can have the name of a method, e.g: 'count', and then hides
+        it. Use RecordWrapper.count(record, value) to call the method.
+
+        Args:
+            fields: the name and value of each field.
+
+        Returns:
+            A Record, subclass of TupleWrapper.
+
+        Raises:
+            ValueError: if a field name is not valid.
+
+        Example:
+
+            >>> from ww import t
+            >>> point = t.record(y=2, x=1)
+            >>> point
+            Record(x=1, y=2)
+            >>> point.x, point[1], point.len
+            (1, 2, 2)
+            >>> type(t.record(x=3, y=4)) is type(point)
+            True
+            >>> t.record(index=1, count=2).count
+            2
+        """
+        names = tuple(sorted(fields))
+        return record_class(names)(fields[name] for name in names)
+
+    @classmethod
+    def records(cls, dicts):
+        """Lazily convert dicts to records
+
+        As with t.record(), fields are sorted by name, so dicts with the
+        same keys share the same record class, whatever the order of their
+        keys.
+
+        Args:
+            dicts: an iterable of dicts or mappings with string keys.
+
+        Returns:
+            A g() of Records.
+
+        Example:
+
+            >>> from ww import t
+            >>> rows = [{'name': 'foo', 'age': 1}, {'name': 'bar', 'age': 2}]
+            >>> t.records(rows).map(lambda row: row.name).list()
+            ['foo', 'bar']
+            >>> t.records(rows).next()
+            Record(age=1, name='foo')
+        """
+        def convert(dicts):
+            keys, record, values = None, None, None
+            for mapping in dicts:
+                # Consecutive dicts usually have the same keys, in the
+                # same order, so we sort them only when they change
+                if tuple(mapping) != keys:
+                    keys = tuple(mapping)
+                    names = tuple(sorted(keys))
+                    record, values = record_class(names), _getter(names)
+                yield record(values(mapping))
+        return ww.g(convert(dicts))
+
+    def pack(self, fmt):
+        """Pack the values in bytes, following a struct format
+
+        The struct.Struct for the format is cached.
+
+        Args:
+            fmt: a struct format, or a struct.Struct.
+
+        Returns:
+            The bytes of the record.
+
+        Raises:
+            struct.error: if the values don't match the format.
 
-        raise ValueError("{} is not in list".format(value))
+        Example:
+
+            >>> from ww import t
+            >>> t((1, 2)).pack('>HB')
+            b'\\x00\\x01\\x02'
+        """
+        return binary.pack(fmt, self)
+
+    def view(self, start=None, stop=None, step=None):
+        """Return a view on a part of the tuple, without copying it
+
+        Unlike a slice, creating a view is O(1), and so is creating a view
+        of a view.
+
+        Args:
+            start: index of the first item, as for a slice.
+            stop: index after the last item, as for a slice.
+            step: step between each item, as for a slice.
+
+        Returns:
+            A SequenceView.
+
+        Example:
+
+            >>> from ww import t
+            >>> t(range(10)).view(1, 9, 3)
+            SequenceView([1, 4, 7])
+        """
+        return SequenceView(self)[start:stop:step]
 
     def to_l(self):
         """
@@ -99,3 +249,182 @@ class TupleWrapper(tuple):
                                       "2 elements.").format(element, i, size))
 
             raise
+
+
+# Under this size, tuples are not indexed: a linear search is as fast as
+# a hash lookup, and avoids building the index.
+INDEX_THRESHOLD = 32
+
+
+class IndexedTupleWrapper(TupleWrapper):
+    """ TupleWrapper with a lazy hash index of its values
+
+        Use t().indexed() to create it.
+    """
+
+    _positions = None
+
+    def _index(self):
+        """ Return a dict of value => list of positions, or None
+
+            None means there is no index: the tuple is too small, or
+            contains unhashable values.
+        """
+        if self._positions is None:
+            positions = {}
+            if len(self) >= INDEX_THRESHOLD:
+                try:
+                    for i, value in enumerate(self):
+                        positions.setdefault(value, []).append(i)
+                except TypeError:  # unhashable value
+                    positions = {}
+            # An empty dict means no index, so we don't try again
+            self._positions = positions
+        return self._positions or None
+
+    def _lookup(self, value):
+        """ Return the list of positions of value, or None without index """
+        index = self._index()
+        if index is None:
+            return None
+        try:
+            return index.get(value, ())
+        except TypeError:  # unhashable value, so not in the index
+            return ()
+
+    def positions(self, value):
+        """Return the positions of all the items equal to value
+
+        Example:
+
+            >>> from ww import t
+            >>> t('abcab').indexed().positions('a')
+            (0, 3)
+        """
+        positions = self._lookup(value)
+        if positions is None:
+            return TupleWrapper(i for i, x in enumerate(self) if x == value)
+        return TupleWrapper(positions)
+
+    def index(self, value):
+        positions = self._lookup(value)
+        if positions is None:
+            return TupleWrapper.index(self, value)
+        if not positions:
+            raise ValueError("{} is not in list".format(value))
+        return positions[0]
+
+    def count(self, value):
+        positions = self._lookup(value)
+        if positions is None:
+            return tuple.count(self, value)
+        return len(positions)
+
+    def __contains__(self, value):
+        positions = self._lookup(value)
+        if positions is None:
+            return tuple.__contains__(self, value)
+        return bool(positions)
+
+    def indexed(self):
+        return self
+
+
+class RecordWrapper(TupleWrapper):
+    """ Base class of the records created by t.record() and t.records() """
+
+    __slots__ = ()
+    _fields = ()  # type: tuple
+
+    @property
+    def fields(self):
+        """ Return the names of the fields """
+        return self._fields
+
+    def to_d(self):
+        """Return a d() mapping field names to values
+
+        Example:
+
+            >>> from ww import t
+            >>> t.record(a=1).to_d()
+            {'a': 1}
+        """
+        return ww.d(zip(self._fields, self))
+
+    def replace(self, **fields):
+        """Return a copy of the record, with some fields changed
+
+        Example:
+
+            >>> from ww import t
+            >>> t.record(a=1, b=2).replace(b=3)
+            Record(a=1, b=3)
+        """
+        values = [fields.pop(name, value)
+                  for name, value in zip(self._fields, self)]
+        if fields:
+            raise ValueError('Unknown fields: {}'.format(', '.join(fields)))
+        return self.__class__(values)
+
+    def __reduce__(self):
+        # Record classes are created on the fly, so we pickle how to
+        # create them again instead of their name.
+        return (_make_record, (self._fields, tuple(self)))
+
+    def __repr__(self):
+        values = ('{}={!r}'.format(*pair) for pair in zip(self._fields, self))
+        return 'Record({})'.format(', '.join(values))
+
+
+_RECORD_CLASSES = {}  # type: dict
+
+_FIELD_NAME = re.compile(r'[^\d\W]\w*\Z', re.UNICODE)
+
+
+def record_class(fields):
+    """ Return the record class for these field names, creating it once
+
+        Example:
+
+            >>> from ww.wrappers.tuples import record_class
+            >>> Point = record_class(('x', 'y'))
+            >>> Point((1, 2)).y
+            2
+            >>> record_class(('x', 'y')) is Point
+            True
+    """
+    try:
+        return _RECORD_CLASSES[fields]
+    except KeyError:
+        pass
+
+    # Fields are properties of the subclass, so they can hide the methods
+    # of RecordWrapper, but not the private attributes
+    namespace = {'__slots__': (), '_fields': fields}
+    for i, name in enumerate(fields):
+        if (not _FIELD_NAME.match(name) or name.startswith('_') or
+                keyword.iskeyword(name)):
+            raise ValueError('{!r} is not a valid field name'.format(name))
+        if name in namespace:
+            raise ValueError('"{}" is a duplicated field name'.format(name))
+        namespace[name] = property(operator.itemgetter(i),
+                                   doc='Field number {}'.format(i))
+
+    cls = type(str('Record'), (RecordWrapper,), namespace)
+    _RECORD_CLASSES[fields] = cls
+    return cls
+
+
+def _getter(names):
+    """ Return a function getting the values of `names` from a mapping """
+    if len(names) == 1:
+        name = names[0]
+        return lambda mapping: (mapping[name],)
+    if not names:
+        return lambda mapping: ()
+    return operator.itemgetter(*names)
+
+
+def _make_record(fields, values):
+    return record_class(fields)(values)
@@ -0,0 +1,193 @@
+# coding: utf-8
+
+"""
+    SequenceView gives access to a part of a list or a tuple without
+    copying it.
+
+    Slicing a list copies the references to all the items of the slice.
+    A view only stores the sequence and a range of the indices it covers,
+    so creating it is O(1) whatever its size, and slicing a view slices
+    the range, so a view of a view is O(1) too.
+
+    A view reads the items of the sequence when you access them: changes
+    to a list are visible in its views. If the list shrinks, the view
+    skips the indices past its end, but it doesn't grow with the list.
+    Nothing is copied until you explicitly convert it with to_l() or
+    to_t().
+
+    Example:
+
+        You usually create it with l().view() or t().view()::
+
+            >>> from ww import l
+            >>> numbers = l(range(10))
+            >>> window = numbers.view(2, 8)
+            >>> window
+            SequenceView([2, 3, 4, 5, 6, 7])
+            >>> window[1:5:2]
+            SequenceView([3, 5])
+            >>> window.len, window.join(',')
+            (6, u'2,3,4,5,6,7')
+            >>> numbers[2] = 42
+            >>> window[0]
+            42
+            >>> window.to_l()
+            [42, 3, 4, 5, 6, 7]
+            >>> del numbers[5:]
+            >>> window
+            SequenceView([42, 3, 4])
+
+    You'll find bellow the detailed documentation for each method of
+    SequenceView.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+import builtins
+
+try:
+    from collections.abc import Sequence
+except ImportError:  # pragma: no cover
+    from collections import Sequence
+
+import ww
+
+from ww.types import Union, Any  # noqa
+
+
+class SequenceView(Sequence):
+    """ Read only view on a range of indices of a sequence
+
+        Use l().view() or t().view() to create it.
+    """
+
+    __slots__ = ('sequence', 'indices')
+
+    def __init__(self, sequence, indices=None):
+        # type: (Sequence, builtins.range) -> None
+        """ Create a view on `sequence`, for the given `indices`
+
+            Args:
+                sequence: the list, tuple or any sequence to look at.
+                indices: a range of the indices to look at. Default to
+                         the entire sequence.
+
+            Example:
+
+                >>> from ww.wrappers.views import SequenceView
+                >>> SequenceView('abcd', range(1, 4, 2))
+                SequenceView(['b', 'd'])
+        """
+        if isinstance(sequence, SequenceView):
+            indices = sequence.indices if indices is None else indices
+            sequence = sequence.sequence
+        self.sequence = sequence
+        if indices is None:
+            indices = builtins.range(len(sequence))
+        self.indices = indices
+
+    def view(self, start=None, stop=None, step=None):
+        # type: (int, int, int) -> SequenceView
+        """ Return a view on a part of this view, like view[start:stop:step]
+
+            Example:
+
+                >>> from ww import t
+                >>> t(range(10)).view(step=2).view(1, 3)
+                SequenceView([2, 4])
+        """
+        return self[start:stop:step]
+
+    def __getitem__(self, index):
+        # type: (Union[int, slice]) -> Any
+        """ Get an item, or a view for a slice, without copying anything
+
+            Example:
+
+                >>> from ww import l
+                >>> view = l(range(10)).view(2, 8)
+                >>> view[0], view[-1]
+                (2, 7)
+                >>> view[::-2]
+                SequenceView([7, 5, 3])
+        """
+        indices = self._indices()
+        if isinstance(index, slice):
+            return self.__class__(self.sequence, indices[index])
+        return self.sequence[indices[index]]
+
+    def _indices(self):
+        # type: () -> builtins.range
+        """ Return the indices of the view still in the sequence """
+        indices, size = self.indices, len(self.sequence)
+        if not indices or max(indices[0], indices[-1]) < size:
+            return indices
+        # Indices are positive, so only the biggest ones can be too big
+        if indices.step > 0:
+            return indices[:len(builtins.range(indices.start, size,
+                                               indices.step))]
+        return indices[len(builtins.range(indices.start, size - 1,
+                                          indices.step)):]
+
+    def __len__(self):
+        return len(self._indices())
+
+    @property
+    def len(self):
+        # type: () -> int
+        """ Return the number of items in the view """
+        return len(self._indices())
+
+    def __iter__(self):
+        return builtins.map(self.sequence.__getitem__, self._indices())
+
+    def __reversed__(self):
+        return builtins.map(self.sequence.__getitem__,
+                            reversed(self._indices()))
+
+    def join(self, joiner, formatter=lambda s, t: t.format(s),
+             template="{}"):
+        """ Join values and convert to string
+
+            Example:
+
+                >>> from ww import t
+                >>> t('0123').view(1).join(',')
+                u'1,2,3'
+        """
+        return ww.s(joiner).join(self, formatter, template)
+
+    def to_l(self):
+        # type: () -> ww.l
+        """ Copy the items of the view in a ListWrapper """
+        return ww.l(self)
+
+    def to_t(self):
+        # type: () -> ww.t
+        """ Copy the items of the view in a TupleWrapper """
+        return ww.t(self)
+
+    def to_d(self):
+        # type: () -> ww.d
+        """ Copy the items of the view, which must be pairs, in a d() """
+        return ww.t(self).to_d()
+
+    def __eq__(self, other):
+        if not isinstance(other, (SequenceView, list, tuple)):
+            return NotImplemented
+        return len(self) == len(other) and all(
+            a == b for a, b in builtins.zip(self, other))
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None  # type: ignore
+
+    def __reduce__(self):
+        # Only send the items of the view to other processes, not the
+        # whole sequence
+        return (self.__class__, (tuple(self),))
+
+    def __repr__(self):
+        return 'SequenceView({!r})'.format(list(self))
@@ -0,0 +1,218 @@
+# coding: utf-8
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+import math
+import array
+
+import pytest
+
+from ww import a, g, l
+from ww.wrappers import arrays
+from ww.tools.sharedmem import SharedMemoryPool
+
+BACKENDS = ['array']
+if arrays.numpy is not None:  # pragma: no cover
+    BACKENDS.append('numpy')
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    return request.param
+
+
+def test_create(backend):
+
+    assert a([1, 2, 3], backend=backend).tolist() == [1, 2, 3]
+    assert a([1.5, 2], backend=backend).tolist() == [1.5, 2.0]
+    assert a([True, False], backend=backend).tolist() == [True, False]
+    assert a(range(3), backend=backend).tolist() == [0, 1, 2]
+    assert a((x for x in range(3)), backend=backend).tolist() == [0, 1, 2]
+    assert a(l([1, 2]), 'd', backend=backend).tolist() == [1.0, 2.0]
+    assert a(backend=backend).len == 0
+    assert a([1, 2], backend=backend).backend == backend
+
+    with pytest.raises(TypeError):
+        a(['foo'], backend=backend)
+
+    with pytest.raises(ValueError):
+        a([1], typecode='u', backend=backend)
+
+    with pytest.raises(ValueError):
+        a([1], backend='foo')
+
+
+def test_zero_copy(backend):
+
+    numbers = array.array('d', [1, 2, 3])
+    wrapped = a(numbers, backend=backend)
+    wrapped[0] = 10
+    assert numbers[0] == 10
+    assert a(wrapped).data is wrapped.data
+
+    with SharedMemoryPool() as pool:
+        chunk = pool.array([1, 2, 3], 'q')
+        wrapped = a(chunk, backend=backend)
+        wrapped[1] = 20
+        assert chunk.tolist() == [1, 20, 3]
+        assert wrapped.sum() == 24
+        del wrapped
+        chunk.release()
+
+    chunks = g(range(10)).array_chunks(4, 'q').map(a).list()
+    assert [chunk.sum() for chunk in chunks] == [6, 22, 17]
+
+
+def test_arithmetic(backend):
+
+    numbers = a([1, 2, 3, 4], backend=backend)
+    assert (numbers + 1).tolist() == [2, 3, 4, 5]
+    assert (1 + numbers).tolist() == [2, 3, 4, 5]
+    assert (numbers - 1).tolist() == [0, 1, 2, 3]
+    assert (10 - numbers).tolist() == [9, 8, 7, 6]
+    assert (numbers * numbers).tolist() == [1, 4, 9, 16]
+    assert (numbers * [1, 0, 1, 0]).tolist() == [1, 0, 3, 0]
+    assert (numbers / 2).tolist() == [0.5, 1, 1.5, 2]
+    assert (12 / numbers).tolist() == [12, 6, 4, 3]
+    assert (numbers // 2).tolist() == [0, 1, 1, 2]
+    assert (numbers % 2).tolist() == [1, 0, 1, 0]
+    assert (numbers ** 2).tolist() == [1, 4, 9, 16]
+    assert (2 ** numbers).tolist() == [2, 4, 8, 16]
+    assert (numbers * 0.5).tolist() == [0.5, 1, 1.5, 2]
+    assert (-numbers).tolist() == [-1, -2, -3, -4]
+    assert abs(-numbers).tolist() == [1, 2, 3, 4]
+    assert ((numbers + 1) * 2 - numbers).tolist() == [3, 4, 5, 6]
+
+    with pytest.raises(ValueError):
+        numbers + [1, 2]
+
+
+def test_same_results_for_all_backends(backend):
+
+    assert a([1, 2], backend=backend).typecode == 'q'
+    assert a(array.array('l', [1]), backend=backend).typecode == 'q'
+    assert a([1.5], backend=backend).typecode == 'd'
+
+    # numpy keeps the type and wraps around
+    unsigned = a([1, 2], 'B', backend=backend)
+    assert (-unsigned).tolist() == [255, 254]
+    assert (-unsigned).typecode == 'B'
+    assert (~unsigned).tolist() == [254, 253]
+    assert abs(unsigned).typecode == 'B'
+    assert (-a([1.5], 'f', backend=backend)).typecode == 'f'
+    assert abs(a([-2 ** 63], backend=backend)).tolist() == [-2 ** 63]
+
+    with pytest.raises(TypeError):
+        -a([True], backend=backend)
+
+    big = a([2 ** 62, 3], backend=backend)
+    assert (big * 4).tolist() == [0, 12]
+    assert (big + 2 ** 62).tolist() == [-2 ** 63, 2 ** 62 + 3]
+    assert (big * 4).typecode == 'q'
+
+
+def test_divide_by_zero(backend):
+
+    def same(values, expected):
+        return all(x == y or (math.isnan(x) and math.isnan(y))
+                   for x, y in zip(values.tolist(), expected))
+
+    inf, nan = float('inf'), float('nan')
+    ints = a([1, 0, -1], backend=backend)
+    floats = a([1.5, 0.0, -1.5], backend=backend)
+
+    with pytest.warns(RuntimeWarning):
+        assert same(ints / 0, [inf, nan, -inf])
+    with pytest.warns(RuntimeWarning):
+        assert same(ints // 0, [0, 0, 0])
+    with pytest.warns(RuntimeWarning):
+        assert same(ints % 0, [0, 0, 0])
+    with pytest.warns(RuntimeWarning):
+        assert same(1 // ints, [1, 0, -1])
+    with pytest.warns(RuntimeWarning):
+        assert same(ints / ints, [1, nan, 1])
+    with pytest.warns(RuntimeWarning):
+        assert same(floats // 0, [inf, nan, -inf])
+    with pytest.warns(RuntimeWarning):
+        assert same(floats % 0, [nan, nan, nan])
+
+
+def test_one_dimension_only(backend):
+
+    matrix = memoryview(bytearray(4)).cast('B', (2, 2))
+    with pytest.raises(TypeError):
+        a(matrix, backend=backend)
+
+
+def test_comparisons_and_masks(backend):
+
+    numbers = a([1, 2, 3, 4], backend=backend)
+    assert (numbers > 2).tolist() == [False, False, True, True]
+    assert (numbers == 2).tolist() == [False, True, False, False]
+    assert (numbers != [1, 0, 3, 0]).tolist() == [False, True, False, True]
+    assert numbers[numbers >= 3].tolist() == [3, 4]
+    assert numbers[numbers <= 1].tolist() == [1]
+    assert numbers[~(numbers < 3)].tolist() == [3, 4]
+    assert numbers[(numbers > 1) | (numbers > 10)].tolist() == [2, 3, 4]
+    assert numbers[(numbers > 1) & (numbers < 4)].tolist() == [2, 3]
+    assert numbers[[True, False, False, True]].tolist() == [1, 4]
+    assert (numbers > 2).sum() == 2
+    assert not (numbers == None)  # noqa
+
+    with pytest.raises(IndexError):
+        numbers[[True]]
+
+    with pytest.raises(TypeError):
+        hash(numbers)
+
+
+def test_indexing(backend):
+
+    numbers = a([1, 2, 3, 4], backend=backend)
+    assert numbers[0] == 1
+    assert numbers[-1] == 4
+    assert isinstance(numbers[1:3], a)
+    assert numbers[1:3].tolist() == [2, 3]
+    assert numbers[::-1].tolist() == [4, 3, 2, 1]
+
+    numbers[0] = 10
+    numbers[1:3] = 0
+    assert numbers.tolist() == [10, 0, 0, 4]
+    numbers[1:3] = [5, 6]
+    assert numbers.tolist() == [10, 5, 6, 4]
+
+
+def test_reductions(backend):
+
+    numbers = a([2, 4, 4, 4, 5, 5, 7, 9], backend=backend)
+    assert numbers.sum() == 40
+    assert numbers.min() == 2
+    assert numbers.max() == 9
+    assert numbers.mean() == 5.0
+    assert numbers.std() == 2.0
+    assert numbers.any()
+    assert numbers.all()
+    assert not a([0, 1], backend=backend).all()
+    assert a([0.5, 1], backend=backend).sum() == 1.5
+
+    empty = a(backend=backend)
+    assert empty.sum() == 0
+    for method in (empty.min, empty.max, empty.mean, empty.std):
+        with pytest.raises(ValueError):
+            method()
+
+
+def test_iteration(backend):
+
+    numbers = a(range(10000), backend=backend)
+    assert list(numbers) == list(range(10000))
+    assert all(type(x) is int for x in numbers)
+    assert g(numbers).firsts(3).list() == [0, 1, 2]
+    assert a([1, 4], backend=backend).map(lambda x: x / 2).tolist() == [0.5, 2]
+    assert a([1, 2], backend=backend).to_l() == [1, 2]
+    assert isinstance(a([1, 2], backend=backend).to_l(), l)
+    assert repr(a([1, 2], backend=backend)) == 'a([1, 2])'
+    assert repr(numbers) == ('a([0, 1, 2, 3, 4, 5, 6, 7, 8, 9, ..., 9990, '
+                             '9991, 9992, 9993, 9994, 9995, 9996, 9997, 9998, '
+                             '9999])')
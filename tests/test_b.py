@@ -0,0 +1,166 @@
+# coding: utf-8
+
+from __future__ import absolute_import, division, print_function
+
+import re
+import mmap
+
+import pytest
+
+from ww import g, b
+from ww.tools.binary import pack_many
+from ww.wrappers.bytes import BytesWrapper, _compile
+
+
+def test_slices_share_memory():
+
+    data = bytearray(b'abcdef')
+    wrapper = BytesWrapper(data)
+    part = wrapper[2:4]
+
+    data[2] = ord('C')
+
+    assert part == b'Cd'
+    assert part.len == 2
+    assert part[0] == ord('C')
+    assert part.tobytes() == b'Cd'
+    assert BytesWrapper(part) == part
+
+
+def test_iter_unpack():
+
+    rows = [(i, -i) for i in range(100)]
+    wrapper = BytesWrapper(pack_many('<Ii', rows))
+
+    assert isinstance(wrapper.iter_unpack('<Ii'), g)
+    assert wrapper.iter_unpack('<Ii').list() == rows
+    assert wrapper[8:].iter_unpack('<Ii', count=2).list() == rows[1:3]
+    assert wrapper.unpack('<Ii', 16) == (2, -2)
+    assert wrapper.iter_unpack('<Ii', fields=('a', 'b')).next().b == 0
+
+
+def test_mmap(tmpdir):
+
+    rows = [(i, i / 2) for i in range(1000)]
+    path = tmpdir.join('records.bin')
+    path.write_binary(bytes(pack_many('<qd', rows)))
+
+    with open(str(path), 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with BytesWrapper(mapped) as wrapper:
+            assert wrapper.iter_unpack('<qd').list() == rows
+        mapped.close()
+
+
+def test_b():
+
+    assert b is BytesWrapper
+    assert b(b'abc') == b'abc'
+    assert b(memoryview(b'abc')) == b(bytearray(b'abc'))
+    assert b() == b''
+    assert bytes(b(b'abc')) == b'abc'
+
+
+def test_split():
+
+    data = bytearray(b'a,b;;c/d')
+    parts = b(data).split(b',', b';', b'[/=]').list()
+
+    assert parts == [b'a', b'b', b'', b'c', b'd']
+    assert all(isinstance(part, b) for part in parts)
+
+    data[0] = ord('A')
+    assert parts[0] == b'A'
+
+    assert b(data).split(b',', b';', maxsplit=2).map(bytes).list() == [
+        b'A', b'b', b';c/d']
+    assert b(b'A,B').split(b'a', flags='i').map(bytes).list() == [b'', b',B']
+    assert b(b'abc').split(b',').map(bytes).list() == [b'abc']
+
+    # ints are byte values, not regexes nor numbers of NUL bytes
+    parts = b(b'a.b\x00,c').split(ord('.'), b',').map(bytes).list()
+    assert parts == [b'a', b'b\x00', b'c']
+    assert b(b'a\x00b').split(0).map(bytes).list() == [b'a', b'b']
+
+    with pytest.raises(ValueError):
+        b(b'abc').split(256)
+
+
+def test_patterns_cache():
+
+    assert _compile(b'a|b') is _compile(b'a|b')
+    assert _compile(b'a|b') is not _compile(b'a|b', re.I)
+
+
+def test_split_whitespaces():
+
+    assert b(b' fat  black\tcat\n').split().map(bytes).list() == [
+        b'fat', b'black', b'cat']
+    assert b(b'a b c').split(maxsplit=1).map(bytes).list() == [b'a', b'b c']
+    assert b(b'   ').split().list() == []
+    assert b(b'').split().list() == []
+
+
+def test_strip():
+
+    assert b(b'  a b \n').strip() == b'a b'
+    assert b(b'ab').strip() == b'ab'
+    assert b(b' \t').strip() == b''
+
+
+def test_lines():
+
+    data = b(b'a\nb\r\nc\rd\n\ne')
+
+    assert data.lines().map(bytes).list() == data.tobytes().splitlines()
+    assert data.lines(True).map(bytes).list() == data.tobytes().splitlines(
+        True)
+    assert b(b'a\n').lines().map(bytes).list() == [b'a']
+    assert b(b'').lines().list() == []
+
+
+def test_startswith_endswith():
+
+    data = b(b'GET / HTTP/1.1')
+
+    assert data.startswith(b'GET')
+    assert data.startswith(b'POST', b'GET')
+    assert data.startswith([b'POST', b'GET'])
+    assert data.startswith(bytearray(b'GE'))
+    assert not data.startswith(b'POST', b'PUT')
+    assert not data[:2].startswith(b'GET')
+    assert data.endswith(b'1.0', b'1.1')
+    assert data.endswith((b'1.1',))
+    assert not data.endswith(b'GET / HTTP/1.1 and more')
+
+
+def test_replace():
+
+    data = b(b'a,b;c')
+
+    assert data.replace((b',', b';'), b'-') == b'a-b-c'
+    assert data.replace((b',', b';'), (b'1', b'2')) == b'a1b2c'
+    assert data.replace(b'[,;]', b'', maxreplace=1) == b'ab;c'
+    assert data.replace(b'[a-z]', lambda m: m.group().upper()) == b'A,B;C'
+    assert data == b'a,b;c'
+
+
+def test_contains_and_decode():
+
+    data = b(u'café'.encode('utf8'))
+
+    assert b'caf' in data
+    assert b'.' not in data
+    assert bytearray(b'af') in data
+    assert ord('c') in data
+    assert 0 not in data
+    assert b'' in data
+
+    with pytest.raises(ValueError):
+        256 in data
+
+    with pytest.raises(TypeError):
+        u'caf' in data
+
+    assert data.decode() == u'café'
+    assert data[:4].decode('ascii', 'ignore') == u'caf'
@@ -0,0 +1,101 @@
+# coding: utf-8
+
+from __future__ import absolute_import, division, print_function
+
+import struct
+
+import pytest
+
+from ww import l, t
+from ww.tools import binary
+from ww.tools.binary import (get_struct, pack, pack_many, unpack,
+                             iter_unpack)
+
+
+def test_get_struct():
+
+    compiled = get_struct('<iH')
+
+    assert compiled.size == 6
+    assert get_struct('<iH') is compiled
+    assert get_struct(compiled) is compiled
+
+    with pytest.raises(struct.error):
+        get_struct('Z')
+
+
+def test_get_struct_cache_limit(monkeypatch):
+
+    monkeypatch.setattr(binary, 'MAX_CACHED_STRUCTS', 2)
+    monkeypatch.setattr(binary, '_STRUCTS', {})
+
+    for fmt in ('b', 'h', 'i'):
+        get_struct(fmt)
+
+    assert list(binary._STRUCTS) == ['i']
+
+
+def test_pack():
+
+    assert pack('<hd', (1, 2.5)) == struct.pack('<hd', 1, 2.5)
+    assert t((1, 2.5)).pack('<hd') == struct.pack('<hd', 1, 2.5)
+
+    with pytest.raises(struct.error):
+        pack('<h', (1, 2))
+
+
+def test_pack_many():
+
+    rows = [(i, i * 1.5) for i in range(100)]
+    expected = b''.join(struct.pack('<hd', *row) for row in rows)
+
+    assert pack_many('<hd', rows) == expected
+    assert pack_many('<hd', iter(rows)) == expected
+    assert l(rows).pack_many('<hd') == expected
+    assert pack_many('<hd', []) == b''
+
+
+def test_unpack():
+
+    data = struct.pack('<hd', 1, 2.5) * 2
+
+    assert unpack('<hd', data) == (1, 2.5)
+    assert isinstance(unpack('<hd', data), t)
+    record = unpack('<hd', data, offset=10, fields=('x', 'y'))
+    assert record.x == 1 and record.y == 2.5
+
+    with pytest.raises(struct.error):
+        unpack('<hd', data, offset=11)
+
+
+def test_iter_unpack():
+
+    rows = [(i, i * 1.5) for i in range(10)]
+    data = pack_many('<hd', rows)
+
+    assert list(iter_unpack('<hd', data)) == rows
+    assert all(isinstance(row, t) for row in iter_unpack('<hd', data))
+    assert list(iter_unpack('<hd', data, offset=20, count=2)) == rows[2:4]
+    assert [r.y for r in iter_unpack('<hd', data, fields='xy')][:2] == [
+        0.0, 1.5]
+
+    with pytest.raises(ValueError):
+        iter_unpack('<hd', data, offset=1)
+
+    with pytest.raises(ValueError):
+        iter_unpack('<hd', data, count=11)
+
+
+def test_iter_unpack_releases_buffer():
+
+    data = bytearray(pack_many('<h', [(1,), (2,)]))
+    records = iter_unpack('<h', data)
+    next(records)
+
+    with pytest.raises(BufferError):
+        data.extend(b'\x00\x00')
+
+    records.close()
+    data.extend(b'\x03\x00')
+
+    assert list(iter_unpack('<h', data)) == [(1,), (2,), (3,)]
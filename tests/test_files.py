@@ -0,0 +1,285 @@
+# coding: utf-8
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+import io
+
+import pytest
+
+from ww import g
+from ww.tools.files import LineIndex, iter_line_offsets
+
+
+def write_lines(path, count, end='\n'):
+    with io.open(str(path), 'w', newline='') as f:
+        f.write(''.join('line %s%s' % (i, end) for i in range(count)))
+    return str(path)
+
+
+def test_iter_line_offsets():
+
+    data = b'a\nbb\nccc\nd\n'
+    assert list(iter_line_offsets(io.BytesIO(data), 1)) == [0, 2, 5, 9]
+    assert list(iter_line_offsets(io.BytesIO(data), 2)) == [0, 5]
+    assert list(iter_line_offsets(io.BytesIO(data), 3)) == [0, 9]
+    assert list(iter_line_offsets(io.BytesIO(b'a\nb'), 1)) == [0, 2]
+    assert list(iter_line_offsets(io.BytesIO(b''), 1)) == [0]
+
+    # small blocks force lines to span several of them
+    offsets = list(iter_line_offsets(io.BytesIO(data), 1, block_size=2))
+    assert offsets == [0, 2, 5, 9]
+
+
+def test_line_index(tmpdir):
+
+    path = write_lines(tmpdir.join('file.txt'), 25)
+    index = LineIndex.build(path, every=10)
+    assert len(index) == 25
+    assert list(index.offsets) == [0, 70, 150]
+    assert index.locate(0) == (0, 0)
+    assert index.locate(12) == (70, 2)
+
+    path = write_lines(tmpdir.join('nonl.txt'), 20, end='\n')
+    with io.open(path, 'a') as f:
+        f.write('no newline')
+    assert len(LineIndex.build(path, every=10)) == 21
+
+    path = write_lines(tmpdir.join('empty.txt'), 0)
+    assert len(LineIndex.build(path)) == 0
+
+
+def test_line_index_persistence(tmpdir):
+
+    path = write_lines(tmpdir.join('file.txt'), 25)
+    index_path = str(tmpdir.join('file.idx'))
+    LineIndex.build(path, every=10).save(index_path)
+
+    index = LineIndex.load(index_path)
+    assert index.is_fresh(path)
+    assert len(index) == 25
+    assert list(index.offsets) == [0, 70, 150]
+
+    with io.open(index_path, 'wb') as f:
+        f.write(b'garbage')
+
+    with pytest.raises(ValueError):
+        LineIndex.load(index_path)
+
+
+def test_line_index_refresh(tmpdir):
+
+    path = write_lines(tmpdir.join('file.txt'), 25)
+    index = LineIndex.build(path, every=10)
+
+    with io.open(path, 'a') as f:
+        f.write(''.join('line %s\n' % i for i in range(25, 40)))
+
+    assert not index.is_fresh(path)
+    index.refresh(path)
+    expected = LineIndex.build(path, every=10)
+    assert len(index) == len(expected) == 40
+    assert list(index.offsets) == list(expected.offsets)
+
+    write_lines(path, 5)
+    index.refresh(path)
+    assert len(index) == 5
+    assert list(index.offsets) == [0]
+
+
+def test_indexed_file(tmpdir):
+
+    path = write_lines(tmpdir.join('file.txt'), 1000)
+
+    with g.indexed_file(path, every=7) as lines:
+        assert len(lines) == 1000
+        assert lines[0] == 'line 0\n'
+        assert lines[999] == 'line 999\n'
+        assert lines[500] == 'line 500\n'
+        assert lines[-1] == 'line 999\n'
+        assert lines[-1000] == 'line 0\n'
+
+        with pytest.raises(IndexError):
+            lines[1000]
+
+        with pytest.raises(IndexError):
+            lines[-1001]
+
+        assert isinstance(lines[10:20], g)
+        assert lines[10:13].list() == ['line 10\n', 'line 11\n', 'line 12\n']
+        assert lines[995:].map(len).list() == [9] * 5
+        assert lines[:2].list() == ['line 0\n', 'line 1\n']
+        assert lines[10:20:4].list() == ['line 10\n', 'line 14\n',
+                                         'line 18\n']
+        assert lines[-2:].list() == ['line 998\n', 'line 999\n']
+        assert lines[20:10].list() == []
+
+        with pytest.raises(ValueError):
+            lines[::-1]
+
+        with pytest.raises(ValueError):
+            lines['foo']
+
+        assert g(lines).count() == 1000
+
+    with g.indexed_file(path, encoding=None) as lines:
+        assert lines[3] == b'line 3\n'
+
+
+def test_indexed_file_persist(tmpdir):
+
+    path = write_lines(tmpdir.join('file.txt'), 100)
+    index_path = path + '.lineidx'
+
+    with g.indexed_file(path, every=10, persist=True) as lines:
+        assert lines[50] == 'line 50\n'
+
+    assert LineIndex.load(index_path).is_fresh(path)
+
+    with io.open(path, 'a') as f:
+        f.write('line 100\n')
+
+    with g.indexed_file(path, every=10, persist=True) as lines:
+        assert lines[-1] == 'line 100\n'
+        assert len(lines) == 101
+
+    assert len(LineIndex.load(index_path)) == 101
+
+
+def test_read_csv(tmpdir):
+
+    path = str(tmpdir.join('file.csv'))
+    with io.open(path, 'w') as f:
+        f.write('a,b\n1,2\n3,4\n5,6\n')
+
+    assert g.from_csv(path).list() == [('1', '2'), ('3', '4'), ('5', '6')]
+    assert g.from_csv(path, header=False).firsts(1).list() == [('a', 'b')]
+    assert g.from_csv(path, shape='dict').next() == {'a': '1', 'b': '2'}
+    assert g.from_csv(path, shape='dict', header=False).next() == {
+        0: 'a', 1: 'b'
+    }
+    assert g.from_csv(path, batch=2).list() == [[('1', '2'), ('3', '4')],
+                                                [('5', '6')]]
+    assert g.from_csv(path, shape='columns', batch=2).list() == [
+        {'a': ['1', '3'], 'b': ['2', '4']},
+        {'a': ['5'], 'b': ['6']},
+    ]
+    assert g.from_csv(path, shape='columns', header=False).list() == [
+        {0: ['a', '1', '3', '5'], 1: ['b', '2', '4', '6']},
+    ]
+
+    with io.open(path, 'w') as f:
+        f.write('a;b\n"1;2";3\n')
+
+    assert g.from_csv(path, delimiter=';').list() == [('1;2', '3')]
+
+    with pytest.raises(ValueError):
+        g.from_csv(path, shape='foo')
+
+    with pytest.raises(ValueError):
+        g.from_csv(path, batch=-1)
+
+    with pytest.raises(ValueError):
+        g.from_csv(path, shape='columns', batch=0)
+
+
+def test_read_jsonl(tmpdir):
+
+    path = str(tmpdir.join('file.jsonl'))
+    with io.open(path, 'w') as f:
+        f.write('{"a": 1, "b": "x"}\n\n{"a": 2}\n  \n[1, 2]\n')
+
+    assert g.from_jsonl(path).list() == [{'a': 1, 'b': 'x'}, {'a': 2}, [1, 2]]
+    # small buffers decode the file in several batches
+    expected = g.from_jsonl(path).list()
+    assert g.from_jsonl(path, buffer_size=1).list() == expected
+    assert g.from_jsonl(path, batch=2).list() == [
+        [{'a': 1, 'b': 'x'}, {'a': 2}], [[1, 2]]
+    ]
+
+    with io.open(path, 'w') as f:
+        f.write('{"a": 1, "b": "x"}\n{"a": 2}\n')
+
+    assert g.from_jsonl(path, 'dict').list() == [{'a': 1, 'b': 'x'},
+                                                 {'a': 2}]
+    assert g.from_jsonl(path, 'dict', ['b']).list() == [{'b': 'x'},
+                                                        {'b': None}]
+    assert g.from_jsonl(path, 'tuple', 'ab').list() == [(1, 'x'), (2, None)]
+    assert g.from_jsonl(path, 'columns', 'ab').list() == [
+        {'a': [1, 2], 'b': ['x', None]}
+    ]
+
+    with pytest.raises(ValueError):
+        g.from_jsonl(path, 'tuple')
+
+    with pytest.raises(ValueError):
+        g.from_jsonl(path, 'foo')
+
+    with pytest.raises(ValueError):
+        g.from_jsonl(path, 'columns', 'ab', batch=0)
+
+    with io.open(path, 'w') as f:
+        f.write('{"a": 1}\n{"a": 2\n')
+
+    with pytest.raises(ValueError) as excinfo:
+        g.from_jsonl(path).list()
+
+    assert 'line 2' in str(excinfo.value)
+
+    # several values on one line, or one value on several lines
+    cases = (('{"a": 1}\n\n1, 2\n', 3), ('[1\n2]\n', 1),
+             ('[0\n1]\n5,6\n', 1), ('1 2\n', 1), ('"a\nb"\n', 1))
+    for data, bad_line in cases:
+        with io.open(path, 'w') as f:
+            f.write(data)
+
+        with pytest.raises(ValueError) as excinfo:
+            g.from_jsonl(path).list()
+
+        assert 'line {}'.format(bad_line) in str(excinfo.value)
+
+    # fields can only be extracted from objects
+    with io.open(path, 'w') as f:
+        f.write('{"a": 1}\n\n[1, 2]\n')
+
+    assert g.from_jsonl(path).list() == [{'a': 1}, [1, 2]]
+
+    for shape, fields in (('tuple', 'a'), ('columns', 'a'), ('dict', None)):
+        with pytest.raises(ValueError) as excinfo:
+            g.from_jsonl(path, shape, fields).list()
+
+        assert 'line 3' in str(excinfo.value)
+
+
+def test_write_csv(tmpdir):
+
+    path = str(tmpdir.join('file.csv'))
+
+    assert g([(1, 2), (3, 4), (5, 6)]).to_csv(path, header='ab', batch=2) == 3
+    assert g.from_csv(path).list() == [('1', '2'), ('3', '4'), ('5', '6')]
+
+    rows = [{'a': 1, 'b': 2}, {'b': 4, 'a': 3}]
+    assert g(rows).to_csv(path) == 2
+    assert g.from_csv(path, shape='dict').list() == [{'a': '1', 'b': '2'},
+                                                     {'a': '3', 'b': '4'}]
+
+    assert g(rows).to_csv(path, header=['b']) == 2
+    assert g.from_csv(path, header=False).list() == [('b',), ('2',), ('4',)]
+
+    assert g([]).to_csv(path) == 0
+    assert io.open(path).read() == ''
+
+
+def test_write_jsonl(tmpdir):
+
+    path = str(tmpdir.join('file.jsonl'))
+    values = [{'a': 1}, [1, 2], 'é', None]
+
+    assert g(values).to_jsonl(path, batch=3) == 4
+    assert g.from_jsonl(path).list() == values
+
+    assert g(values).to_jsonl(path, ensure_ascii=False) == 4
+    assert 'é' in io.open(path, encoding='utf8').read()
+
+    assert g([]).to_jsonl(path) == 0
+    assert io.open(path).read() == ''
@@ -1,3 +1,5 @@
+import pytest
+
 from ww import l
 
 
@@ -30,3 +32,135 @@ def test_extend():
     lst.extend([1, 2, 3]).extend([4, 5, 6])
 
     assert lst == [1, 2, 3, 4, 5, 6]
+
+
+def test_typed():
+
+    lst = l.typed('q', [1, 2])
+    lst.append(3).append(4, 5).extend([6], (x for x in (7, 8)))
+
+    assert lst.len == 8
+    assert list(lst) == [1, 2, 3, 4, 5, 6, 7, 8]
+    assert lst.join(',') == "1,2,3,4,5,6,7,8"
+    assert l.typed('d', iter([1, 2])).tolist() == [1.0, 2.0]
+
+
+def test_typed_slice():
+
+    lst = l.typed('i', range(10))
+
+    part = lst[2:8:2]
+    assert isinstance(part, lst.__class__)
+    assert part.append(1).tolist() == [2, 4, 6, 1]
+    assert lst[-1] == 9
+
+
+def test_typed_memory():
+
+    import sys
+
+    lst = l.typed('d', range(1000))
+    boxed = l(float(x) for x in range(1000))
+
+    boxed_size = sys.getsizeof(boxed) + sum(sys.getsizeof(x) for x in boxed)
+    assert sys.getsizeof(lst) * 3 < boxed_size
+
+
+def test_typed_buffer(tmpdir):
+
+    lst = l.typed('i', [1, 2, 3])
+
+    view = memoryview(lst)
+    assert view.format == 'i'
+    lst[0] = 10
+    assert view[0] == 10
+
+    path = tmpdir.join('data')
+    with open(str(path), 'wb') as f:
+        f.write(lst)
+    assert path.read_binary() == lst.tobytes()
+
+
+def test_typed_errors():
+
+    with pytest.raises(TypeError):
+        l.typed('i', [1.5])
+
+    with pytest.raises(TypeError):
+        l.typed('i').append('1')
+
+    with pytest.raises(ValueError):
+        l.typed('Z')
+
+
+def test_typed_to_l():
+
+    lst = l.typed('q', [1, 2]).to_l()
+    assert lst == [1, 2]
+    assert lst.append(3) == [1, 2, 3]
+
+
+def test_view():
+
+    lst = l(range(10))
+    view = lst.view(2, 8)
+
+    assert view == [2, 3, 4, 5, 6, 7]
+    assert view.len == 6
+    assert view.view(1, -1, 2) == [3, 5]
+    assert view.view(1, -1, 2).indices == range(3, 7, 2)
+    assert view.view(1, -1, 2).sequence is lst
+    assert view[::-1].to_l() == [7, 6, 5, 4, 3, 2]
+    assert list(reversed(view)) == [7, 6, 5, 4, 3, 2]
+    assert view.index(4) == 2
+    assert 9 not in view
+    assert view.join(',') == '2,3,4,5,6,7'
+
+    lst[2] = 42
+    assert view[0] == 42
+    assert isinstance(view.to_l(), l)
+
+    with pytest.raises(IndexError):
+        view[6]
+
+    with pytest.raises(TypeError):
+        view[0] = 1
+
+
+def test_view_list_shrinks():
+
+    lst = l(range(10))
+    view = lst.view(2, 8)
+    backward = lst.view(None, None, -3)
+
+    lst.pop()
+    lst.pop()
+    lst.pop()
+
+    assert view == [2, 3, 4, 5, 6]
+    assert view.len == len(view) == 5
+    assert view[-1] == 6
+    assert list(reversed(view)) == [6, 5, 4, 3, 2]
+    assert view[::2] == [2, 4, 6]
+    assert backward == [6, 3, 0]
+
+    with pytest.raises(IndexError):
+        view[5]
+
+    del lst[:]
+    assert view == []
+    assert backward == []
+
+    lst.extend(range(20))
+    assert view == [2, 3, 4, 5, 6, 7]
+
+
+def test_view_pickle():
+
+    import pickle
+
+    view = l(range(1000)).view(10, 13)
+    data = pickle.dumps(view)
+
+    assert len(data) < 100
+    assert pickle.loads(data) == [10, 11, 12]
@@ -0,0 +1,103 @@
+# coding: utf-8
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+import os
+
+import pytest
+
+from ww import g
+from ww.tools.mapreduce import (map_reduce, partition_of, count_words, add,
+                                _combine)
+
+
+def by_parity(x):
+    yield x % 2, x
+
+
+def values_sum(key, values):
+    return sum(values)
+
+
+def values_sorted(key, values):
+    return sorted(values)
+
+
+def values_count(key, values):
+    return len(values)
+
+
+def built_words(x):
+    # A literal string is interned, the joined one is not
+    yield 'short', 1
+    yield ''.join(['sho', 'rt']), 1
+
+
+def fail(x):
+    raise ZeroDivisionError('foo')
+
+
+def test_partition_of():
+
+    assert partition_of('foo', 16) == partition_of('foo', 16)
+    assert 0 <= partition_of(('a', 1), 7) < 7
+    assert 0 <= partition_of(frozenset([1]), 7) < 7
+    assert {partition_of(i, 4) for i in range(100)} == {0, 1, 2, 3}
+
+    built = ''.join(['sho', 'rt'])
+    assert partition_of('short', 16) == partition_of(built, 16)
+    assert partition_of(('short', 1), 16) == partition_of((built, 1), 16)
+    assert (partition_of(frozenset(['a', 'short']), 16) ==
+            partition_of(frozenset([built, 'a']), 16))
+    assert partition_of(b'short', 16) == partition_of(b'sho' + b'rt', 16)
+
+
+def test_map_reduce_interned_keys():
+
+    res = g(range(3)).map_reduce(built_words, add, tree=True, workers=2)
+    assert res.list() == [('short', 6)]
+
+
+def test_combine():
+
+    pairs = [('a', 1), ('b', 2), ('a', 3)]
+    assert sorted(_combine(pairs, add, tree=True)) == [('a', 4), ('b', 2)]
+    assert sorted(_combine(pairs, values_count, tree=False)) == [('a', 2),
+                                                                 ('b', 1)]
+
+
+def test_map_reduce(tmpdir):
+
+    gen = g(range(100)).map_reduce(by_parity, values_sum, partitions=3,
+                                   workers=2, batch=7)
+    assert isinstance(gen, g)
+    assert gen.sorted().list() == [(0, 2450), (1, 2500)]
+
+    res = g(range(10)).map_reduce(by_parity, values_sorted, workers=2,
+                                  batch=3)
+    assert res.sorted().list() == [(0, [0, 2, 4, 6, 8]), (1, [1, 3, 5, 7, 9])]
+
+    lines = ['a b c', 'a b', 'a'] * 10
+    words = g(lines).map_reduce(count_words, add, tree=True, batch=4,
+                                partitions=2, directory=str(tmpdir))
+    assert words.sorted().list() == [('a', 30), ('b', 20), ('c', 10)]
+
+    # the combiner counts per batch, the reducer sums the counts
+    words = g(lines).map_reduce(count_words, values_sum,
+                                combiner=values_count, batch=4)
+    assert words.sorted().list() == [('a', 30), ('b', 20), ('c', 10)]
+
+    assert g([]).map_reduce(count_words, add, tree=True).list() == []
+
+    # spill files are removed
+    assert os.listdir(str(tmpdir)) == []
+
+
+def test_map_reduce_errors():
+
+    with pytest.raises(ZeroDivisionError):
+        g(range(10)).map_reduce(fail, add, workers=2).list()
+
+    with pytest.raises(ValueError):
+        map_reduce(range(10), by_parity, add, partitions=-1)
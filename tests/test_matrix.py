@@ -0,0 +1,181 @@
+# coding: utf-8
+
+from __future__ import absolute_import, division, print_function
+
+import array
+
+import pytest
+
+from ww import l
+from ww.wrappers.matrices import Matrix
+
+
+def test_build_storage():
+
+    assert l.build(2, 3).data == array.array('q', [0] * 6)
+    assert l.build(2, default=1.5).data == array.array('d', [1.5, 1.5])
+    assert l.build(2, default=1, typecode='B').typecode == 'B'
+    assert l.build(2, 2, default=None).data == [None] * 4
+    assert l.build(2, default=True).data == [True, True]
+
+
+def test_build_shape():
+
+    m = l.build(2, 3, 4)
+
+    assert m.shape == (2, 3, 4)
+    assert m.strides == (12, 4, 1)
+    assert m.ndim == 3
+    assert m.size == 24
+    assert len(m) == 2
+    assert l.build(0, 3).tolist() == []
+
+    with pytest.raises(ValueError):
+        l.build()
+
+    with pytest.raises(ValueError):
+        l.build(2, -1)
+
+
+def test_getitem():
+
+    m = Matrix(list(range(24)), (2, 3, 4))
+
+    assert m[1, 2, 3] == 23
+    assert m[1][2][3] == 23
+    assert m[-1, -1, -1] == 23
+    assert m[0, 1] == Matrix([4, 5, 6, 7], (4,))
+    assert m[1, 1] == [16, 17, 18, 19]
+    assert m[:, 0, 0] == [0, 12]
+    assert m[0, ::-1, 0] == [8, 4, 0]
+    assert m[1, :, ::-2] == [[15, 13], [19, 17], [23, 21]]
+    assert m[0, 1:1] == []
+
+    with pytest.raises(IndexError):
+        m[2]
+
+    with pytest.raises(IndexError):
+        m[0, 0, 0, 0]
+
+    with pytest.raises(TypeError):
+        m['a']
+
+
+def test_views_share_data():
+
+    m = l.build(3, 3)
+
+    row = m[1]
+    column = m[:, 2]
+    row[0] = 1
+    column[0] = 2
+    m.T[2, 2] = 3
+
+    assert m == [[0, 0, 2], [1, 0, 0], [0, 0, 3]]
+    assert row.data is m.data
+    assert column == [2, 0, 3]
+
+
+def test_setitem():
+
+    m = l.build(3, 3, default='.')
+
+    m[1] = 'x'
+    m[:, 0] = ['a', 'b', 'c']
+    m[2, 1:] = l.build(2, default='y')
+
+    assert m == [['a', '.', '.'], ['b', 'x', 'x'], ['c', 'y', 'y']]
+
+    with pytest.raises(ValueError):
+        m[0] = [1, 2]
+
+
+def test_empty_views():
+
+    m = l.build(2, 3, typecode='b')
+    m.fill(1)
+
+    for view in (m[0, 3:], m[0, -5::-1], m[2:, :], m[::-1, -5::-1]):
+        assert view.size == 0
+        assert list(view.flat()) == []
+        assert view.fill(2) is view
+        assert view.assign([]) is view
+
+    assert list(m[0, -5::-1]) == list(m[0, 3:]) == []
+    assert m[2:, :].tolist() == []
+    assert m[::-1, -5::-1].tolist() == [[], []]
+    assert repr(m[0, -5::-1]) == 'Matrix([])'
+
+    m[0, -5::-1] = 0
+    m[0, 3:] = 0
+    m[1, -5::-1] = []
+
+    assert len(m.data) == 6
+    assert m == [[1, 1, 1], [1, 1, 1]]
+
+
+def test_fill():
+
+    m = l.build(4, 4)
+
+    assert m.fill(1) is m
+    m[1:3, 1:3].fill(2)
+    m[::-1, 0].fill(3)
+
+    assert m == [[3, 1, 1, 1], [3, 2, 2, 1], [3, 2, 2, 1], [3, 1, 1, 1]]
+
+    with pytest.raises(TypeError):
+        m.fill('a')
+
+
+def test_transpose():
+
+    m = Matrix(list(range(6)), (2, 3))
+
+    assert m.T == [[0, 3], [1, 4], [2, 5]]
+    assert m.T.T == m
+    assert m.transpose(0, 1) == m
+    assert m.T.data is m.data
+
+    with pytest.raises(ValueError):
+        m.transpose(0, 0)
+
+
+def test_reshape():
+
+    m = Matrix(list(range(12)), (3, 4))
+
+    assert m.reshape(2, 6).data is m.data
+    assert m.reshape(2, 2, 3)[1, 0] == [6, 7, 8]
+    assert m.reshape(-1, 6).shape == (2, 6)
+    assert m[1].reshape(2, 2) == [[4, 5], [6, 7]]
+
+    transposed = m.T.reshape(12)
+    assert transposed.data is not m.data
+    assert transposed == [0, 4, 8, 1, 5, 9, 2, 6, 10, 3, 7, 11]
+
+    with pytest.raises(ValueError):
+        m.reshape(5, 2)
+
+
+def test_copy():
+
+    m = l.build(2, 2, default=1.0)
+    copy = m.T.copy()
+    copy[0, 0] = 2
+
+    assert copy.is_contiguous
+    assert copy.typecode == 'd'
+    assert m == [[1.0, 1.0], [1.0, 1.0]]
+
+
+def test_conversions():
+
+    m = Matrix(list(range(4)), (2, 2))
+
+    assert m.tolist() == [[0, 1], [2, 3]]
+    assert list(m.flat()) == [0, 1, 2, 3]
+    assert list(m.T.flat()) == [0, 2, 1, 3]
+    assert m.to_l()[1].append(4) == [2, 3, 4]
+    assert repr(m) == 'Matrix([[0, 1], [2, 3]])'
+    assert m != [[0]]
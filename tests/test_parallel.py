@@ -0,0 +1,316 @@
+# coding: utf-8
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+import gc
+import time
+import threading
+
+import pytest
+
+from ww import g
+from ww.tools.parallel import (prefetch, get_pool, dumps, loads,
+                               _BatchSizer)
+
+
+def test_prefetch():
+
+    gen = g(range(100)).prefetch(10)
+    assert isinstance(gen, g)
+    assert gen.list() == list(range(100))
+
+    assert g([]).prefetch().list() == []
+
+    for workers in (2, 5):
+        gen = g(x for x in range(1000)).prefetch(3, workers=workers)
+        assert gen.list() == list(range(1000))
+
+    with pytest.raises(ValueError):
+        g([]).prefetch(-1)
+
+    with pytest.raises(ValueError):
+        g([]).prefetch(1, workers='foo')
+
+
+def test_prefetch_reads_ahead():
+
+    read = []
+
+    def source():
+        for i in range(10):
+            read.append(i)
+            yield i
+
+    gen = prefetch(source(), size=3)
+    assert next(gen) == 0
+    time.sleep(0.2)
+    # the item being yielded, plus the 3 in the queue, plus the one waiting
+    # for space
+    assert len(read) == 5
+
+
+def test_prefetch_exceptions():
+
+    def source():
+        yield 1
+        yield 2
+        raise ZeroDivisionError('foo')
+
+    gen = g(source()).prefetch(5)
+    assert gen.next() == 1
+    assert gen.next() == 2
+    with pytest.raises(ZeroDivisionError):
+        gen.next()
+
+    gen = g(source()).prefetch(5, workers=3)
+    with pytest.raises(ZeroDivisionError):
+        gen.list()
+
+
+def test_prefetch_early_stop():
+
+    before = threading.active_count()
+    gen = prefetch(iter(range(1000000)), size=2, workers=3)
+    assert next(gen) == 0
+    gen.close()
+    del gen
+    gc.collect()
+
+    for _ in range(50):
+        if threading.active_count() <= before:
+            break
+        time.sleep(0.1)
+
+    assert threading.active_count() <= before
+
+
+def test_stage():
+
+    gen = g(range(100)).stage(lambda x: x * 2)
+    assert isinstance(gen, g)
+    assert gen.list() == list(range(0, 200, 2))
+
+    gen = g(range(100)).stage(str, workers=4).stage(int, workers=3)
+    assert sorted(gen) == list(range(100))
+
+    stats = gen.pipeline.stats()
+    assert [s.name for s in stats] == ['str', 'int']
+    assert [s.workers for s in stats] == [4, 3]
+    assert [s.processed for s in stats] == [100, 100]
+    assert [s.queue_capacity for s in stats] == [8, 6]
+    assert all(s.rate > 0 for s in stats)
+
+    gen = g([]).stage(str, name='foo')
+    assert gen.list() == []
+    assert gen.pipeline.stats()[0].name == 'foo'
+
+    with pytest.raises(ValueError):
+        g([]).stage(str, workers=-1)
+
+
+def test_stage_backpressure():
+
+    read = []
+
+    def source():
+        for i in range(100):
+            read.append(i)
+            yield i
+
+    def slow(x):
+        time.sleep(0.01)
+        return x
+
+    gen = g(source()).stage(slow, buffer=2).stage(str, buffer=2)
+    assert gen.next() == '0'
+    time.sleep(0.2)
+    # each queue holds at most 2 items and each thread at most 1
+    assert len(read) <= 12
+    stats = gen.pipeline.stats()
+    assert stats[0].queue_size <= 2
+    assert stats[1].queue_size <= 2
+
+
+def test_stage_exceptions():
+
+    def fail_on_3(x):
+        if x == 3:
+            raise ZeroDivisionError('foo')
+        return x
+
+    gen = g(range(10)).stage(fail_on_3).stage(str)
+    assert gen.firsts(3).list() == ['0', '1', '2']
+    with pytest.raises(ZeroDivisionError):
+        gen.next()
+
+    def source():
+        yield 1
+        raise KeyError('bar')
+
+    with pytest.raises(KeyError):
+        g(source()).stage(str).list()
+
+
+def test_stage_pipeline():
+
+    gen = g(range(10)).stage(str)
+    gen.list()
+
+    # a new pipeline is created once the previous one started
+    new_gen = gen.stage(int)
+    assert new_gen.pipeline is not gen.pipeline
+
+    with pytest.raises(RuntimeError):
+        gen.pipeline.stage(int)
+
+    assert repr(gen.pipeline) == '<Pipeline: str>'
+
+    # adding a stage doesn't change the wrapper it's called on
+    gen = g(range(5)).stage(str)
+    longer = gen.stage(len)
+    assert repr(longer.pipeline) == '<Pipeline: str -> len>'
+    assert gen.list() == ['0', '1', '2', '3', '4']
+    assert repr(gen.pipeline) == '<Pipeline: str>'
+
+
+def test_stage_early_stop():
+
+    before = threading.active_count()
+    gen = g(range(1000000)).stage(str, workers=3).stage(int, workers=2)
+    assert gen.next() is not None
+    gen.pipeline.close()
+    del gen
+    gc.collect()
+
+    for _ in range(50):
+        if threading.active_count() <= before:
+            break
+        time.sleep(0.1)
+
+    assert threading.active_count() <= before
+
+
+def square(x):
+    return x * x
+
+
+def fail_on_5(x):
+    if x == 5:
+        raise ZeroDivisionError('foo')
+    return x
+
+
+class Point(object):
+
+    def __init__(self, x):
+        self.x = x
+
+
+def get_x(point):
+    return Point(point.x * 2)
+
+
+def test_serialization():
+
+    assert dumps([1, 'a', (1.0, None)])[0] == 'm'
+    assert loads(*dumps([1, 'a', (1.0, None)])) == [1, 'a', (1.0, None)]
+
+    kind, data = dumps([Point(1)])
+    assert kind == 'p'
+    assert loads(kind, data)[0].x == 1
+
+
+def test_process_map():
+
+    gen = g(range(1000)).process_map(square, workers=2)
+    assert isinstance(gen, g)
+    assert gen.list() == [x * x for x in range(1000)]
+
+    assert g(range(10)).process_map(square, 2, batch=3).list() == [
+        x * x for x in range(10)
+    ]
+    assert g([]).process_map(square, 2).list() == []
+
+    points = g(Point(x) for x in range(10)).process_map(get_x, 2)
+    assert points.map(lambda p: p.x).list() == list(range(0, 20, 2))
+
+    with pytest.raises(ZeroDivisionError):
+        g(range(10)).process_map(fail_on_5, 2).list()
+
+    with pytest.raises(ValueError):
+        g(range(10)).process_map(square, batch=-1)
+
+
+def test_process_map_reuses_pools():
+
+    assert get_pool(2) is get_pool(2)
+    assert get_pool(2) is not get_pool(3)
+
+
+def test_batch_sizer():
+
+    sizer = _BatchSizer()
+    assert sizer.size == 1
+
+    # fast items make batches grow, but not more than twice at a time
+    sizer.update(1, 0.0001)
+    assert sizer.size == 2
+    for _ in range(20):
+        sizer.update(sizer.size, sizer.size * 0.0001)
+    assert sizer.size == 500
+
+    # slow items make them shrink
+    sizer.update(500, 500)
+    assert sizer.size == 250
+
+    sizer = _BatchSizer(10)
+    sizer.update(10, 100)
+    assert sizer.size == 10
+
+
+def test_shared():
+
+    for batch in (1, 7):
+        shared = g(range(1000)).shared(batch=batch)
+        results = []
+
+        def work():
+            for item in g(shared).map(lambda x: x * 2):
+                results.append(item)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(results) == list(range(0, 2000, 2))
+
+    shared = g(range(10)).shared(batch=3)
+    assert shared.next_batch() == [0, 1, 2]
+    assert next(shared) == 3
+    assert shared.next_batch(10) == [6, 7, 8, 9]
+    assert list(shared) == [4, 5]
+    assert shared.next_batch() == []
+
+    with pytest.raises(ValueError):
+        g([]).shared(batch=-1)
+
+
+def test_shared_errors():
+
+    def fail():
+        yield 1
+        yield 2
+        raise ZeroDivisionError('foo')
+
+    shared = g(fail()).shared(batch=5)
+    assert shared.next_batch() == [1, 2]
+    with pytest.raises(ZeroDivisionError):
+        shared.next_batch()
+    assert shared.next_batch() == []
+
+    shared = g(fail()).shared(batch=5)
+    with pytest.raises(ZeroDivisionError):
+        list(shared)
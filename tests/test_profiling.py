@@ -0,0 +1,136 @@
+# coding: utf-8
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+import io
+import time
+
+import pytest
+
+from ww import g
+from ww.wrappers.iterables import IterableWrapper
+from ww.tools.profiling import (StageReport, format_report, track_memory,
+                                MemoryLimitExceeded, Buffer)
+
+
+def slow(x):
+    time.sleep(0.002)
+    return x
+
+
+def test_profile():
+
+    gen = g(range(20)).profile(output=False)
+    assert isinstance(gen, IterableWrapper)
+    assert type(gen) is not IterableWrapper
+
+    res = gen.map(slow).map(str).firsts(10).list()
+    assert res == [str(x) for x in range(10)]
+
+    report = gen.profiler.report()
+    assert all(isinstance(stage, StageReport) for stage in report)
+    assert [s.name for s in report] == ['source', 'map', 'map', 'firsts']
+    assert [s.items for s in report] == [10, 10, 10, 10]
+
+    source, slow_map, str_map, firsts = report
+    # the slow stage is the bottleneck, and its time is not counted twice
+    assert slow_map.own_wall >= 0.02
+    assert str_map.own_wall < slow_map.own_wall
+    assert firsts.own_wall < slow_map.own_wall
+    assert firsts.wall >= slow_map.wall >= slow_map.own_wall
+    assert 0 < firsts.rate <= 10 / 0.02
+
+    # unprofiled wrappers are left alone
+    assert type(g(range(3)).map(str)) is IterableWrapper
+
+
+def test_profile_output():
+
+    output = io.StringIO()
+    gen = g(range(5)).profile(output=output).map(str)
+    assert output.getvalue() == ''
+
+    assert gen.list() == ['0', '1', '2', '3', '4']
+    table = output.getvalue()
+    assert 'source' in table
+    assert 'map' in table
+    assert len(table.splitlines()) == 3
+
+    # the table is only written once
+    list(gen)
+    assert len(output.getvalue().splitlines()) == 3
+
+
+def test_format_report():
+
+    table = format_report([StageReport('source', 3, 1, 1, 1, 1, 3)])
+    assert table.splitlines()[1].split() == ['1', 'source', '3', '1.000',
+                                             '1.000', '3']
+
+
+def test_buffer():
+
+    buffer = Buffer('foo', maxlen=2)
+    for item in 'abc':
+        buffer.add(item)
+    assert buffer.items == buffer.peak_items == 2
+    assert buffer.bytes == buffer.peak_bytes > 0
+
+    buffer = Buffer('foo', limit=100)
+    with pytest.raises(MemoryLimitExceeded) as excinfo:
+        list(buffer.hold('x' * 100 for _ in range(10)))
+    assert 'foo()' in str(excinfo.value)
+    assert isinstance(excinfo.value, MemoryError)
+
+
+def test_track_memory():
+
+    with track_memory() as tracker:
+        g(range(100)).sorted().list()
+        g(range(100)).groupby(lambda x: x % 2).list()
+        g(range(100)).lasts(5).list()
+        g(range(100))[-10]
+        (g(range(100)) - range(10)).list()
+        (range(100) - g(range(10))).list()
+        g([1, 1, 2, 3, 3]).skip_duplicates().list()
+        a, b = g(range(100)).tee()
+        a.list()
+        (g(range(100)) * 2).list()
+
+    report = {stats.operation: stats for stats in tracker.report()}
+    assert report['sorted'].peak_items == 100
+    assert report['groupby'].peak_items == 100
+    assert report['lasts'].peak_items == 5
+    assert report['at_index'].peak_items == 10
+    assert report['__sub__'].peak_items == 10
+    assert report['__rsub__'].peak_items == 10
+    assert report['skip_duplicates'].peak_items == 3
+    assert report['tee'].peak_items == 100
+    assert report['__mul__'].peak_items == 100
+    assert all(s.peak_bytes >= s.peak_items * 16 for s in report.values())
+    assert tracker.peak_bytes == max(s.peak_bytes for s in report.values())
+
+    # nothing is tracked outside of the block
+    g(range(100)).sorted().list()
+    assert len(tracker.report()) == 9
+
+
+def test_track_memory_tee():
+
+    with track_memory() as tracker:
+        a, b = g(range(100)).tee()
+        for x, y in zip(a, b):
+            pass
+
+    assert tracker.report()[0].peak_items == 1
+
+
+def test_track_memory_limit():
+
+    with track_memory(limit=10000):
+        g(range(100)).sorted().list()
+        with pytest.raises(MemoryLimitExceeded):
+            g(range(10 ** 6)).sorted().list()
+        with pytest.raises(MemoryLimitExceeded):
+            g(range(10 ** 6)).skip_duplicates().list()
@@ -4,11 +4,14 @@ from __future__ import (
     unicode_literals, division, print_function, absolute_import
 )
 
+import io
 import re
 
 import pytest
 
 from ww import s, g, f
+from ww.tools import strings
+from ww.tools.strings import detect_encoding, isplit
 
 
 def test_lshift():
@@ -120,6 +123,98 @@ def test_from_bytes():
         s.from_bytes('é'.encode('cp850'))
 
 
+def test_from_bytes_detect():
+
+    text = u'Père Noël a apporté des cadeaux à tous les enfants sages. ' * 50
+
+    assert s.from_bytes(b'abc', detect=True) == 'abc'
+    assert s.from_bytes(text.encode('utf8'), detect=True) == text
+    assert s.from_bytes(text.encode('utf16'), detect=True) == text
+    assert isinstance(s.from_bytes(b'abc', detect=True), s)
+
+    # an explicit encoding always wins
+    assert s.from_bytes(text.encode('latin1'), 'latin1', detect=True) == text
+
+
+def test_detect_encoding():
+
+    text = u'Père Noël a apporté des cadeaux à tous les enfants. ' * 50
+
+    assert detect_encoding(b'') == 'ascii'
+    assert detect_encoding(bytearray(b'abc')) == 'ascii'
+    assert detect_encoding(memoryview(text.encode('utf8'))) == 'utf-8'
+    assert detect_encoding(text.encode('utf-16')) == 'utf-16'
+    assert detect_encoding(text.encode('latin1')) not in (None, 'utf-8',
+                                                          'ascii')
+
+    # The UTF-8 check is done by blocks, which can cut a character
+    old_size = strings.VALIDATION_BLOCK_SIZE
+    strings.VALIDATION_BLOCK_SIZE = 3
+    try:
+        assert detect_encoding(u'ééé'.encode('utf8')) == 'utf-8'
+        assert detect_encoding(b'abcd') == 'ascii'
+    finally:
+        strings.VALIDATION_BLOCK_SIZE = old_size
+
+
+def test_detect_encoding_samples(monkeypatch):
+
+    fed = []
+
+    class Detector(object):
+        done = False
+        result = {'encoding': 'Windows-1252'}
+
+        def feed(self, data):
+            fed.append(len(data))
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(strings, 'UniversalDetector', Detector)
+    data = u'é'.encode('latin1') * 10000
+
+    assert detect_encoding(data, sample_size=100, samples=5) == 'windows-1252'
+    assert fed == [100] * 5
+
+    del fed[:]
+    assert detect_encoding(data[:250], sample_size=100) == 'windows-1252'
+    assert fed == [100, 100, 50]
+
+    del fed[:]
+    Detector.done = True
+    detect_encoding(data, sample_size=100, samples=5)
+    assert fed == [100]
+
+
+def test_detect_encoding_cache(monkeypatch):
+
+    monkeypatch.setattr(strings, '_ENCODINGS', {})
+
+    assert detect_encoding(b'abc', source='file.txt') == 'ascii'
+    assert detect_encoding(u'é'.encode('utf8'), source='file.txt') == 'ascii'
+    assert detect_encoding(u'é'.encode('utf8'), source='other') == 'utf-8'
+    assert s.from_bytes(b'abc', detect=True, source='other') == 'abc'
+
+
+def test_from_bytes_no_detection(monkeypatch):
+
+    monkeypatch.setattr(strings, '_ENCODINGS', {})
+
+    def fail(*args, **kwargs):
+        raise AssertionError('detection should not run')
+
+    monkeypatch.setattr(strings, '_utf8_or_ascii', fail)
+
+    assert s.from_bytes(b'abc', 'ascii', source='file.txt') == 'abc'
+    assert s.from_bytes(b'abc', 'ascii', detect=True, source='f') == 'abc'
+
+    with pytest.raises(ValueError):
+        s.from_bytes(b'abc', source='file.txt')
+
+    assert strings._ENCODINGS == {}
+
+
 def test_format():
 
     foo = 1
@@ -174,3 +269,126 @@ def test_tobool():
 
     with pytest.raises(ValueError):
         s('foo').to_bool()
+
+
+def test_from_stream():
+
+    text = u'Père Noël\nest là\r\nà Noël\r' * 100
+    data = text.encode('utf8')
+
+    for block_size in (1, 2, 3, 7, 1024):
+        stream = io.BytesIO(data)
+        chunks = s.from_stream(stream, 'utf8', block_size=block_size).list()
+        assert u''.join(chunks) == text
+        assert all(isinstance(chunk, s) for chunk in chunks)
+        assert all(chunks)
+
+        stream = io.BytesIO(data)
+        lines = s.from_stream(stream, 'utf8', block_size=block_size,
+                              lines=True)
+        assert lines.list() == [u'Père Noël\n', u'est là\r\n',
+                                u'à Noël\r'] * 100
+
+
+def test_from_stream_lines():
+
+    text = u'a\nbé\r\nc\r\rd\r'
+    expected = [u'a\n', u'bé\r\n', u'c\r', u'\r', u'd\r']
+
+    for block_size in range(1, 10):
+        stream = io.BytesIO(text.encode('utf16'))
+        lines = s.from_stream(stream, 'utf16', block_size=block_size,
+                              lines=True)
+        assert lines.list() == expected
+
+    assert s.from_stream(io.BytesIO(b''), 'utf8', lines=True).list() == []
+
+
+def test_from_stream_detect():
+
+    text = u'Père Noël est là. ' * 10
+    for encoding in ('utf8', 'utf16'):
+        stream = io.BytesIO(text.encode(encoding))
+        chunks = s.from_stream(stream, block_size=7).list()
+        assert u''.join(chunks) == text
+
+
+def test_from_stream_errors():
+
+    with pytest.raises(UnicodeDecodeError):
+        s.from_stream(io.BytesIO(u'é'.encode('latin1')), 'utf8').list()
+
+    stream = io.BytesIO(u'aé'.encode('latin1'))
+    assert s.from_stream(stream, 'utf8', 'replace').join('') == u'a�'
+
+    with pytest.raises(TypeError):
+        s.from_stream(io.StringIO(u'abc')).list()
+
+    with pytest.raises(ValueError):
+        s.from_stream(io.BytesIO(b''), block_size=-1)
+
+
+def test_isplit():
+
+    text = u'a,b;c/d=a,,b;c/d'
+    expected = re.split(u',|;|[/=]', text)
+
+    for size in range(1, len(text) + 1):
+        chunks = [text[i:i + size] for i in range(0, len(text), size)]
+        assert list(isplit(chunks, u',', u';', u'[/=]')) == expected
+        stream = io.StringIO(text)
+        tokens = isplit(stream, u',', u';', u'[/=]', chunk_size=size)
+        assert list(tokens) == expected
+
+    assert list(isplit(text, u',')) == text.split(u',')
+    assert list(isplit(u'a,', u',')) == [u'a', u'']
+    assert list(isplit([], u',')) == []
+    assert list(isplit([u'', u'a', u''], u',')) == [u'a']
+
+
+def test_isplit_separators_across_chunks():
+
+    # multi characters separators cut between chunks
+    chunks = [u'a<-', u'->b<', u'--', u'>c']
+    assert list(isplit(chunks, u'<-->')) == [u'a', u'b', u'c']
+
+    # a regex could match more characters in the next chunk
+    chunks = [u'a  ', u'  b', u'\n', u'\nc']
+    assert list(isplit(chunks, u'\\s+')) == [u'a', u'b', u'c']
+
+    chunks = [u'aXX', u'Xb', u'x']
+    assert list(isplit(chunks, u'x+', flags='i')) == [u'a', u'b', u'']
+
+
+def test_isplit_whitespaces():
+
+    text = u'  fat  black\tcat\n big\r\n\n bad dog  '
+
+    for size in range(1, len(text) + 1):
+        tokens = isplit(io.StringIO(text), chunk_size=size)
+        assert list(tokens) == text.split()
+
+    assert list(isplit(u'   ')) == []
+
+
+def test_isplit_bytes():
+
+    data = b'a, b,\nc'
+
+    for size in range(1, len(data) + 1):
+        tokens = isplit(io.BytesIO(data), b',\\s*', chunk_size=size)
+        assert list(tokens) == [b'a', b'b', b'c']
+        assert list(isplit(io.BytesIO(data), chunk_size=size)) == [
+            b'a,', b'b,', b'c']
+
+
+def test_isplit_is_lazy():
+
+    def chunks():
+        yield u'a,b,'
+        yield u'c'
+        raise AssertionError('read too far')
+
+    tokens = isplit(chunks(), u',')
+    assert next(tokens) == u'a'
+    assert next(tokens) == u'b'
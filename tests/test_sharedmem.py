@@ -0,0 +1,115 @@
+# coding: utf-8
+
+from __future__ import (unicode_literals, absolute_import,
+                        division, print_function)
+
+import pickle
+
+import pytest
+
+from ww import g
+from ww.tools.sharedmem import SharedMemoryPool, attach
+
+
+def double_in_place(batch):
+    for i in range(len(batch)):
+        batch[i] *= 2
+    return sum(batch)
+
+
+def identity(batch):
+    return batch
+
+
+def test_pool():
+
+    with SharedMemoryPool() as pool:
+        a = pool.array([1, 2, 3])
+        assert len(pool) == 1
+        assert a.tolist() == [1.0, 2.0, 3.0]
+        assert len(a) == 3
+        assert a[1] == 2.0
+        a[1] = 5
+        assert list(a) == [1.0, 5.0, 3.0]
+
+        # not released, so a new block is needed
+        b = pool.array([1, 2, 3])
+        assert b.name != a.name
+        assert len(pool) == 2
+
+        a.release()
+        a.release()  # no effect
+        c = pool.array(range(100), 'q')
+        assert c.name == a.name
+        assert c.tolist() == list(range(100))
+
+        # too big to reuse the small blocks
+        with pool.array(range(10000), 'q') as d:
+            assert d.name not in (b.name, c.name)
+        assert len(pool) == 3
+
+        assert len(pool.empty(0)) == 0
+        assert pool.array([]).tolist() == []
+
+        with pytest.raises(ValueError):
+            pool.empty(-1)
+
+    assert len(pool) == 0
+
+
+def test_pickle():
+
+    with SharedMemoryPool() as pool:
+        a = pool.array([1, 2, 3], 'i')
+        data = pickle.dumps(a)
+        assert len(data) < 200
+        b = pickle.loads(data)
+        assert b.block is a.block
+        b[0] = 10
+        assert a[0] == 10
+
+        b.release()
+        assert a.tolist() == [10, 2, 3]
+
+
+def test_array_chunks_with_processes():
+
+    with SharedMemoryPool() as pool:
+        chunks = g(range(10)).array_chunks(3, pool=pool).list()
+        assert [c.tolist() for c in chunks] == [
+            [0, 1, 2], [3, 4, 5], [6, 7, 8], [9]
+        ]
+
+        sums = g(chunks).process_map(double_in_place, 2).list()
+        assert sums == [6, 24, 42, 18]
+        # workers modified the shared memory in place
+        assert chunks[1].tolist() == [6, 8, 10]
+
+        # arrays coming back from workers use the same memory
+        back = g(chunks).process_map(identity, 2).list()
+        assert [c.tolist() for c in back] == [c.tolist() for c in chunks]
+        assert back[0].block is chunks[0].block
+
+        for chunk in chunks:
+            chunk.release()
+
+        assert len(g(range(10)).array_chunks(3, pool=pool).list()) == 4
+        assert len(pool) == 4
+
+
+def test_attach():
+
+    with SharedMemoryPool() as pool:
+        a = pool.array([1, 2])
+        assert attach(a.name, 'd', 2).tolist() == [1, 2]
+        assert 'items' in repr(a)
+        assert '1 blocks' in repr(pool)
+
+
+def test_close_invalidates_arrays():
+
+    pool = SharedMemoryPool()
+    a = pool.array([1, 2])
+    pool.close()
+    assert a.array is None
+    a.release()  # no effect
@@ -0,0 +1,156 @@
+# coding: utf-8
+
+from __future__ import absolute_import, division, print_function
+
+import random
+
+import pytest
+
+from ww import l, g
+from ww.wrappers import sortedlists
+
+
+@pytest.fixture(params=[1000, 4])
+def load(request, monkeypatch):
+    """ Run the tests with tiny chunks too, to split and merge them """
+    monkeypatch.setattr(sortedlists, 'LOAD', request.param)
+    return request.param
+
+
+def test_add(load):
+
+    rand = random.Random(0)
+    numbers = [rand.randint(0, 50) for _ in range(200)]
+    sorted_list = l.sorted_list()
+    for number in numbers:
+        assert sorted_list.add(number) is sorted_list
+
+    assert list(sorted_list) == sorted(numbers)
+    assert sorted_list.len == len(sorted_list) == 200
+    assert list(reversed(sorted_list)) == sorted(numbers, reverse=True)
+
+
+def test_update(load):
+
+    sorted_list = l.sorted_list([5, 1, 3])
+    sorted_list.update(range(100)).update([2])
+
+    assert list(sorted_list) == sorted([5, 1, 3, 2] + list(range(100)))
+
+
+def test_remove(load):
+
+    rand = random.Random(1)
+    numbers = [rand.randint(0, 50) for _ in range(200)]
+    sorted_list = l.sorted_list(numbers)
+    expected = sorted(numbers)
+    rand.shuffle(numbers)
+    for number in numbers[:150]:
+        sorted_list.remove(number)
+        expected.remove(number)
+        assert list(sorted_list) == expected
+
+    with pytest.raises(ValueError):
+        sorted_list.remove(1000)
+
+    assert sorted_list.discard(1000) is sorted_list
+    assert sorted_list.len == 50
+
+
+def test_index_and_bisect(load):
+
+    sorted_list = l.sorted_list(x // 2 for x in range(100))
+
+    assert sorted_list[0] == 0
+    assert sorted_list[51] == 25
+    assert sorted_list[-1] == 49
+    assert sorted_list.index(25) == 50
+    assert sorted_list.bisect_left(25) == 50
+    assert sorted_list.bisect_right(25) == 52
+    assert sorted_list.bisect_right(100) == 100
+    assert sorted_list.count(25) == 2
+    assert sorted_list.count(100) == 0
+    assert 10 in sorted_list
+    assert 10.5 not in sorted_list
+
+    with pytest.raises(IndexError):
+        sorted_list[100]
+
+    with pytest.raises(ValueError):
+        sorted_list.index(100)
+
+
+def test_slices(load):
+
+    sorted_list = l.sorted_list(range(20))
+
+    assert sorted_list[5:9] == [5, 6, 7, 8]
+    assert sorted_list[5:9].append(1) == [5, 6, 7, 8, 1]
+    assert sorted_list[::5] == [0, 5, 10, 15]
+    assert sorted_list[15:5] == []
+
+    del sorted_list[2:18]
+    assert list(sorted_list) == [0, 1, 18, 19]
+
+    del sorted_list[1]
+    assert sorted_list.pop() == 19
+    assert sorted_list.pop(0) == 0
+    assert list(sorted_list) == [18]
+
+
+def test_irange(load):
+
+    sorted_list = l.sorted_list(range(0, 100, 2))
+
+    assert isinstance(sorted_list.irange(), g)
+    assert sorted_list.irange(10, 16).list() == [10, 12, 14, 16]
+    assert sorted_list.irange(9, 17).list() == [10, 12, 14, 16]
+    assert sorted_list.irange(10, 16, (False, False)).list() == [12, 14]
+    assert sorted_list.irange(94).list() == [94, 96, 98]
+    assert sorted_list.irange(maximum=4).list() == [0, 2, 4]
+    assert sorted_list.irange(4, 8, reverse=True).list() == [8, 6, 4]
+    assert sorted_list.irange(50, 40).list() == []
+
+
+def test_key(load):
+
+    orders = l.sorted_list(key=lambda order: order[1])
+    rand = random.Random(2)
+    items = [(i, rand.randint(0, 20)) for i in range(100)]
+    for item in items:
+        orders.add(item)
+
+    expected = sorted(items, key=lambda order: order[1])
+    assert list(orders) == expected
+    assert orders.index(expected[42]) == 42
+    assert expected[10] in orders
+    assert (1000, 5) not in orders
+    assert orders.count(expected[10]) == 1
+    assert orders.irange((None, 5), (None, 6)).list() == [
+        item for item in expected if 5 <= item[1] <= 6]
+
+    for item in items[:60]:
+        orders.remove(item)
+        expected.remove(item)
+    assert list(orders) == expected
+
+    with pytest.raises(ValueError):
+        orders.remove((1000, 5))
+
+
+def test_equal_keys_stay_in_insertion_order(load):
+
+    sorted_list = l.sorted_list(key=len)
+    sorted_list.update(['b', 'a']).add('c').update(['d', 'e', 'f'])
+
+    assert list(sorted_list) == ['b', 'a', 'c', 'd', 'e', 'f']
+
+
+def test_conversions():
+
+    sorted_list = l.sorted_list([2, 1])
+
+    assert sorted_list.to_l().append(0) == [1, 2, 0]
+    assert g(sorted_list).map(str).join(',') == '1,2'
+    assert repr(sorted_list) == 'SortedList([1, 2])'
+    assert sorted_list.clear().len == 0
@@ -2,6 +2,7 @@ import pytest
 from ww import t
 from ww import l
 from ww import d
+from ww.wrappers.tuples import RecordWrapper, record_class
 
 
 def test_len():
@@ -60,3 +61,147 @@ def test_to_d_with_bad_input():
     tple = t((gen(),))
     with pytest.raises(TypeError):
         tple.to_d()
+
+
+def test_view():
+
+    tple = t(((1, 2), (3, 4), (5, 6)))
+    view = tple.view(1)
+
+    assert view == ((3, 4), (5, 6))
+    assert view.to_t() == ((3, 4), (5, 6))
+    assert isinstance(view.to_t(), t)
+    assert view.to_d() == {3: 4, 5: 6}
+    assert tple.view(step=2).view(1) == [(5, 6)]
+    assert tple.view(5) == []
+
+
+def test_indexed():
+
+    tple = t(x % 10 for x in range(100)).indexed()
+
+    assert tple._positions is None
+    assert tple.index(3) == 3
+    assert tple._positions is not None
+    assert tple.count(3) == 10
+    assert 3 in tple
+    assert 10 not in tple
+    assert tple.positions(9) == tuple(range(9, 100, 10))
+    assert tple.positions(10) == ()
+    assert tple.indexed() is tple
+    assert tple == tuple(x % 10 for x in range(100))
+
+    with pytest.raises(ValueError):
+        tple.index(10)
+
+
+def test_indexed_small():
+
+    tple = t('abca').indexed()
+
+    assert tple.index('a') == 0
+    assert tple.count('a') == 2
+    assert tple.positions('a') == (0, 3)
+    assert 'd' not in tple
+    assert not tple._positions
+
+    with pytest.raises(ValueError):
+        tple.index('d')
+
+
+def test_indexed_unhashable():
+
+    tple = t([[1], [2]] * 20 + [3]).indexed()
+
+    assert tple.index([2]) == 1
+    assert tple.count([1]) == 20
+    assert tple.positions(3) == (40,)
+    assert [3] not in tple
+
+    tple = t(range(40)).indexed()
+    assert [1] not in tple
+    assert tple.count([1]) == 0
+
+
+def test_record():
+
+    record = t.record(name='foo', age=3)
+
+    assert record == (3, 'foo')
+    assert isinstance(record, t)
+    assert record.name == 'foo'
+    assert record.age == 3
+    assert record.fields == ('age', 'name')
+    assert record.to_d() == {'name': 'foo', 'age': 3}
+    assert isinstance(record.to_d(), d)
+    assert record.replace(age=4) == (4, 'foo')
+    assert repr(record) == "Record(age=3, name='foo')"
+
+    # fields are sorted, so their order never depends on the Python version
+    assert type(t.record(name='bar', age=1)) is type(record)
+    assert type(t.record(age=1, name='bar')) is type(record)
+
+    with pytest.raises(AttributeError):
+        record.name = 'bar'
+
+    with pytest.raises(AttributeError):
+        record.other = 'bar'
+
+    with pytest.raises(ValueError):
+        record.replace(other=1)
+
+
+def test_record_field_names():
+
+    for name in ('_private', '1st', 'class', 'name\n', 'a-b', ''):
+        with pytest.raises(ValueError):
+            t.record(**{name: 1})
+
+    with pytest.raises(ValueError):
+        record_class(('a', 'a'))
+
+    # fields can hide methods
+    record = t.record(count=1, index=2, view=3, replace=4, fields=5)
+    assert (record.count, record.index, record.view) == (1, 2, 3)
+    assert (record.replace, record.fields) == (4, 5)
+    assert RecordWrapper.replace(record, count=0) == (0, 5, 2, 4, 3)
+    assert record.to_d()['count'] == 1
+
+
+def test_record_pickle():
+
+    import pickle
+
+    record = t.record(a=1, b=(2, 3))
+    copy = pickle.loads(pickle.dumps(record))
+
+    assert copy == record
+    assert copy.b == (2, 3)
+    assert type(copy) is type(record)
+
+
+def test_records():
+
+    rows = [{'a': 1, 'b': 2}, {'a': 3, 'b': 4}, {'c': 5}]
+    records = t.records(iter(rows)).list()
+
+    assert records == [(1, 2), (3, 4), (5,)]
+    assert type(records[0]) is type(records[1])
+    assert records[1].b == 4
+    assert records[2].c == 5
+    assert [r.to_d() for r in records] == rows
+
+
+def test_records_same_class_as_record():
+
+    rows = [{'name': 'foo', 'age': 1}, {'age': 2, 'name': 'bar'}]
+    records = t.records(rows).list()
+
+    assert records[0] == t.record(name='foo', age=1)
+    assert records[1] == t.record(age=2, name='bar') == (2, 'bar')
+    assert type(records[0]) is type(records[1])
+    assert type(records[0]) is type(t.record(name='foo', age=1))
+
+    records = t.records([{'count': 1}, {}]).list()
+    assert records[0].count == 1
+    assert records[1] == ()